@@ -0,0 +1,305 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+from django.apps import apps
+from django.conf import settings
+from django.core import serializers
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, OuterRef
+from django.db.models.deletion import ProtectedError, RestrictedError
+from django.utils import timezone
+
+from apps.administrator.models import ArchivedRecord
+from utils.audit.audit_logger import AuditLogger
+from utils.base_model import BaseModel
+from utils.base_result import BaseResultWithData
+from utils.log_helpers import OperationLogger
+
+
+ARCHIVE_AFTER_DAYS = getattr(settings, "ARCHIVE_AFTER_DAYS", 90)
+ARCHIVE_BATCH_SIZE = getattr(settings, "ARCHIVE_BATCH_SIZE", 500)
+ARCHIVE_MODELS = getattr(settings, "ARCHIVE_MODELS", [])
+
+# History that must not keep a row alive. These (nullable) links are saved
+# in the archived snapshot and cleared, and Restore points them back.
+ARCHIVE_DETACHED_RELATIONS = getattr(settings, "ARCHIVE_DETACHED_RELATIONS", [
+    "administrator.AuditLog.performed_by",
+    "administrator.AuditLog.target_user",
+    "token_blacklist.OutstandingToken.user",
+])
+
+SNAPSHOT_LINKS_KEY = 'detached_links'
+
+
+def _reverse_relations(model):
+    for relation in model._meta.get_fields(include_hidden=True):
+        if relation.concrete or not relation.auto_created:
+            continue
+        if relation.related_model._meta.auto_created is model:
+            # Through table of one of the row's own many-to-many fields
+            continue
+        yield relation
+
+
+def _is_detached(relation):
+    return relation.field.null and f"{relation.related_model._meta.label}.{relation.field.name}" in ARCHIVE_DETACHED_RELATIONS
+
+
+def _without_dependents(queryset):
+    """
+    Keep only rows nothing else points at.
+
+    Any dependent row blocks archiving: PROTECT / RESTRICT would refuse the
+    delete, SET_NULL would silently lose the link and CASCADE would take
+    other live rows with it. A row's own many-to-many links (User.groups)
+    are not dependents, they are stored with the row, and neither are the
+    ARCHIVE_DETACHED_RELATIONS (audit history), see _detach_links.
+    """
+    for relation in _reverse_relations(queryset.model):
+        if _is_detached(relation):
+            continue
+        related_rows = relation.related_model._base_manager.filter(**{relation.field.name: OuterRef('pk')})
+        queryset = queryset.filter(~Exists(related_rows))
+    return queryset
+
+
+def _detach_links(model, pks):
+    """
+    Clear the detached relations pointing at the given rows.
+
+    Returns:
+        dict: {row pk: {"app.Model.field": [linked pks]}} to keep with the snapshots
+    """
+    links = {}
+    for relation in _reverse_relations(model):
+        if not _is_detached(relation):
+            continue
+        key = f"{relation.related_model._meta.label}.{relation.field.name}"
+        rows = relation.related_model._base_manager.filter(**{f"{relation.field.name}__in": pks})
+        for link_pk, target_pk in rows.values_list('pk', relation.field.attname):
+            links.setdefault(target_pk, {}).setdefault(key, []).append(link_pk)
+        rows.update(**{relation.field.name: None})
+    return links
+
+
+def _reattach_links(obj, links):
+    """Point the links cleared by _detach_links back at a restored row"""
+    for key, link_pks in links.items():
+        label, field_name = key.rsplit('.', 1)
+        try:
+            related_model = apps.get_model(label)
+        except LookupError:
+            continue
+        related_model._base_manager.filter(
+            pk__in=link_pks, **{f"{field_name}__isnull": True}
+        ).update(**{field_name: obj.pk})
+
+
+def _archivable_models(labels):
+    """
+    Resolve and check every label before anything is archived.
+
+    Raises:
+        ValueError: Unknown label, or a model without soft delete (BaseModel)
+    """
+    models = []
+    for label in labels:
+        try:
+            model = apps.get_model(label)
+        except (LookupError, ValueError) as e:
+            raise ValueError(f"Unknown model: {label}") from e
+        if not issubclass(model, BaseModel):
+            raise ValueError(f"{label} has no soft delete, only BaseModel models can be archived")
+        models.append(model)
+    return models
+
+
+class ArchiveCommand:
+    """Move long soft-deleted rows into ArchivedRecord and bring them back"""
+
+    @staticmethod
+    def _archive_rows(model, rows):
+        """Snapshot rows into ArchivedRecord, detach their audit links and delete them"""
+        pks = [obj.pk for obj in rows]
+        snapshots = serializers.serialize('python', rows)
+        links = _detach_links(model, pks)
+        for obj, snapshot in zip(rows, snapshots):
+            if obj.pk in links:
+                snapshot[SNAPSHOT_LINKS_KEY] = links[obj.pk]
+        ArchivedRecord.objects.bulk_create([
+            ArchivedRecord(
+                model_label=model._meta.label,
+                object_id=obj.pk,
+                data=snapshot,
+                deleted_at=obj.deleted_at,
+                deleted_by=obj.deleted_by,
+            )
+            for obj, snapshot in zip(rows, snapshots)
+        ])
+        model._base_manager.filter(pk__in=pks).delete()
+
+    @staticmethod
+    def _archive_model(model, cutoff, batch_size, dry_run=False):
+        """
+        Archive one model in batches, one transaction per batch.
+
+        Returns:
+            tuple: (archived count, rows skipped because of dependents)
+        """
+        label = model._meta.label
+        candidates = model.all_objects.filter(is_deleted=True, deleted_at__lt=cutoff)
+        eligible = _without_dependents(candidates)
+
+        total_candidates = candidates.count()
+        if dry_run:
+            eligible_count = eligible.count()
+            return eligible_count, total_candidates - eligible_count
+
+        archived = 0
+        last_pk = 0
+        while True:
+            with transaction.atomic():
+                # Lock the batch so no dependent row can be inserted before the delete
+                batch = list(
+                    eligible.filter(pk__gt=last_pk).order_by('pk').select_for_update()[:batch_size]
+                )
+                if not batch:
+                    break
+                last_pk = batch[-1].pk
+
+                try:
+                    with transaction.atomic():
+                        ArchiveCommand._archive_rows(model, batch)
+                    done = batch
+                except (ProtectedError, RestrictedError):
+                    # A dependent appeared despite the check (e.g. on SQLite, which ignores
+                    # FOR UPDATE); archive row by row so only the referenced rows stay
+                    done = []
+                    for obj in batch:
+                        try:
+                            with transaction.atomic():
+                                ArchiveCommand._archive_rows(model, [obj])
+                        except (ProtectedError, RestrictedError):
+                            continue
+                        done.append(obj)
+
+            if not done:
+                continue
+            archived += len(done)
+            AuditLogger.log_delete(
+                label,
+                description=f"Archived {len(done)} soft-deleted {model._meta.verbose_name_plural}",
+                metadata={'count': len(done), 'ids': [obj.pk for obj in done]}
+            )
+
+        return archived, total_candidates - archived
+
+    @staticmethod
+    def Archive(model_labels=None, older_than_days=None, batch_size=None, dry_run=False):
+        """
+        Move rows soft-deleted more than N days ago out of their hot tables.
+
+        Args:
+            model_labels (list): Models to archive, e.g. ['hostel.Room'] (default ARCHIVE_MODELS)
+            older_than_days (int): Minimum age of the soft delete (default ARCHIVE_AFTER_DAYS)
+            batch_size (int): Rows per transaction (default ARCHIVE_BATCH_SIZE)
+            dry_run (bool): Only count what would be archived
+
+        Returns:
+            BaseResultWithData: Result with archived / skipped counts per model
+        """
+        model_labels = model_labels or ARCHIVE_MODELS
+        older_than_days = ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+        batch_size = batch_size or ARCHIVE_BATCH_SIZE
+
+        op = OperationLogger("ArchiveCommand.Archive", models=",".join(model_labels), older_than_days=older_than_days)
+        op.start()
+
+        try:
+            models = _archivable_models(model_labels)
+        except ValueError as e:
+            op.fail(str(e))
+            return BaseResultWithData(message=str(e), status_code=HTTPStatus.BAD_REQUEST)
+
+        cutoff = timezone.now() - timedelta(days=older_than_days)
+        summary = {}
+        # Models run in the given order: list dependents first (rooms before
+        # floors / room types) so a parent whose last children were archived
+        # in this run can go too
+        for model in models:
+            archived, skipped = ArchiveCommand._archive_model(model, cutoff, batch_size, dry_run=dry_run)
+            summary[model._meta.label] = {'archived': archived, 'skipped': skipped}
+
+        total = sum(counts['archived'] for counts in summary.values())
+        message = f"{'Would archive' if dry_run else 'Archived'} {total} rows"
+        op.success(message)
+        return BaseResultWithData(message=message, data=summary, status_code=HTTPStatus.OK)
+
+    @staticmethod
+    def Restore(model_label, object_ids=None):
+        """
+        Put archived rows back into their table (still soft-deleted).
+
+        Rows whose foreign keys point at rows that are missing (archived
+        themselves) or that clash with a newer row's unique values are
+        skipped and stay archived. Audit history detached by the archive
+        run is linked back to the restored row.
+
+        Args:
+            model_label (str): Source model, e.g. 'hostel.Room'
+            object_ids (list): Primary keys to restore (default: all archived rows of the model)
+
+        Returns:
+            BaseResultWithData: Result with restored ids and per-row errors
+        """
+        op = OperationLogger("ArchiveCommand.Restore", model=model_label)
+        op.start()
+
+        try:
+            model = apps.get_model(model_label)
+        except (LookupError, ValueError) as e:
+            op.fail(f"Unknown model: {str(e)}")
+            return BaseResultWithData(message=f"Unknown model: {str(e)}", status_code=HTTPStatus.BAD_REQUEST)
+
+        records = ArchivedRecord.objects.filter(model_label=model._meta.label)
+        if object_ids:
+            records = records.filter(object_id__in=object_ids)
+
+        restored, errors = [], []
+        for record in list(records.order_by('object_id')):
+            deserialized = next(serializers.deserialize('python', [record.data], ignorenonexistent=True))
+            obj = deserialized.object
+
+            missing = [
+                field.name for field in model._meta.concrete_fields
+                if field.is_relation and getattr(obj, field.attname) is not None
+                and not field.related_model._base_manager.filter(pk=getattr(obj, field.attname)).exists()
+            ]
+            if missing:
+                errors.append({'id': record.object_id, 'message': f"Missing related rows: {', '.join(missing)}, restore them first"})
+                continue
+
+            try:
+                with transaction.atomic():
+                    deserialized.save()
+                    _reattach_links(obj, record.data.get(SNAPSHOT_LINKS_KEY, {}))
+                    record.delete()
+            except IntegrityError as e:
+                errors.append({'id': record.object_id, 'message': str(e)})
+                continue
+            restored.append(record.object_id)
+
+        if restored:
+            AuditLogger.log_create(
+                model._meta.label,
+                description=f"Restored {len(restored)} archived {model._meta.verbose_name_plural}",
+                metadata={'count': len(restored), 'ids': restored}
+            )
+
+        message = f"Restored {len(restored)} rows, {len(errors)} skipped"
+        op.success(message)
+        return BaseResultWithData(
+            message=message,
+            data={'restored': restored, 'errors': errors},
+            status_code=HTTPStatus.OK if restored or not errors else HTTPStatus.CONFLICT
+        )
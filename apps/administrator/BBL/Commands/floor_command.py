@@ -1,7 +1,14 @@
+from http import HTTPStatus
+from django.db import IntegrityError, transaction
+from django.db.models import Max
 from apps.hostel.models import Floor
+from apps.hostel.serializers import FloorSerializer
 from utils.base_result import BaseResultWithData
+from utils.bulk import bulk_update_unique, duplicate_item_errors, invalid_items_result, item_error, jsonable
 from utils.log_helpers import OperationLogger
 from utils.audit.audit_logger import AuditLogger
+from utils.cache_helper import GlobalCache
+from utils.enums import CacheKeys
 
 
 class FloorCommand:
@@ -12,6 +19,7 @@ class FloorCommand:
         op.start()
         try:
             floor = Floor.objects.create(**data)
+            GlobalCache.bump_versions_on_commit(CacheKeys.FLOORS.value)
             AuditLogger.log_create(Floor.__name__, performed_by=user, metadata=data)
             op.success(f"Floor {floor.number} created successfully")
             return BaseResultWithData(True, "Floor created successfully", floor, 201)
@@ -24,12 +32,13 @@ class FloorCommand:
         op = OperationLogger("FloorCommand.Update", floor_id=floor_id)
         op.start()
         try:
-            floor = Floor.objects.get(id=floor_id)
+            floor = Floor.all_objects.get(id=floor_id)
             old_data = {field: getattr(floor, field) for field in data.keys()}
             
             for key, value in data.items():
                 setattr(floor, key, value)
             floor.save()
+            GlobalCache.bump_versions_on_commit(CacheKeys.FLOORS.value, CacheKeys.ROOMS.value)
             
             AuditLogger.log_update(Floor.__name__, performed_by=user, old_values=old_data, new_values=data)
             op.success(f"Floor {floor.number} updated successfully")
@@ -46,10 +55,11 @@ class FloorCommand:
         op = OperationLogger("FloorCommand.ToggleDelete", floor_id=floor_id)
         op.start()
         try:
-            floor = Floor.objects.get(id=floor_id)
+            floor = Floor.all_objects.get(id=floor_id)
             old_is_deleted = floor.is_deleted
             floor.is_deleted = not floor.is_deleted
             floor.save()
+            GlobalCache.bump_versions_on_commit(CacheKeys.FLOORS.value, CacheKeys.ROOMS.value)
             
             AuditLogger.log_delete(Floor.__name__, performed_by=user, metadata={"is_deleted": floor.is_deleted})
             op.success(f"Floor {floor.number} deleted" if floor.is_deleted else f"Floor {floor.number} restored")
@@ -60,3 +70,142 @@ class FloorCommand:
         except Exception as e:
             op.fail(f"Failed to delete floor: {str(e)}", exc=e)
             return BaseResultWithData(False, str(e), None, 400)
+    
+    @staticmethod
+    def BulkCreate(items, user=None):
+        """
+        Create many floors in one transaction.
+        
+        Uniqueness of the floor numbers is checked with one query for the
+        whole payload; if any item fails, nothing is written.
+        
+        Args:
+            items (list): Validated FloorBulkCreateSerializer items
+            user (User): User performing the action
+            
+        Returns:
+            BaseResultWithData: Result with the created floors or per-item errors
+        """
+        op = OperationLogger("FloorCommand.BulkCreate", count=len(items))
+        op.start()
+        
+        errors = duplicate_item_errors(items, 'number', 'floor number')
+        taken = set(
+            Floor.all_objects.filter(number__in=[item['number'] for item in items]).values_list('number', flat=True)
+        )
+        errors += [
+            item_error(index, 'number', f"Floor {item['number']} already exists")
+            for index, item in enumerate(items) if item['number'] in taken
+        ]
+        if errors:
+            op.fail(f"{len(errors)} invalid items")
+            return invalid_items_result(errors)
+        
+        try:
+            with transaction.atomic():
+                floors = Floor.objects.bulk_create([Floor(**item) for item in items])
+        except IntegrityError as e:
+            # A concurrent insert took one of the numbers after the check
+            op.fail(f"Failed to bulk create floors: {str(e)}", exc=e)
+            return BaseResultWithData(message="Floor numbers changed concurrently, please retry", status_code=HTTPStatus.CONFLICT)
+        
+        GlobalCache.bump_versions_on_commit(CacheKeys.FLOORS.value)
+        AuditLogger.log_create(
+            Floor.__name__,
+            performed_by=user,
+            description=f"Bulk created {len(floors)} floors",
+            metadata={'count': len(floors), 'numbers': [floor.number for floor in floors]}
+        )
+        op.success(f"{len(floors)} floors created successfully")
+        return BaseResultWithData(
+            message=f"{len(floors)} floors created successfully",
+            data=FloorSerializer(floors, many=True).data,
+            status_code=HTTPStatus.CREATED
+        )
+    
+    @staticmethod
+    def BulkUpdate(items, user=None):
+        """
+        Update many floors in one transaction with bulk_update.
+        
+        Each item carries an id plus the fields to change. Numbers are
+        checked against their final values, so the payload can't end up
+        with two floors sharing a number, but may swap numbers between its
+        own floors.
+        
+        Args:
+            items (list): Validated FloorBulkUpdateSerializer items
+            user (User): User performing the action
+            
+        Returns:
+            BaseResultWithData: Result with the updated floors or per-item errors
+        """
+        op = OperationLogger("FloorCommand.BulkUpdate", count=len(items))
+        op.start()
+        
+        errors = duplicate_item_errors(items, 'id', 'id')
+        floors = Floor.all_objects.in_bulk([item['id'] for item in items])
+        errors += [
+            item_error(index, 'id', f"Floor {item['id']} not found")
+            for index, item in enumerate(items) if item['id'] not in floors
+        ]
+        if errors:
+            op.fail(f"{len(errors)} invalid items")
+            return invalid_items_result(errors)
+        
+        final_numbers = [{'number': item.get('number', floors[item['id']].number)} for item in items]
+        errors = duplicate_item_errors(final_numbers, 'number', 'floor number')
+        taken = set(
+            Floor.all_objects.filter(number__in=[item['number'] for item in final_numbers])
+            .exclude(id__in=list(floors))
+            .values_list('number', flat=True)
+        )
+        errors += [
+            item_error(index, 'number', f"Floor {item['number']} already exists")
+            for index, item in enumerate(final_numbers) if item['number'] in taken
+        ]
+        if errors:
+            op.fail(f"{len(errors)} invalid items")
+            return invalid_items_result(errors)
+        
+        changed_fields = set()
+        old_values, new_values = {}, {}
+        old_numbers = {floor.id: floor.number for floor in floors.values()}
+        for item in items:
+            floor = floors[item['id']]
+            changes = {key: value for key, value in item.items() if key != 'id'}
+            old_values[floor.id] = {key: getattr(floor, key) for key in changes}
+            new_values[floor.id] = changes
+            for key, value in changes.items():
+                setattr(floor, key, value)
+            changed_fields.update(changes)
+        
+        updated = [floors[item['id']] for item in items]
+        try:
+            with transaction.atomic():
+                # Numbers swapped within the payload are parked above the highest number first
+                top = Floor.all_objects.aggregate(top=Max('number'))['top'] or 0
+                bulk_update_unique(
+                    Floor.all_objects, updated, sorted(changed_fields), 'number', old_numbers,
+                    lambda floor: top + floor.id
+                )
+        except IntegrityError as e:
+            # Only a concurrent write can get here, the payload was checked above
+            op.fail(f"Failed to bulk update floors: {str(e)}", exc=e)
+            return BaseResultWithData(message="Floor numbers changed concurrently, please retry", status_code=HTTPStatus.CONFLICT)
+        
+        GlobalCache.bump_versions_on_commit(CacheKeys.FLOORS.value, CacheKeys.ROOMS.value)
+        AuditLogger.log_update(
+            Floor.__name__,
+            performed_by=user,
+            description=f"Bulk updated {len(updated)} floors",
+            old_values=jsonable(old_values),
+            new_values=jsonable(new_values),
+            metadata={'count': len(updated)}
+        )
+        op.success(f"{len(updated)} floors updated successfully")
+        return BaseResultWithData(
+            message=f"{len(updated)} floors updated successfully",
+            data=FloorSerializer(updated, many=True).data,
+            status_code=HTTPStatus.OK
+        )
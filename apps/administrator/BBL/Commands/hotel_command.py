@@ -32,7 +32,7 @@ class HotelCommand:
         
         try:
             try:
-                hotel = Hotel.objects.filter(is_deleted=False).first()
+                hotel = Hotel.objects.first()
             except Hotel.DoesNotExist:
                 op.fail(f"Hotel not found")
                 
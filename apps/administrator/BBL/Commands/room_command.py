@@ -1,7 +1,38 @@
-from apps.hostel.models import Room
+import uuid
+from http import HTTPStatus
+from django.db import IntegrityError, transaction
+from apps.hostel.models import Floor, Room, RoomType
+from apps.hostel.serializers import RoomSerializer
 from utils.base_result import BaseResultWithData
+from utils.bulk import bulk_update_unique, duplicate_item_errors, invalid_items_result, item_error, jsonable
 from utils.log_helpers import OperationLogger
 from utils.audit.audit_logger import AuditLogger
+from utils.cache_helper import GlobalCache
+from utils.enums import CacheKeys
+
+
+# Bulk payload keys that hold foreign key ids, mapped to the model attribute
+ROOM_FK_FIELDS = {'floor': 'floor_id', 'room_type': 'room_type_id'}
+
+ROOM_NUMBER_LENGTH = Room._meta.get_field('number').max_length
+
+
+def _missing_fk_errors(items):
+    """Check every floor / room type id in the payload with one query per model"""
+    errors = []
+    for field, model in (('floor', Floor), ('room_type', RoomType)):
+        wanted = {item[field] for item in items if item.get(field) is not None}
+        existing = set(model.all_objects.filter(id__in=wanted).values_list('id', flat=True)) if wanted else set()
+        errors += [
+            item_error(index, field, f"{model.__name__} {item[field]} not found")
+            for index, item in enumerate(items)
+            if item.get(field) is not None and item[field] not in existing
+        ]
+    return errors
+
+
+def _to_model_fields(item):
+    return {ROOM_FK_FIELDS.get(key, key): value for key, value in item.items() if key != 'id'}
 
 
 class RoomCommand:
@@ -12,6 +43,7 @@ class RoomCommand:
         op.start()
         try:
             room = Room.objects.create(**data)
+            GlobalCache.bump_versions_on_commit(CacheKeys.ROOMS.value)
             AuditLogger.log_create(Room.__name__, performed_by=user, metadata=data)
             op.success(f"Room {room.number} created successfully")
             return BaseResultWithData(True, "Room created successfully", room, 201)
@@ -24,12 +56,13 @@ class RoomCommand:
         op = OperationLogger("RoomCommand.Update", room_id=room_id)
         op.start()
         try:
-            room = Room.objects.get(id=room_id)
+            room = Room.all_objects.get(id=room_id)
             old_data = {field: getattr(room, field) for field in data.keys()}
             
             for key, value in data.items():
                 setattr(room, key, value)
             room.save()
+            GlobalCache.bump_versions_on_commit(CacheKeys.ROOMS.value)
             
             AuditLogger.log_update(Room.__name__, performed_by=user, old_values=old_data, new_values=data)
             op.success(f"Room {room.number} updated successfully")
@@ -46,10 +79,11 @@ class RoomCommand:
         op = OperationLogger("RoomCommand.ToggleDelete", room_id=room_id)
         op.start()
         try:
-            room = Room.objects.get(id=room_id)
+            room = Room.all_objects.get(id=room_id)
             old_is_deleted = room.is_deleted
             room.is_deleted = not room.is_deleted
             room.save()
+            GlobalCache.bump_versions_on_commit(CacheKeys.ROOMS.value)
             
             AuditLogger.log_delete(Room.__name__, performed_by=user, metadata={"is_deleted": room.is_deleted})
             op.success(f"Room {room.number} deleted" if room.is_deleted else f"Room {room.number} restored")
@@ -60,3 +94,148 @@ class RoomCommand:
         except Exception as e:
             op.fail(f"Failed to delete room: {str(e)}", exc=e)
             return BaseResultWithData(False, str(e), None, 400)
+    
+    @staticmethod
+    def BulkCreate(items, user=None):
+        """
+        Create many rooms (e.g. a whole new floor) in one transaction.
+        
+        Room numbers are checked with one query for the whole payload and
+        floors / room types with one query each; if any item fails,
+        nothing is written.
+        
+        Args:
+            items (list): Validated RoomBulkCreateSerializer items
+            user (User): User performing the action
+            
+        Returns:
+            BaseResultWithData: Result with the created rooms or per-item errors
+        """
+        op = OperationLogger("RoomCommand.BulkCreate", count=len(items))
+        op.start()
+        
+        errors = duplicate_item_errors(items, 'number', 'room number')
+        taken = set(
+            Room.all_objects.filter(number__in=[item['number'] for item in items]).values_list('number', flat=True)
+        )
+        errors += [
+            item_error(index, 'number', f"Room {item['number']} already exists")
+            for index, item in enumerate(items) if item['number'] in taken
+        ]
+        errors += _missing_fk_errors(items)
+        if errors:
+            op.fail(f"{len(errors)} invalid items")
+            return invalid_items_result(errors)
+        
+        try:
+            with transaction.atomic():
+                rooms = Room.objects.bulk_create([
+                    Room(**_to_model_fields(item)) for item in items
+                ])
+        except IntegrityError as e:
+            op.fail(f"Failed to bulk create rooms: {str(e)}", exc=e)
+            return BaseResultWithData(message="Room numbers changed concurrently, please retry", status_code=HTTPStatus.CONFLICT)
+        
+        GlobalCache.bump_versions_on_commit(CacheKeys.ROOMS.value)
+        AuditLogger.log_create(
+            Room.__name__,
+            performed_by=user,
+            description=f"Bulk created {len(rooms)} rooms",
+            metadata={'count': len(rooms), 'numbers': [room.number for room in rooms]}
+        )
+        op.success(f"{len(rooms)} rooms created successfully")
+        
+        created = Room.objects.filter(id__in=[room.id for room in rooms]).select_related('floor', 'room_type')
+        return BaseResultWithData(
+            message=f"{len(rooms)} rooms created successfully",
+            data=RoomSerializer(created, many=True).data,
+            status_code=HTTPStatus.CREATED
+        )
+    
+    @staticmethod
+    def BulkUpdate(items, user=None):
+        """
+        Update many rooms in one transaction with bulk_update.
+        
+        Each item carries an id plus the fields to change. Numbers are
+        checked against their final values in one query and may be swapped
+        between the payload's own rooms.
+        
+        Args:
+            items (list): Validated RoomBulkUpdateSerializer items
+            user (User): User performing the action
+            
+        Returns:
+            BaseResultWithData: Result with the updated rooms or per-item errors
+        """
+        op = OperationLogger("RoomCommand.BulkUpdate", count=len(items))
+        op.start()
+        
+        errors = duplicate_item_errors(items, 'id', 'id')
+        rooms = Room.all_objects.in_bulk([item['id'] for item in items])
+        errors += [
+            item_error(index, 'id', f"Room {item['id']} not found")
+            for index, item in enumerate(items) if item['id'] not in rooms
+        ]
+        errors += _missing_fk_errors(items)
+        if errors:
+            op.fail(f"{len(errors)} invalid items")
+            return invalid_items_result(errors)
+        
+        final_numbers = [{'number': item.get('number', rooms[item['id']].number)} for item in items]
+        errors = duplicate_item_errors(final_numbers, 'number', 'room number')
+        taken = set(
+            Room.all_objects.filter(number__in=[item['number'] for item in final_numbers])
+            .exclude(id__in=list(rooms))
+            .values_list('number', flat=True)
+        )
+        errors += [
+            item_error(index, 'number', f"Room {item['number']} already exists")
+            for index, item in enumerate(final_numbers) if item['number'] in taken
+        ]
+        if errors:
+            op.fail(f"{len(errors)} invalid items")
+            return invalid_items_result(errors)
+        
+        changed_fields = set()
+        old_values, new_values = {}, {}
+        old_numbers = {room.id: room.number for room in rooms.values()}
+        for item in items:
+            room = rooms[item['id']]
+            changes = _to_model_fields(item)
+            old_values[room.id] = {key: getattr(room, key) for key in changes}
+            new_values[room.id] = changes
+            for key, value in changes.items():
+                setattr(room, key, value)
+            changed_fields.update(changes)
+        
+        updated = [rooms[item['id']] for item in items]
+        try:
+            with transaction.atomic():
+                # Numbers swapped within the payload are parked on random placeholders first
+                bulk_update_unique(
+                    Room.all_objects, updated, sorted(changed_fields), 'number', old_numbers,
+                    lambda room: uuid.uuid4().hex[:ROOM_NUMBER_LENGTH]
+                )
+        except IntegrityError as e:
+            # Only a concurrent write can get here, the payload was checked above
+            op.fail(f"Failed to bulk update rooms: {str(e)}", exc=e)
+            return BaseResultWithData(message="Room numbers changed concurrently, please retry", status_code=HTTPStatus.CONFLICT)
+        
+        GlobalCache.bump_versions_on_commit(CacheKeys.ROOMS.value)
+        AuditLogger.log_update(
+            Room.__name__,
+            performed_by=user,
+            description=f"Bulk updated {len(updated)} rooms",
+            old_values=jsonable(old_values),
+            new_values=jsonable(new_values),
+            metadata={'count': len(updated)}
+        )
+        op.success(f"{len(updated)} rooms updated successfully")
+        
+        refreshed = Room.all_objects.filter(id__in=[room.id for room in updated]).select_related('floor', 'room_type')
+        return BaseResultWithData(
+            message=f"{len(updated)} rooms updated successfully",
+            data=RoomSerializer(refreshed, many=True).data,
+            status_code=HTTPStatus.OK
+        )
@@ -2,6 +2,8 @@ from apps.hostel.models import RoomType
 from utils.base_result import BaseResultWithData
 from utils.log_helpers import OperationLogger
 from utils.audit.audit_logger import AuditLogger
+from utils.cache_helper import GlobalCache
+from utils.enums import CacheKeys
 
 
 class RoomTypeCommand:
@@ -12,6 +14,7 @@ class RoomTypeCommand:
         op.start()
         try:
             room_type = RoomType.objects.create(**data)
+            GlobalCache.bump_versions_on_commit(CacheKeys.ROOM_TYPES.value)
             AuditLogger.log_create(RoomType.__name__, performed_by=user, metadata=data)
             op.success(f"RoomType {room_type.name} created successfully")
             return BaseResultWithData(True, "Room type created successfully", room_type, 201)
@@ -24,12 +27,13 @@ class RoomTypeCommand:
         op = OperationLogger("RoomTypeCommand.Update", room_type_id=room_type_id)
         op.start()
         try:
-            room_type = RoomType.objects.get(id=room_type_id)
+            room_type = RoomType.all_objects.get(id=room_type_id)
             old_data = {field: getattr(room_type, field) for field in data.keys()}
             
             for key, value in data.items():
                 setattr(room_type, key, value)
             room_type.save()
+            GlobalCache.bump_versions_on_commit(CacheKeys.ROOM_TYPES.value, CacheKeys.ROOMS.value)
             
             AuditLogger.log_update(RoomType.__name__, performed_by=user, old_values=old_data, new_values=data)
             op.success(f"RoomType {room_type.name} updated successfully")
@@ -46,10 +50,11 @@ class RoomTypeCommand:
         op = OperationLogger("RoomTypeCommand.ToggleDelete", room_type_id=room_type_id)
         op.start()
         try:
-            room_type = RoomType.objects.get(id=room_type_id)
+            room_type = RoomType.all_objects.get(id=room_type_id)
             old_is_deleted = room_type.is_deleted
             room_type.is_deleted = not room_type.is_deleted
             room_type.save()
+            GlobalCache.bump_versions_on_commit(CacheKeys.ROOM_TYPES.value, CacheKeys.ROOMS.value)
             
             AuditLogger.log_delete(RoomType.__name__, performed_by=user, metadata={"is_deleted": room_type.is_deleted})
             op.success(f"RoomType {room_type.name} deleted" if room_type.is_deleted else f"RoomType {room_type.name} restored")
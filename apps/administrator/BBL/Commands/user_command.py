@@ -4,6 +4,7 @@ from django.db import transaction
 from utils.base_result import BaseResultWithData
 from utils.log_helpers import OperationLogger
 from apps.users.models import User
+from apps.users.signals import primary_group_name
 from apps.users.serializers import UserSerializer
 from utils.audit.audit_logger import AuditLogger
 
@@ -85,7 +86,7 @@ class UserCommand:
             )
         
         # Check if user already exists
-        if User.objects.filter(username=username, is_deleted=False).exists():
+        if User.all_objects.filter(username=username).exists():
             op.fail(f"User {username} already exists")
             AuditLogger.log_failure(
                 'CREATE',
@@ -99,7 +100,7 @@ class UserCommand:
             )
         
         # Check email only if provided
-        if email and User.objects.filter(email=email, is_deleted=False).exists():
+        if email and User.all_objects.filter(email=email).exists():
             op.fail(f"Email {email} already exists")
             AuditLogger.log_failure(
                 'CREATE',
@@ -112,6 +113,9 @@ class UserCommand:
                 status_code=HTTPStatus.BAD_REQUEST
             )
             
+        # Primary group decides the id_number prefix (same rule as bulk imports)
+        group_name = primary_group_name(groups)
+            
         with transaction.atomic():
         
             user = User.objects.create_user(
@@ -120,6 +124,7 @@ class UserCommand:
                 first_name=first_name,
                 last_name=last_name,
                 password=password,
+                group_name=group_name,
             )
             
             # Assign groups (required)
@@ -177,7 +182,7 @@ class UserCommand:
             )
         
         try:
-            user = User.objects.get(id=user_id, is_deleted=False)
+            user = User.objects.get(id=user_id)
             
             # Update password
             with transaction.atomic():
@@ -235,13 +240,13 @@ class UserCommand:
         op.start()
         
         try:
-            user = User.objects.get(id=user_id, is_deleted=False)
+            user = User.objects.get(id=user_id)
             old_values = {}
             new_values = {}
             
             # Check for duplicate username if being updated
             if username is not None and username != user.username:
-                if User.objects.filter(username=username, is_deleted=False).exists():
+                if User.all_objects.filter(username=username).exists():
                     op.fail(f"Username {username} already exists")
                     AuditLogger.log_failure(
                         'UPDATE',
@@ -260,7 +265,7 @@ class UserCommand:
             
             # Check for duplicate email if being updated
             if email is not None and email != user.email:
-                if User.objects.filter(email=email, is_deleted=False).exists():
+                if User.all_objects.filter(email=email).exists():
                     op.fail(f"Email {email} already exists")
                     AuditLogger.log_failure(
                         'UPDATE',
@@ -355,7 +360,7 @@ class UserCommand:
         op.start()
         
         try:
-            user = User.objects.get(id=user_id)
+            user = User.all_objects.get(id=user_id)
             
             # Toggle is_deleted status
             user.is_deleted = not user.is_deleted
@@ -0,0 +1,364 @@
+import codecs
+import csv
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import Group
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+
+from apps.users.models import User
+from apps.users.signals import generate_id_numbers, primary_group_name
+from utils.audit.audit_logger import AuditLogger
+from utils.base_result import BaseResultWithData
+from utils.cache_helper import GlobalCache
+from utils.enums import CacheKeys
+from utils.log_helpers import OperationLogger
+
+
+IMPORT_BATCH_SIZE = getattr(settings, "USER_IMPORT_BATCH_SIZE", 500)
+IMPORT_HASH_WORKERS = getattr(settings, "USER_IMPORT_HASH_WORKERS", None)
+
+REQUIRED_FIELDS = ('username', 'first_name', 'last_name', 'password', 'groups')
+SUPPORTED_FORMATS = ('csv', 'json', 'jsonl')
+
+
+def _hash_passwords(passwords):
+    """
+    Hash a batch of passwords on a short-lived thread pool.
+
+    The hashers do their work in C with the GIL released, so threads
+    spread it over the cores without forking the (multithreaded) web
+    worker.
+    """
+    with ThreadPoolExecutor(max_workers=IMPORT_HASH_WORKERS or os.cpu_count()) as pool:
+        return list(pool.map(make_password, passwords))
+
+
+def _split_groups(groups):
+    """Group names or ids from a "Admin;Staff" / "Admin|Staff" string"""
+    return [g for g in groups.replace('|', ';').split(';') if g.strip()]
+
+
+class UserImportCommand:
+    """Bulk import users from a CSV / JSON / JSON lines file"""
+
+    @staticmethod
+    def detect_format(filename):
+        """Guess the file format from its extension (defaults to csv)"""
+        extension = os.path.splitext(filename or '')[1].lower().lstrip('.')
+        if extension in ('json', 'jsonl'):
+            return extension
+        if extension == 'ndjson':
+            return 'jsonl'
+        return 'csv'
+
+    @staticmethod
+    def _read_rows(file_obj, file_format):
+        """
+        Stream rows from the file as (row_number, dict) pairs.
+
+        CSV and JSON lines are read line by line; a JSON array has to be
+        loaded whole. In CSV files, groups are separated by ';' or '|'.
+        """
+        if file_format == 'csv':
+            reader = csv.DictReader(codecs.iterdecode(file_obj, 'utf-8-sig'))
+            for row_number, row in enumerate(reader, start=2):
+                row['groups'] = _split_groups(row.get('groups') or '')
+                yield row_number, row
+        elif file_format == 'jsonl':
+            for row_number, line in enumerate(codecs.iterdecode(file_obj, 'utf-8-sig'), start=1):
+                if line.strip():
+                    yield row_number, json.loads(line)
+        else:
+            for row_number, row in enumerate(json.load(file_obj), start=1):
+                yield row_number, row
+
+    @staticmethod
+    def _check_readable(file_obj, file_format):
+        """
+        Parse a CSV / JSON lines file once without importing anything, so a
+        file that breaks halfway fails before any batch is committed. A JSON
+        array is parsed whole before its first row anyway.
+
+        Raises:
+            ValueError, csv.Error: The file can't be read
+        """
+        if file_format == 'json':
+            return
+        for _ in UserImportCommand._read_rows(file_obj, file_format):
+            pass
+        file_obj.seek(0)
+
+    @staticmethod
+    def _clean_row(row):
+        """Normalize a raw row; returns (cleaned, error message)"""
+        if not isinstance(row, dict):
+            return None, "Row must be an object"
+
+        groups = row.get('groups') or []
+        if isinstance(groups, str):
+            groups = _split_groups(groups)
+        elif not isinstance(groups, list):
+            groups = [groups]
+
+        password = row.get('password') or ''
+        if not isinstance(password, str):
+            return None, "Password must be a string"
+
+        cleaned = {
+            'username': str(row.get('username') or '').strip(),
+            'email': str(row.get('email') or '').strip() or None,
+            'first_name': str(row.get('first_name') or '').strip(),
+            'last_name': str(row.get('last_name') or '').strip(),
+            'password': password,
+            'groups': [str(g).strip() for g in groups],
+        }
+
+        missing = [field for field in REQUIRED_FIELDS if not cleaned[field]]
+        if missing:
+            return None, f"Missing required fields: {', '.join(missing)}"
+        return cleaned, None
+
+    @staticmethod
+    def _resolve_groups(rows, group_cache):
+        """Load every group referenced by the batch (by id or name) in one query"""
+        wanted = {g for row in rows for g in row['groups']} - set(group_cache)
+        if not wanted:
+            return
+
+        ids = [int(g) for g in wanted if g.isdigit()]
+        names = [g for g in wanted if not g.isdigit()]
+        for group in Group.objects.filter(Q(id__in=ids) | Q(name__in=names)):
+            group_cache[str(group.id)] = group
+            group_cache[group.name] = group
+
+    @staticmethod
+    def _import_batch(batch, seen, group_cache, performed_by=None):
+        """
+        Validate, hash and insert one batch.
+
+        The batch is one transaction. If the insert fails on a unique
+        constraint (a user created concurrently), nothing of the batch is
+        kept and each of its rows is reported as an error.
+
+        Returns:
+            tuple: (list of created users, list of row errors)
+        """
+        errors = []
+        rows = []
+
+        for row_number, raw in batch:
+            row, error = UserImportCommand._clean_row(raw)
+            if error:
+                username = raw.get('username') if isinstance(raw, dict) else None
+                errors.append({'row': row_number, 'username': username, 'message': error})
+                continue
+
+            if row['username'] in seen['usernames']:
+                errors.append({'row': row_number, 'username': row['username'], 'message': "Duplicate username in file"})
+                continue
+            if row['email'] and row['email'] in seen['emails']:
+                errors.append({'row': row_number, 'username': row['username'], 'message': "Duplicate email in file"})
+                continue
+
+            seen['usernames'].add(row['username'])
+            if row['email']:
+                seen['emails'].add(row['email'])
+            rows.append((row_number, row))
+
+        if not rows:
+            return [], errors
+
+        # Uniqueness against the database in one set-based query
+        usernames = [row['username'] for _, row in rows]
+        emails = [row['email'] for _, row in rows if row['email']]
+        taken_usernames = set()
+        taken_emails = set()
+        for username, email in User.all_objects.filter(
+            Q(username__in=usernames) | Q(email__in=emails)
+        ).values_list('username', 'email'):
+            taken_usernames.add(username)
+            taken_emails.add(email)
+
+        UserImportCommand._resolve_groups([row for _, row in rows], group_cache)
+
+        valid_rows = []
+        for row_number, row in rows:
+            if row['username'] in taken_usernames:
+                errors.append({'row': row_number, 'username': row['username'], 'message': "Username already exists"})
+                continue
+            if row['email'] and row['email'] in taken_emails:
+                errors.append({'row': row_number, 'username': row['username'], 'message': "Email already exists"})
+                continue
+
+            unknown = [g for g in row['groups'] if g not in group_cache]
+            if unknown:
+                errors.append({'row': row_number, 'username': row['username'], 'message': f"Unknown groups: {', '.join(unknown)}"})
+                continue
+
+            row['groups'] = list({group_cache[g].id: group_cache[g] for g in row['groups']}.values())
+            row['row_number'] = row_number
+            valid_rows.append(row)
+
+        errors.sort(key=lambda error: error['row'])
+        if not valid_rows:
+            return [], errors
+
+        # Password hashing is the CPU-bound part, so spread it over threads
+        hashed_passwords = _hash_passwords([row['password'] for row in valid_rows])
+
+        # Allocate id_numbers in one block per primary group
+        rows_by_group = {}
+        for row in valid_rows:
+            rows_by_group.setdefault(primary_group_name(row['groups']), []).append(row)
+
+        action_by = getattr(performed_by, 'username', None) or "System"
+
+        try:
+            users = UserImportCommand._insert_rows(valid_rows, hashed_passwords, rows_by_group, action_by)
+        except IntegrityError as e:
+            errors.extend(
+                {'row': row['row_number'], 'username': row['username'],
+                 'message': f"Not imported, the batch conflicted with existing data: {e}"}
+                for row in valid_rows
+            )
+            errors.sort(key=lambda error: error['row'])
+            return [], errors
+
+        return users, errors
+
+    @staticmethod
+    def _insert_rows(valid_rows, hashed_passwords, rows_by_group, action_by):
+        """Insert the users of a batch and their group memberships in one transaction"""
+        with transaction.atomic():
+            for group_name, group_rows in rows_by_group.items():
+                for row, id_number in zip(group_rows, generate_id_numbers(group_name, len(group_rows))):
+                    row['id_number'] = id_number
+
+            users = User.objects.bulk_create([
+                User(
+                    username=row['username'],
+                    email=row['email'],
+                    first_name=row['first_name'].capitalize(),
+                    last_name=row['last_name'].capitalize(),
+                    password=hashed_password,
+                    id_number=row['id_number'],
+                    created_by=action_by,
+                )
+                for row, hashed_password in zip(valid_rows, hashed_passwords)
+            ])
+
+            Membership = User.groups.through
+            Membership.objects.bulk_create([
+                Membership(user_id=user.id, group_id=group.id)
+                for user, row in zip(users, valid_rows)
+                for group in row['groups']
+            ])
+            # bulk_create sends no signals, so bump the users namespace here
+            GlobalCache.bump_versions_on_commit(CacheKeys.USERS.value)
+
+        return users
+
+    @staticmethod
+    def Execute(file_obj, file_format=None, performed_by=None, batch_size=None):
+        """
+        Import users from an uploaded or local file.
+
+        Args:
+            file_obj: Binary file-like object (upload or opened file)
+            file_format (str): csv, json or jsonl (guessed from the name if omitted)
+            performed_by (User): User performing the import (optional)
+            batch_size (int): Rows per transaction (optional)
+
+        Returns:
+            BaseResultWithData: Result with created count and per-row errors
+        """
+        file_format = file_format or UserImportCommand.detect_format(getattr(file_obj, 'name', None))
+        batch_size = batch_size or IMPORT_BATCH_SIZE
+
+        op = OperationLogger(
+            "UserImportCommand.Execute",
+            file_format=file_format,
+            performed_by=getattr(performed_by, 'username', None)
+        )
+        op.start()
+
+        if file_format not in SUPPORTED_FORMATS:
+            op.fail(f"Unsupported file format {file_format}")
+            return BaseResultWithData(
+                message=f"Unsupported file format, expected one of: {', '.join(SUPPORTED_FORMATS)}",
+                status_code=HTTPStatus.BAD_REQUEST
+            )
+
+        created_count = 0
+        errors = []
+        seen = {'usernames': set(), 'emails': set()}
+        group_cache = {}
+
+        try:
+            UserImportCommand._check_readable(file_obj, file_format)
+            rows = UserImportCommand._read_rows(file_obj, file_format)
+            batch_number = 0
+            while True:
+                batch = list(islice(rows, batch_size))
+                if not batch:
+                    break
+                batch_number += 1
+
+                users, batch_errors = UserImportCommand._import_batch(
+                    batch, seen, group_cache, performed_by=performed_by
+                )
+                errors.extend(batch_errors)
+
+                if users:
+                    created_count += len(users)
+                    # One aggregated audit entry per batch
+                    AuditLogger.log_create(
+                        entity='User',
+                        performed_by=performed_by,
+                        description=f"Bulk imported {len(users)} users (batch {batch_number})",
+                        metadata={
+                            'batch': batch_number,
+                            'count': len(users),
+                            'usernames': [user.username for user in users],
+                        }
+                    )
+        except (ValueError, csv.Error) as e:
+            # json.JSONDecodeError and UnicodeDecodeError are ValueErrors
+            op.fail(f"Failed to read import file: {str(e)}", exc=e)
+            AuditLogger.log_failure(
+                'CREATE',
+                'User',
+                performed_by=performed_by,
+                description=f"Bulk user import failed after {created_count} users - {str(e)}"
+            )
+            message = f"Invalid import file: {str(e)}"
+            if created_count:
+                message += f" ({created_count} users from earlier rows were already imported)"
+            return BaseResultWithData(
+                message=message,
+                data={'created': created_count, 'failed': len(errors), 'errors': errors},
+                status_code=HTTPStatus.BAD_REQUEST
+            )
+
+        op.success(f"Imported {created_count} users, {len(errors)} rows skipped")
+
+        # The file was read; rows that couldn't be imported are reported per row
+        if errors:
+            status_code = HTTPStatus.MULTI_STATUS
+        elif created_count:
+            status_code = HTTPStatus.CREATED
+        else:
+            status_code = HTTPStatus.OK
+
+        return BaseResultWithData(
+            message=f"Imported {created_count} users, {len(errors)} rows skipped",
+            data={'created': created_count, 'failed': len(errors), 'errors': errors},
+            status_code=status_code
+        )
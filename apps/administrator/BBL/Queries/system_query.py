@@ -0,0 +1,92 @@
+from http import HTTPStatus
+
+from utils.base_result import BaseResultWithData
+from utils.cache_helper import GlobalCache
+from utils.cache_metrics import CACHE_METRICS_FLUSH_INTERVAL, collect
+from utils.profiling import PROFILE_MAX_PER_MINUTE, list_profiles, profile_path
+from utils.slow_queries import SLOW_QUERY_MS, summarize as summarize_slow_queries
+
+
+class SystemQuery:
+    """Operational metrics for admins"""
+
+    @staticmethod
+    def GetCacheMetrics():
+        """
+        Cache metrics per namespace, summed over all workers.
+
+        Numbers lag by up to CACHE_METRICS_FLUSH_INTERVAL seconds per worker.
+        The in-process tiers (L1, get_or_compute) are those of the worker
+        serving the request.
+
+        Returns:
+            BaseResultWithData: Result with per-namespace and in-process stats
+        """
+        return BaseResultWithData(
+            message="Cache metrics retrieved successfully",
+            data={
+                'namespaces': collect(),
+                'process': GlobalCache.stats(),
+                'flush_interval_seconds': CACHE_METRICS_FLUSH_INTERVAL,
+            },
+            status_code=HTTPStatus.OK
+        )
+
+    @staticmethod
+    def GetSlowQueries(limit=20):
+        """
+        Logged slow queries grouped by fingerprint, most total time first.
+
+        full_scans lists the tables the captured plan reads sequentially,
+        the usual sign of a missing index.
+
+        Args:
+            limit (int): Number of fingerprints to return
+
+        Returns:
+            BaseResultWithData: Result with the per-fingerprint summary
+        """
+        return BaseResultWithData(
+            message="Slow queries retrieved successfully",
+            data={
+                'threshold_ms': SLOW_QUERY_MS,
+                'queries': summarize_slow_queries(limit=limit),
+            },
+            status_code=HTTPStatus.OK
+        )
+
+    @staticmethod
+    def GetProfiles():
+        """
+        Stored request profiles, newest first.
+
+        ".collapsed" files are folded stacks (flamegraph.pl, speedscope),
+        ".prof" files are cProfile pstats (snakeviz, python -m pstats).
+
+        Returns:
+            BaseResultWithData: Result with the profile list
+        """
+        return BaseResultWithData(
+            message="Profiles retrieved successfully",
+            data={
+                'profiles': list_profiles(),
+                'max_per_minute': PROFILE_MAX_PER_MINUTE,
+            },
+            status_code=HTTPStatus.OK
+        )
+
+    @staticmethod
+    def GetProfilePath(name):
+        """
+        Locate a stored profile for download.
+
+        Args:
+            name (str): Profile file name, as listed by GetProfiles
+
+        Returns:
+            BaseResultWithData: Result with the file path, or 404
+        """
+        path = profile_path(name)
+        if path is None:
+            return BaseResultWithData(message="Profile not found", status_code=HTTPStatus.NOT_FOUND)
+        return BaseResultWithData(message="Profile found", data=path, status_code=HTTPStatus.OK)
@@ -7,4 +7,7 @@ class AdministratorConfig(AppConfig):
     label = "administrator"
     
     def ready(self):
-        import apps.administrator.signals
\ No newline at end of file
+        from apps.administrator.signals import connect_audit_receivers
+        from utils import slow_queries
+        connect_audit_receivers()
+        slow_queries.install()
\ No newline at end of file
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.administrator.BBL.Commands.archive_command import ArchiveCommand
+
+
+class Command(BaseCommand):
+    help = 'Moves rows soft-deleted longer than N days into the archive table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', action='append', dest='models', help='Model label, e.g. hostel.Room (repeatable, default ARCHIVE_MODELS)')
+        parser.add_argument('--days', type=int, help='Minimum age of the soft delete in days (default ARCHIVE_AFTER_DAYS)')
+        parser.add_argument('--batch-size', type=int, help='Rows per transaction')
+        parser.add_argument('--dry-run', action='store_true', help='Only count what would be archived')
+
+    def handle(self, *args, **options):
+        result = ArchiveCommand.Archive(
+            model_labels=options['models'],
+            older_than_days=options['days'],
+            batch_size=options['batch_size'],
+            dry_run=options['dry_run']
+        )
+        if not result.is_success:
+            raise CommandError(result.message)
+
+        for label, counts in result.data.items():
+            self.stdout.write(f'{label}: {counts["archived"]} archived, {counts["skipped"]} kept (still referenced)')
+        self.stdout.write(self.style.SUCCESS(result.message))
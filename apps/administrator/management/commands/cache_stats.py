@@ -0,0 +1,45 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from utils.cache_metrics import collect, reset
+
+
+class Command(BaseCommand):
+    help = 'Prints cache hit ratio, latency and payload size per namespace, refreshing every few seconds'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=5, help='Seconds between refreshes')
+        parser.add_argument('--once', action='store_true', help='Print one summary and exit')
+        parser.add_argument('--reset', action='store_true', help='Clear the recorded metrics and exit')
+
+    def handle(self, *args, **options):
+        if options['reset']:
+            reset()
+            self.stdout.write(self.style.SUCCESS('Cache metrics cleared'))
+            return
+
+        try:
+            while True:
+                self._print(collect())
+                if options['once']:
+                    return
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+
+    def _print(self, summary):
+        self.stdout.write(f'\n{time.strftime("%H:%M:%S")}  {"namespace":<28}{"calls":>9}{"hit %":>8}{"errors":>8}'
+                          f'{"avg ms":>9}{"p95 ms":>8}{"avg hit B":>11}{"written B":>12}')
+        if not summary:
+            self.stdout.write(self.style.WARNING('No cache operations recorded yet'))
+            return
+
+        for namespace, stats in summary.items():
+            hit_ratio = f"{stats['hit_ratio'] * 100:.1f}" if stats['hit_ratio'] is not None else '-'
+            line = (
+                f'          {namespace:<28}{sum(stats["calls"].values()):>9}{hit_ratio:>8}{stats["errors"]:>8}'
+                f'{stats["avg_latency_ms"] or 0:>9.2f}{str(stats["p95_latency_ms"]):>8}'
+                f'{stats["avg_hit_bytes"] or "-":>11}{stats["bytes_written"]:>12}'
+            )
+            self.stdout.write(self.style.ERROR(line) if stats['errors'] else line)
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.administrator.BBL.Commands.archive_command import ArchiveCommand
+
+
+class Command(BaseCommand):
+    help = 'Restores archived rows into their original table (they stay soft-deleted)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('model', help='Model label, e.g. hostel.Room')
+        parser.add_argument('ids', nargs='*', type=int, help='Primary keys to restore (default: every archived row of the model)')
+
+    def handle(self, *args, **options):
+        result = ArchiveCommand.Restore(options['model'], object_ids=options['ids'] or None)
+        if result.data is None:
+            raise CommandError(result.message)
+
+        for error in result.data['errors']:
+            self.stdout.write(self.style.WARNING(f'{options["model"]} #{error["id"]}: {error["message"]}'))
+
+        if result.is_success:
+            self.stdout.write(self.style.SUCCESS(result.message))
+        else:
+            raise CommandError(result.message)
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.2 on 2026-10-19 15:50
+
+import django.db.models.manager
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        (
+            "administrator",
+            "0002_remove_auditlog_updated_at_auditlog_created_by_and_more",
+        ),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name="auditlog",
+            managers=[
+                ("all_objects", django.db.models.manager.Manager()),
+            ],
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.0.2 on 2026-10-19 15:51
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("administrator", "0003_alter_auditlog_managers"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedRecord",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "model_label",
+                    models.CharField(
+                        help_text="Source model, e.g. hostel.Room", max_length=100
+                    ),
+                ),
+                (
+                    "object_id",
+                    models.BigIntegerField(help_text="Primary key in the source table"),
+                ),
+                (
+                    "data",
+                    models.JSONField(
+                        encoder=django.core.serializers.json.DjangoJSONEncoder
+                    ),
+                ),
+                ("deleted_at", models.DateTimeField(blank=True, null=True)),
+                ("deleted_by", models.CharField(blank=True, max_length=100, null=True)),
+                ("archived_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "ordering": ["-archived_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["model_label", "-archived_at"],
+                        name="administrat_model_l_c75871_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="archivedrecord",
+            constraint=models.UniqueConstraint(
+                fields=("model_label", "object_id"),
+                name="archived_record_unique_object",
+            ),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
 from django.utils import timezone
 
 from utils.base_model import BaseModel
@@ -55,3 +56,28 @@ class AuditLog(BaseModel):
         return f"{self.action} - {self.entity} ({self.status}) - {self.created_at}"
 
 
+class ArchivedRecord(models.Model):
+    """
+    Snapshot of a row moved out of its hot table after a long soft delete.
+    `data` holds the row in Django's python serializer format (fields plus
+    many-to-many pks), so it can be restored as-is.
+    """
+    
+    model_label = models.CharField(max_length=100, help_text="Source model, e.g. hostel.Room")
+    object_id = models.BigIntegerField(help_text="Primary key in the source table")
+    data = models.JSONField(encoder=DjangoJSONEncoder)
+    deleted_at = models.DateTimeField(null=True, blank=True)
+    deleted_by = models.CharField(max_length=100, null=True, blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-archived_at']
+        constraints = [
+            models.UniqueConstraint(fields=['model_label', 'object_id'], name='archived_record_unique_object'),
+        ]
+        indexes = [
+            models.Index(fields=['model_label', '-archived_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.model_label} #{self.object_id} (archived {self.archived_at})"
@@ -39,6 +39,14 @@ class UserUpdateSerializer(serializers.Serializer):
     )
 
 
+class UserImportSerializer(serializers.Serializer):
+    """Serializer for bulk user import uploads"""
+    
+    file = serializers.FileField(required=True)
+    format = serializers.ChoiceField(choices=['csv', 'json', 'jsonl'], required=False)
+    batch_size = serializers.IntegerField(required=False, min_value=1, max_value=5000)
+
+
 class ChangeUserPasswordSerializer(serializers.Serializer):
     """Serializer for changing user password"""
     
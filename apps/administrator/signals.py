@@ -1,20 +1,14 @@
+from django.apps import apps
 from django.db.models.signals import pre_save, post_save
-from django.dispatch import receiver
 from django.utils import timezone
 from utils.base_model import BaseModel
-from utils.Middlewares.threadlocals import get_current_user
+from utils.request_context import get_current_username
 
 
 
-@receiver(pre_save)
 def auto_fill_audit_fields(sender, instance, **kwargs):
     """Handle pre-save audit fields - do NOT access ManyToMany relationships here"""
-    # Only for models inheriting from BaseModel
-    if not issubclass(sender, BaseModel):
-        return
-
-    user = get_current_user()
-    action_by = getattr(user, "username", None) or getattr(user, "email", None) or "System"
+    action_by = get_current_username()
 
     if instance._state.adding:
         if not instance.created_by:
@@ -24,4 +18,19 @@ def auto_fill_audit_fields(sender, instance, **kwargs):
 
     if instance.is_deleted and not instance.deleted_at:
         instance.deleted_at = timezone.now()
-        instance.deleted_by = action_by
\ No newline at end of file
+        instance.deleted_by = action_by
+
+
+def connect_audit_receivers():
+    """
+    Connect auto_fill_audit_fields to BaseModel subclasses only, so saves
+    of other models (sessions, tokens, audit logs...) don't pay for it.
+    Bulk writes are stamped by BaseModelQuerySet instead.
+    """
+    for model in apps.get_models():
+        if issubclass(model, BaseModel):
+            pre_save.connect(
+                auto_fill_audit_fields,
+                sender=model,
+                dispatch_uid=f"auto_fill_audit_fields.{model._meta.label}"
+            )
@@ -48,3 +48,16 @@ def log_audit_event(self, action, entity, status, description=None,
     except Exception as exc:
         op.fail(f"Failed to log audit event", exc=exc)
         raise self.retry(exc=exc, countdown=30)
+
+
+@shared_task
+def archive_soft_deleted(model_labels=None, older_than_days=None):
+    """
+    Periodic archival of long soft-deleted rows (see ARCHIVE_* settings).
+    Scheduled nightly by the beat schedule in backend/celery.py.
+    """
+    # Imported here: the command uses AuditLogger, which imports this module
+    from apps.administrator.BBL.Commands.archive_command import ArchiveCommand
+    
+    result = ArchiveCommand.Archive(model_labels=model_labels, older_than_days=older_than_days)
+    return result.data
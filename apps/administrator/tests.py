@@ -1,3 +1,1159 @@
-from django.test import TestCase
+import gzip
+import io
+import json
+import os
+import logging
+import sys
+import tempfile
+import threading
+import time
+import unittest
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from http import HTTPStatus
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+import ipaddress
+
+from django.contrib.auth.models import Group
+from django.core.cache import caches
+from django.db import connection, transaction
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django_redis.client import DefaultClient
+from rest_framework.test import APIClient
+
+from apps.administrator.BBL.Commands import archive_command
+from apps.administrator.BBL.Commands.archive_command import ArchiveCommand
+from apps.administrator.BBL.Commands.floor_command import FloorCommand
+from apps.administrator.BBL.Commands.room_command import RoomCommand
+from apps.administrator.BBL.Commands.user_command import UserCommand
+from apps.administrator.BBL.Commands.user_import_command import UserImportCommand
+from apps.administrator.models import ArchivedRecord, AuditLog
+from apps.hostel.models import Floor, Room, RoomType
+from apps.users.models import User
+from utils import local_cache as local_cache_module
+from utils import request_context as request_context_module
+from utils import cache_codecs, cache_helper, cache_metrics, metrics, profiling, slow_queries, tracing
+from utils.db import execute_wrapper
+from utils.log_helpers import OperationLogger
+from utils.logger import QueueListenerHandler
+from utils.request_context import (
+    ContextThreadPoolExecutor, get_current_user, get_current_username, request_context, user_context,
+)
+from utils.cache_helper import GlobalCache
+from utils.local_cache import CACHE_L1_ENABLED, Invalidator, LocalCache
+
+
+class ArchiveCommandTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(username="admin", password="x")
+        cls.old = timezone.now() - timedelta(days=200)
+
+    def soft_delete(self, queryset):
+        queryset.update(is_deleted=True, deleted_at=self.old)
+
+    def test_audit_history_does_not_block_users(self):
+        user = User.objects.create_user(username="gone", password="x")
+        by_user = AuditLog.objects.create(action="UPDATE", entity="User", performed_by=user)
+        about_user = AuditLog.objects.create(action="DELETE", entity="User", performed_by=self.admin, target_user=user)
+        self.soft_delete(User.all_objects.filter(pk=user.pk))
+
+        result = ArchiveCommand.Archive(['users.User'], older_than_days=90)
+
+        self.assertEqual(result.status_code, HTTPStatus.OK)
+        self.assertEqual(result.data['users.User'], {'archived': 1, 'skipped': 0})
+        self.assertFalse(User.all_objects.filter(pk=user.pk).exists())
+        # The history is kept, unlinked from the archived row
+        by_user.refresh_from_db()
+        about_user.refresh_from_db()
+        self.assertIsNone(by_user.performed_by_id)
+        self.assertIsNone(about_user.target_user_id)
+        self.assertEqual(about_user.performed_by_id, self.admin.pk)
+
+        result = ArchiveCommand.Restore('users.User', [user.pk])
+
+        self.assertEqual(result.data['restored'], [user.pk])
+        by_user.refresh_from_db()
+        about_user.refresh_from_db()
+        self.assertEqual(by_user.performed_by_id, user.pk)
+        self.assertEqual(about_user.target_user_id, user.pk)
+        self.assertTrue(User.all_objects.get(pk=user.pk).is_deleted)
+
+    def test_live_dependents_block_archiving(self):
+        room_type = RoomType.objects.create(name="Single", base_price="50.00", max_occupancy=1)
+        floor = Floor.objects.create(number=7)
+        Room.objects.create(number="701", floor=floor, room_type=room_type)
+        self.soft_delete(Floor.all_objects.filter(pk=floor.pk))
+
+        result = ArchiveCommand.Archive(['hostel.Floor'], older_than_days=90)
+
+        self.assertEqual(result.data['hostel.Floor'], {'archived': 0, 'skipped': 1})
+        self.assertTrue(Floor.all_objects.filter(pk=floor.pk).exists())
+
+    def test_dependent_missed_by_the_check_only_keeps_its_row(self):
+        kept, gone = RoomType.objects.bulk_create([
+            RoomType(name=name, base_price="50.00", max_occupancy=1) for name in ("Kept", "Gone")
+        ])
+        Room.objects.create(number="801", room_type=kept)
+        self.soft_delete(RoomType.all_objects.filter(pk__in=[kept.pk, gone.pk]))
+
+        # As if the room had been inserted between the check and the delete
+        with mock.patch.object(archive_command, '_without_dependents', lambda queryset: queryset):
+            result = ArchiveCommand.Archive(['hostel.RoomType'], older_than_days=90, batch_size=10)
+
+        self.assertEqual(result.data['hostel.RoomType'], {'archived': 1, 'skipped': 1})
+        self.assertEqual(list(RoomType.all_objects.values_list('pk', flat=True)), [kept.pk])
+        self.assertEqual(list(ArchivedRecord.objects.values_list('object_id', flat=True)), [gone.pk])
+
+    def test_recent_deletes_are_kept(self):
+        floor = Floor.objects.create(number=8)
+        Floor.all_objects.filter(pk=floor.pk).update(is_deleted=True)
+
+        result = ArchiveCommand.Archive(['hostel.Floor'], older_than_days=90)
+
+        self.assertEqual(result.data['hostel.Floor'], {'archived': 0, 'skipped': 0})
+
+    def test_labels_are_checked_before_archiving(self):
+        floor = Floor.objects.create(number=9)
+        self.soft_delete(Floor.all_objects.filter(pk=floor.pk))
+
+        for labels in (['hostel.Floor', 'hostel.Nope'], ['hostel.Floor', 'auth.Group'], ['nope']):
+            with self.subTest(labels):
+                result = ArchiveCommand.Archive(labels, older_than_days=90)
+                self.assertEqual(result.status_code, HTTPStatus.BAD_REQUEST)
+
+        self.assertFalse(ArchivedRecord.objects.exists())
+        self.assertTrue(Floor.all_objects.filter(pk=floor.pk).exists())
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class UserImportCommandTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_group = Group.objects.create(name="Admin")
+        cls.staff_group = Group.objects.create(name="Staff")
+        User.objects.create_user(username="taken", password="x")
+
+    def run_import(self, rows, file_format='jsonl', **kwargs):
+        if file_format == 'jsonl':
+            body = "\n".join(row if isinstance(row, str) else json.dumps(row) for row in rows)
+        else:
+            body = json.dumps(rows)
+        return UserImportCommand.Execute(io.BytesIO(body.encode()), file_format=file_format, **kwargs)
+
+    def row(self, username, groups="Staff", **extra):
+        return {'username': username, 'first_name': "First", 'last_name': "Last",
+                'password': "pw-12345!", 'groups': groups, **extra}
+
+    def test_all_rows_imported(self):
+        result = self.run_import([self.row("amy"), self.row("ben")])
+
+        self.assertEqual(result.status_code, HTTPStatus.CREATED)
+        self.assertEqual(result.data['created'], 2)
+        self.assertTrue(User.objects.get(username="amy").check_password("pw-12345!"))
+
+    def test_row_errors_are_reported_per_row(self):
+        result = self.run_import([self.row("amy"), self.row("taken"), self.row("amy"), self.row("cid", groups="Nope")])
+
+        self.assertEqual(result.status_code, HTTPStatus.MULTI_STATUS)
+        self.assertTrue(result.is_success)
+        self.assertEqual(result.data['created'], 1)
+        self.assertEqual(
+            [(error['row'], error['message']) for error in result.data['errors']],
+            [(2, "Username already exists"), (3, "Duplicate username in file"), (4, "Unknown groups: Nope")],
+        )
+
+    def test_readable_file_without_importable_rows_is_not_a_bad_request(self):
+        result = self.run_import([self.row("taken"), {'username': "x"}], file_format='json')
+
+        self.assertEqual(result.status_code, HTTPStatus.MULTI_STATUS)
+        self.assertEqual((result.data['created'], result.data['failed']), (0, 2))
+
+    def test_broken_file_imports_nothing(self):
+        result = self.run_import([self.row("amy"), self.row("ben"), '{"username": '], batch_size=1)
+
+        self.assertEqual(result.status_code, HTTPStatus.BAD_REQUEST)
+        self.assertEqual(result.data['created'], 0)
+        self.assertFalse(User.objects.filter(username__in=["amy", "ben"]).exists())
+
+    def test_prefix_matches_create(self):
+        self.run_import([self.row("imported", groups="Staff;Admin")])
+        UserCommand.Create("created", "First", "Last", "pw-12345!", [self.staff_group, self.admin_group])
+
+        self.assertEqual(User.objects.get(username="imported").id_number[:3], "ADM")
+        self.assertEqual(User.objects.get(username="created").id_number[:3], "ADM")
+
+
+class BulkFloorRoomTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="bulk", password="x")
+        cls.floors = Floor.objects.bulk_create([Floor(number=number) for number in (1, 2, 3)])
+        cls.room_type = RoomType.objects.create(name="Single", base_price="50.00", max_occupancy=1)
+        cls.rooms = Room.objects.bulk_create([
+            Room(number=number, floor=cls.floors[0], room_type=cls.room_type) for number in ("101", "102", "103")
+        ])
+
+    def floor_numbers(self):
+        return dict(Floor.all_objects.values_list('id', 'number'))
+
+    def room_numbers(self):
+        return dict(Room.all_objects.values_list('id', 'number'))
+
+    def errors(self, result):
+        self.assertEqual(result.status_code, HTTPStatus.BAD_REQUEST)
+        return [(error['index'], error['field']) for error in result.data['errors']]
+
+    def test_bulk_create(self):
+        result = FloorCommand.BulkCreate([{'number': 4}, {'number': 5, 'description': "Roof"}], self.user)
+
+        self.assertEqual(result.status_code, HTTPStatus.CREATED)
+        self.assertEqual([floor['number'] for floor in result.data], [4, 5])
+
+    def test_bulk_create_errors(self):
+        result = FloorCommand.BulkCreate([{'number': 4}, {'number': 1}, {'number': 4}], self.user)
+
+        self.assertEqual(self.errors(result), [(1, 'number'), (2, 'number')])
+        self.assertFalse(Floor.all_objects.filter(number=4).exists())
+
+    def test_bulk_update(self):
+        a, b, _ = self.floors
+        result = FloorCommand.BulkUpdate([{'id': a.id, 'number': 7}, {'id': b.id, 'description': "Top"}], self.user)
+
+        self.assertEqual(result.status_code, HTTPStatus.OK)
+        self.assertEqual(Floor.objects.get(id=a.id).number, 7)
+        self.assertEqual(Floor.objects.get(id=b.id).description, "Top")
+
+    def test_floor_numbers_can_be_swapped(self):
+        a, b, c = self.floors
+        result = FloorCommand.BulkUpdate([{'id': a.id, 'number': 2}, {'id': b.id, 'number': 1}], self.user)
+
+        self.assertEqual(result.status_code, HTTPStatus.OK, result.message)
+        self.assertEqual(self.floor_numbers(), {a.id: 2, b.id: 1, c.id: 3})
+
+    def test_floor_numbers_can_be_rotated(self):
+        a, b, c = self.floors
+        result = FloorCommand.BulkUpdate(
+            [{'id': a.id, 'number': 2}, {'id': b.id, 'number': 3}, {'id': c.id, 'number': 4}], self.user
+        )
+
+        self.assertEqual(result.status_code, HTTPStatus.OK, result.message)
+        self.assertEqual(self.floor_numbers(), {a.id: 2, b.id: 3, c.id: 4})
+
+    def test_room_numbers_can_be_swapped(self):
+        a, b, c = self.rooms
+        result = RoomCommand.BulkUpdate(
+            [{'id': a.id, 'number': "102"}, {'id': b.id, 'number': "101", 'status': "MAINTENANCE"}], self.user
+        )
+
+        self.assertEqual(result.status_code, HTTPStatus.OK, result.message)
+        self.assertEqual(self.room_numbers(), {a.id: "102", b.id: "101", c.id: "103"})
+        self.assertEqual(Room.objects.get(id=b.id).status, "MAINTENANCE")
+
+    def test_bulk_update_errors(self):
+        a, b, c = self.floors
+        result = FloorCommand.BulkUpdate([
+            {'id': a.id, 'number': 3},      # still held by c, which isn't in the payload
+            {'id': b.id, 'number': 9},
+            {'id': 999, 'number': 8},
+            {'id': b.id},
+        ], self.user)
+
+        self.assertEqual(self.errors(result), [(2, 'id'), (3, 'id')])
+
+        result = FloorCommand.BulkUpdate([{'id': a.id, 'number': 3}, {'id': b.id, 'number': 3}], self.user)
+        self.assertEqual(self.errors(result), [(0, 'number'), (1, 'number'), (1, 'number')])
+        self.assertEqual(self.floor_numbers(), {a.id: 1, b.id: 2, c.id: 3})
+
+    def test_missing_foreign_keys(self):
+        a, _, _ = self.rooms
+        result = RoomCommand.BulkUpdate([{'id': a.id, 'floor': 999}, {'id': a.id, 'room_type': 999}], self.user)
+
+        self.assertEqual(self.errors(result), [(0, 'floor'), (1, 'id'), (1, 'room_type')])
+
+    def test_invalid_items_from_the_view(self):
+        self.user.groups.add(Group.objects.get_or_create(name="Admin")[0])
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        response = client.patch(reverse('floor-bulk-update'), [{'id': self.floors[0].id}, {'number': 5}], format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['data']['errors'], [{'index': 1, 'field': 'id', 'message': "This field is required."}])
+
+
+class UserListConditionalGetTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(username="admin", password="x")
+        cls.admin.groups.add(Group.objects.get_or_create(name="Admin")[0])
+
+    def setUp(self):
+        caches['default'].clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        self.url = reverse('user-list')
+
+    def test_matching_etag_returns_304(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('ETag', response)
+
+        again = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(again.status_code, 304)
+
+    def test_etag_needs_no_user_query(self):
+        etag = self.client.get(self.url)['ETag']
+        # Authentication and the permission check only, not the user table
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_writes_change_the_etag(self):
+        staff = Group.objects.create(name="Staff")
+        etag = self.client.get(self.url)['ETag']
+
+        steps = (
+            lambda: User.objects.create_user(username="new", password="x"),
+            lambda: User.objects.get(username="new").groups.add(staff),
+            lambda: Group.objects.filter(pk=staff.pk).first().save(),
+        )
+        for step in steps:
+            with self.captureOnCommitCallbacks(execute=True):
+                step()
+            new_etag = self.client.get(self.url)['ETag']
+            self.assertNotEqual(new_etag, etag)
+            etag = new_etag
+
+    def test_password_change_keeps_the_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.admin.set_password("y")
+            self.admin.save(update_fields=['password'])
+
+        self.assertEqual(self.client.get(self.url)['ETag'], etag)
+
+    def test_errors_carry_no_validators(self):
+        response = self.client.get(self.url, {'cursor': "garbage"})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertNotIn('ETag', response)
+        self.assertNotIn('Last-Modified', response)
+
+
+class QueueListenerHandlerTests(SimpleTestCase):
+
+    class Capture(logging.Handler):
+        def __init__(self):
+            super().__init__()
+            self.lines = []
+            self.format_threads = []
+
+        def format(self, record):
+            self.format_threads.append(threading.current_thread())
+            return super().format(record)
+
+        def emit(self, record):
+            self.lines.append(self.format(record))
+
+    def test_formatting_runs_on_the_listener_thread(self):
+        target = self.Capture()
+        handler = QueueListenerHandler([target])
+        logger = logging.getLogger("tests.queue_listener")
+        logger.addHandler(handler)
+        logger.propagate = False
+        self.addCleanup(logger.removeHandler, handler)
+
+        items = ["a"]
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logger.exception("Failed with %s", items)
+        # The message is fixed when logged, not when the listener gets to it
+        items.append("b")
+        handler.close()
+
+        self.assertEqual(len(target.lines), 1)
+        self.assertIn("Failed with ['a']", target.lines[0])
+        self.assertIn("ValueError: boom", target.lines[0])
+        self.assertNotIn(threading.current_thread(), target.format_threads)
+
+    def test_prepare_only_merges_args(self):
+        handler = QueueListenerHandler([self.Capture()])
+        self.addCleanup(handler.close)
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = logging.LogRecord("x", logging.ERROR, __file__, 1, "n=%d", (5,), sys.exc_info())
+
+        prepared = handler.prepare(record)
+
+        self.assertEqual((prepared.msg, prepared.args), ("n=5", None))
+        self.assertIs(prepared.exc_info, record.exc_info)
+        self.assertIsNone(prepared.exc_text)
+
+
+class LocalCacheTests(SimpleTestCase):
+
+    def test_lru_eviction(self):
+        cache = LocalCache(max_entries=2)
+        cache.set('a', 1, 60)
+        cache.set('b', 2, 60)
+        cache.get('a')
+        cache.set('c', 3, 60)
+
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_ttl(self):
+        cache = LocalCache()
+        with mock.patch.object(local_cache_module.time, 'monotonic', return_value=100.0):
+            cache.set('a', 1, 10)
+        with mock.patch.object(local_cache_module.time, 'monotonic', return_value=109.0):
+            self.assertEqual(cache.get('a'), 1)
+        with mock.patch.object(local_cache_module.time, 'monotonic', return_value=110.0):
+            self.assertIsNone(cache.get('a'))
+
+    def test_callers_get_their_own_copy(self):
+        cache = LocalCache()
+        page = {'results': [{'id': 1}], 'has_more': False}
+        cache.set('page', page, 60)
+        page['results'].append({'id': 2})
+
+        first = cache.get('page')
+        first['results'][0]['id'] = 99
+
+        self.assertEqual(cache.get('page'), {'results': [{'id': 1}], 'has_more': False})
+
+    def test_set_skipped_after_invalidation(self):
+        cache = LocalCache()
+        generation = cache.generation
+        cache.delete('a')
+        cache.set('a', 'stale', 60, generation=generation)
+
+        self.assertIsNone(cache.get('a'))
+
+
+class InvalidatorTests(SimpleTestCase):
+
+    class StopListening(Exception):
+        pass
+
+    def setUp(self):
+        self.cache = LocalCache()
+        self.invalidator = Invalidator(self.cache)
+
+    def test_handle(self):
+        self.cache.set('a', 1, 60)
+        self.cache.set('b', 2, 60)
+
+        self.invalidator._handle(json.dumps({'origin': self.invalidator.origin, 'keys': ['a']}))
+        self.assertEqual(self.cache.get('a'), 1)
+
+        self.invalidator._handle(json.dumps({'origin': 'other', 'keys': ['a']}))
+        self.assertIsNone(self.cache.get('a'))
+        self.assertEqual(self.cache.get('b'), 2)
+
+        self.invalidator._handle(json.dumps({'origin': 'other', 'clear': True}))
+        self.assertIsNone(self.cache.get('b'))
+
+        self.invalidator._handle(b'not json')
+
+    def listen(self, connection, attempts):
+        """Run the listener until it has slept `attempts` times, return the delays"""
+        delays = []
+
+        def sleep(delay):
+            delays.append(delay)
+            if len(delays) == attempts:
+                raise self.StopListening
+
+        with mock.patch.object(self.invalidator, '_connection', side_effect=connection), \
+                mock.patch.object(local_cache_module.time, 'sleep', side_effect=sleep), \
+                mock.patch.object(local_cache_module, 'CACHE_L1_RECONNECT_MAX_DELAY', 30), \
+                self.assertRaises(self.StopListening):
+            self.invalidator._listen()
+        return delays
+
+    def test_reconnect_backs_off_and_warns_once(self):
+        with self.assertLogs('utils.local_cache', 'WARNING') as logs:
+            delays = self.listen(ConnectionError("Redis is down"), attempts=8)
+
+        self.assertEqual(delays, [1, 2, 4, 8, 16, 30, 30, 30])
+        self.assertEqual(len(logs.records), 1)
+
+    def test_backoff_resets_after_reconnect(self):
+        pubsub = mock.Mock()
+        pubsub.get_message.side_effect = ConnectionError("Connection reset")
+        redis = mock.Mock()
+        redis.pubsub.return_value = pubsub
+        outcomes = [ConnectionError("down"), ConnectionError("down"), redis, ConnectionError("down")]
+
+        with self.assertLogs('utils.local_cache', 'INFO') as logs:
+            delays = self.listen(outcomes, attempts=4)
+
+        # Two failed connects, then a connection that drops: a new outage
+        self.assertEqual(delays, [1, 2, 1, 2])
+        self.assertEqual([record.levelname for record in logs.records], ['WARNING', 'INFO', 'WARNING'])
+        pubsub.close.assert_called_once()
+
+
+class CacheCodecTests(SimpleTestCase):
+    """Round trips through django_redis' encode / decode with the project codecs"""
+
+    def codec_client(self, serializer="utils.cache_codecs.MsgpackSerializer"):
+        return DefaultClient("redis://localhost:6379/0", {'OPTIONS': {
+            'SERIALIZER': serializer,
+            'COMPRESSOR': "utils.cache_codecs.ThresholdZlibCompressor",
+            'COMPRESS_MIN_BYTES': 100,
+        }}, None)
+
+    def test_compression_threshold(self):
+        client = self.codec_client()
+        small = {'id': 1}
+        large = {'results': [{'id': i, 'number': str(i)} for i in range(100)]}
+
+        self.assertEqual(client.encode(small), client._serializer.dumps(small))
+        encoded = client.encode(large)
+        self.assertEqual(zlib.decompress(encoded), client._serializer.dumps(large))
+        self.assertEqual(client.decode(client.encode(small)), small)
+        self.assertEqual(client.decode(encoded), large)
+
+    @unittest.skipUnless(cache_codecs.HAS_MSGPACK, "msgpack is not installed")
+    def test_msgpack_reads_back_like_json(self):
+        client = self.codec_client()
+        json_client = self.codec_client("django_redis.serializers.json.JSONSerializer")
+        value = {
+            'created_at': datetime(2024, 5, 1, 12, 30, tzinfo=dt_timezone.utc),
+            'price': Decimal("99.90"),
+            'pair': (1, 2),
+            'nested': [{'ok': True, 'none': None}],
+        }
+
+        self.assertEqual(client.decode(client.encode(value)), json_client.decode(json_client.encode(value)))
+        self.assertEqual(client.decode(client.encode({1: "int key"})), {1: "int key"})
+
+    def test_json_written_values_still_load(self):
+        json_client = self.codec_client("django_redis.serializers.json.JSONSerializer")
+        value = {'results': [{'id': i} for i in range(50)], 'has_more': False}
+
+        self.assertEqual(self.codec_client().decode(json_client.encode(value)), value)
+
+    def test_without_msgpack_falls_back_to_json(self):
+        client = self.codec_client()
+        json_client = self.codec_client("django_redis.serializers.json.JSONSerializer")
+        value = {'price': Decimal("1.50"), 'items': [1, 2]}
+
+        with mock.patch.object(cache_codecs, 'HAS_MSGPACK', False):
+            encoded = client.encode(value)
+            self.assertEqual(encoded, json_client.encode(value))
+            self.assertEqual(client.decode(encoded), {'price': "1.50", 'items': [1, 2]})
+
+
+class _FakeRedis:
+    """Just enough of redis.Redis for the django_redis client calls under test"""
+
+    def __init__(self):
+        self.data = {}
+        self.hash = {}
+        self.fail = False
+
+    def get(self, key):
+        if self.fail:
+            raise ConnectionError("down")
+        return self.data.get(key)
+
+    def mget(self, *keys):
+        return [self.data.get(key) for key in keys]
+
+    def set(self, key, value, nx=False, px=None, xx=False):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    def delete(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    def pipeline(self, transaction=True):
+        redis, queued = self, []
+
+        class Pipeline:
+            def hincrbyfloat(self, name, field, value):
+                queued.append((field, value))
+
+            def execute(self):
+                if redis.fail:
+                    raise ConnectionError("down")
+                for field, value in queued:
+                    redis.hash[field] = redis.hash.get(field, 0) + value
+
+        return Pipeline()
+
+
+class InstrumentedRedisClientTests(SimpleTestCase):
+
+    def setUp(self):
+        self.redis = _FakeRedis()
+        backend = SimpleNamespace(key_prefix='', version=1, default_timeout=300, key_func=lambda key, prefix, version: key)
+        self.client = cache_metrics.InstrumentedRedisClient("redis://localhost:6379/0", {'OPTIONS': {}}, backend)
+        self.client.get_client = lambda write=True, tried=None, show_index=False: (self.redis, 0) if show_index else self.redis
+        self.metrics = cache_metrics.CacheMetrics()
+        patcher = mock.patch.object(cache_metrics, 'cache_metrics', self.metrics)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_calls_hits_misses_and_bytes_per_namespace(self):
+        self.client.set("hostel:rooms:v1:page", {'results': [1, 2]})
+        self.client.get("hostel:rooms:v1:page")
+        self.client.get("hostel:rooms:v1:other")
+        self.client.get_many(["hostel:floors:v1:a", "hostel:floors:v1:b"])
+        written = len(self.redis.data["hostel:rooms:v1:page"])
+
+        counters = self.metrics.local_snapshot()
+        rooms, floors = counters["hostel:rooms"], counters["hostel:floors"]
+        self.assertEqual((rooms['set_calls'], rooms['get_calls']), (1, 2))
+        self.assertEqual((rooms['hits'], rooms['misses']), (1, 1))
+        self.assertEqual((rooms['bytes_written'], rooms['bytes_read']), (written, written))
+        self.assertEqual((floors['get_many_calls'], floors['misses']), (1, 2))
+        self.assertNotIn('hits', floors)
+
+    def test_nested_calls_count_once(self):
+        self.assertTrue(self.client.add("hostel:rooms:lock", "token"))
+        self.assertFalse(self.client.add("hostel:rooms:lock", "token"))
+
+        counters = self.metrics.local_snapshot()["hostel:rooms"]
+        self.assertEqual(counters['add_calls'], 2)
+        self.assertNotIn('set_calls', counters)
+
+    def test_errors_are_counted_and_raised(self):
+        self.redis.fail = True
+        with self.assertRaises(Exception):
+            self.client.get("hostel:rooms:v1:page")
+
+        self.assertEqual(self.metrics.local_snapshot()["hostel:rooms"]['errors'], 1)
+
+    def test_flush_adds_to_the_shared_hash_and_survives_failures(self):
+        self.client.get("hostel:rooms:v1:page")
+        self.redis.fail = True
+        self.metrics.flush(self.redis)
+        self.assertEqual(self.metrics.local_snapshot()["hostel:rooms"]['get_calls'], 1)
+
+        self.redis.fail = False
+        self.metrics.flush(self.redis)
+        self.assertEqual(self.metrics.local_snapshot(), {})
+        self.assertEqual(self.redis.hash["hostel:rooms|get_calls"], 1)
+
+    def test_summary(self):
+        raw = {"hostel:rooms": {'get_calls': 4, 'hits': 3, 'misses': 1, 'latency_ms_sum': 8,
+                                'latency_le_1': 3, 'latency_le_25': 1}}
+
+        summary = cache_metrics.summarize(raw)["hostel:rooms"]
+
+        self.assertEqual(summary['hit_ratio'], 0.75)
+        self.assertEqual(summary['avg_latency_ms'], 2)
+        self.assertEqual((summary['p50_latency_ms'], summary['p99_latency_ms']), (1, 25))
+
+
+class VersionedNamespaceTests(TestCase):
+
+    namespace = "tests:namespace"
+
+    def setUp(self):
+        GlobalCache.clear()
+
+    def test_missing_version_is_seeded_from_the_clock(self):
+        with mock.patch.object(cache_helper.time, 'time', return_value=1700000000.5):
+            self.assertEqual(GlobalCache.get_version(self.namespace), 1700000000500)
+        # Seeded once, later reads keep it
+        self.assertEqual(GlobalCache.get_version(self.namespace), 1700000000500)
+
+    def test_bump_hides_keys_of_the_old_version(self):
+        for local in (False, True):
+            with self.subTest(local=local):
+                GlobalCache.set("page", {'n': 1}, local=local, namespace=self.namespace)
+                old_key = GlobalCache.versioned_key(self.namespace, "page")
+                self.assertEqual(GlobalCache.get("page", local=local, namespace=self.namespace), {'n': 1})
+
+                version = GlobalCache.get_version(self.namespace)
+                self.assertEqual(GlobalCache.invalidate_namespace(self.namespace), True)
+
+                self.assertEqual(GlobalCache.get_version(self.namespace), version + 1)
+                self.assertNotEqual(GlobalCache.versioned_key(self.namespace, "page"), old_key)
+                self.assertIsNone(GlobalCache.get("page", local=local, namespace=self.namespace))
+
+    def test_bump_without_a_version_key_still_moves_forward(self):
+        version = GlobalCache.get_version(self.namespace)
+        GlobalCache.clear()
+
+        with mock.patch.object(cache_helper.time, 'time', return_value=version / 1000 + 60):
+            self.assertGreater(GlobalCache.bump_version(self.namespace), version)
+
+    def test_versions_bump_on_commit_only(self):
+        other = "tests:other"
+        before = {ns: GlobalCache.get_version(ns) for ns in (self.namespace, other)}
+
+        with self.captureOnCommitCallbacks(execute=True):
+            GlobalCache.bump_versions_on_commit(self.namespace, other)
+            self.assertEqual(GlobalCache.get_version(self.namespace), before[self.namespace])
+
+        self.assertEqual(GlobalCache.get_version(self.namespace), before[self.namespace] + 1)
+        self.assertEqual(GlobalCache.get_version(other), before[other] + 1)
+
+    def test_rolled_back_writes_keep_the_version(self):
+        version = GlobalCache.get_version(self.namespace)
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            try:
+                with transaction.atomic():
+                    GlobalCache.bump_versions_on_commit(self.namespace)
+                    raise RuntimeError("rollback")
+            except RuntimeError:
+                pass
+
+        self.assertEqual(callbacks, [])
+        self.assertEqual(GlobalCache.get_version(self.namespace), version)
+
+
+class GetOrComputeTests(SimpleTestCase):
+    """Stampede protection: XFetch, the add() lock, the bounded wait and the stale fallback"""
+
+    key = "tests:compute"
+
+    def setUp(self):
+        GlobalCache.clear()
+        self.backend = cache_helper._cache_for(self.key)
+        self.calls = 0
+
+    def compute(self, value="fresh"):
+        def fn():
+            self.calls += 1
+            return value
+        return fn
+
+    def store(self, value, expires_in, delta=1.0):
+        self.backend.set(self.key, {'value': value, 'delta': delta, 'expires_at': time.time() + expires_in}, 600)
+
+    def stat_change(self, before, name):
+        return GlobalCache.stats()['compute'][name] - before[name]
+
+    def test_miss_computes_once_then_hits(self):
+        self.assertEqual(GlobalCache.get_or_compute(self.key, self.compute(), ttl=60), "fresh")
+        self.assertEqual(GlobalCache.get_or_compute(self.key, self.compute("other"), ttl=60), "fresh")
+        self.assertEqual(self.calls, 1)
+        self.assertFalse(self.backend.has_key(f"{self.key}:lock"))
+
+    def test_xfetch_refreshes_early_near_expiry(self):
+        self.store("old", expires_in=5, delta=1.0)
+        # -log(1 - r) grows with r: 0.0 adds no jitter, 0.999 adds ~6.9 * delta
+        with mock.patch.object(cache_helper.random, 'random', return_value=0.0):
+            self.assertEqual(GlobalCache.get_or_compute(self.key, self.compute()), "old")
+        with mock.patch.object(cache_helper.random, 'random', return_value=0.999):
+            self.assertEqual(GlobalCache.get_or_compute(self.key, self.compute()), "fresh")
+        self.assertEqual(self.calls, 1)
+
+    def test_early_refresh_in_progress_serves_current_value(self):
+        self.store("old", expires_in=5)
+        self.backend.add(f"{self.key}:lock", "other worker", 30)
+
+        with mock.patch.object(cache_helper.random, 'random', return_value=0.999):
+            self.assertEqual(GlobalCache.get_or_compute(self.key, self.compute()), "old")
+        self.assertEqual(self.calls, 0)
+
+    def test_expired_value_waits_for_the_lock_holder(self):
+        self.store("old", expires_in=-1)
+        self.backend.add(f"{self.key}:lock", "other worker", 30)
+        before = GlobalCache.stats()['compute']
+
+        # The other worker stores its result while we poll
+        with mock.patch.object(cache_helper.time, 'sleep', side_effect=lambda _: self.store("new", 60)):
+            self.assertEqual(GlobalCache.get_or_compute(self.key, self.compute(), wait_timeout=5), "new")
+        self.assertEqual(self.calls, 0)
+        self.assertEqual(self.stat_change(before, 'wait_satisfied'), 1)
+
+    def test_wait_is_bounded_then_stale_value_is_served(self):
+        self.store("old", expires_in=-1)
+        self.backend.add(f"{self.key}:lock", "other worker", 30)
+        before = GlobalCache.stats()['compute']
+
+        clock = iter(range(0, 100))
+        with mock.patch.object(cache_helper.time, 'monotonic', side_effect=lambda: float(next(clock))), \
+                mock.patch.object(cache_helper.time, 'sleep') as sleep:
+            self.assertEqual(GlobalCache.get_or_compute(self.key, self.compute(), wait_timeout=3), "old")
+
+        self.assertEqual(self.calls, 0)
+        # Deadline at t=3: polls at t=1 and t=2, gives up at t=3
+        self.assertEqual(sleep.call_count, 2)
+        self.assertEqual(self.stat_change(before, 'stale_served'), 1)
+
+    def test_nothing_cached_and_lock_held_computes_anyway(self):
+        self.backend.add(f"{self.key}:lock", "other worker", 30)
+
+        with mock.patch.object(cache_helper.time, 'sleep'):
+            self.assertEqual(GlobalCache.get_or_compute(self.key, self.compute(), wait_timeout=0), "fresh")
+        self.assertEqual(self.calls, 1)
+
+    def test_only_one_concurrent_caller_recomputes(self):
+        self.store("old", expires_in=-1)
+        started = threading.Barrier(6)
+        results = []
+
+        def slow_compute():
+            self.calls += 1
+            time.sleep(0.2)
+            return "new"
+
+        def call():
+            started.wait()
+            results.append(GlobalCache.get_or_compute(self.key, slow_compute, wait_timeout=5))
+
+        threads = [threading.Thread(target=call) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(results, ["new"] * 6)
+
+
+class GlobalCacheBatchTests(SimpleTestCase):
+    """get_many / set_many / delete_many must agree with the single-key calls"""
+
+    def setUp(self):
+        GlobalCache.clear()
+
+    def test_batch_matches_single_key_calls(self):
+        data = {'a': {'n': 1}, 'b': [1, 2], 'hostel:rooms:c': "routed to its own alias"}
+        GlobalCache.set_many(data)
+
+        self.assertEqual(GlobalCache.get_many(['a', 'b', 'hostel:rooms:c', 'missing']), data)
+        for key, value in data.items():
+            self.assertEqual(GlobalCache.get(key), value)
+
+    def test_keys_go_to_their_namespace_alias(self):
+        GlobalCache.set_many({'hostel:rooms:x': 1, 'plain': 2})
+
+        self.assertEqual(caches['msgpack'].get('hostel:rooms:x'), 1)
+        self.assertIsNone(caches['default'].get('hostel:rooms:x'))
+        self.assertEqual(caches['default'].get('plain'), 2)
+
+    def test_one_backend_call_per_alias(self):
+        GlobalCache.set_many({f"k{i}": i for i in range(10)})
+        backend = caches['default']
+
+        with mock.patch.object(backend, 'get_many', wraps=backend.get_many) as get_many:
+            found = GlobalCache.get_many([f"k{i}" for i in range(10)])
+
+        self.assertEqual(len(found), 10)
+        get_many.assert_called_once()
+
+    def test_namespace(self):
+        GlobalCache.set_many({'a': 1, 'b': 2}, namespace='tests:batch')
+        self.assertEqual(GlobalCache.get_many(['a', 'b'], namespace='tests:batch'), {'a': 1, 'b': 2})
+        self.assertEqual(GlobalCache.get('a', namespace='tests:batch'), 1)
+        self.assertEqual(GlobalCache.get_many(['a', 'b']), {})
+
+        GlobalCache.bump_version('tests:batch')
+
+        self.assertEqual(GlobalCache.get_many(['a', 'b'], namespace='tests:batch'), {})
+
+    def test_delete_many(self):
+        GlobalCache.set_many({'a': 1, 'b': 2, 'c': 3}, namespace='tests:batch')
+
+        GlobalCache.delete_many(['a', 'b'], namespace='tests:batch')
+
+        self.assertEqual(GlobalCache.get_many(['a', 'b', 'c'], namespace='tests:batch'), {'c': 3})
+
+    @unittest.skipUnless(CACHE_L1_ENABLED, "L1 cache is disabled")
+    def test_local_tier(self):
+        GlobalCache.set_many({'a': 1, 'b': 2}, local=True)
+        caches['default'].delete('a')
+
+        # Served from L1 although Redis lost it
+        self.assertEqual(GlobalCache.get_many(['a', 'b'], local=True), {'a': 1, 'b': 2})
+
+        GlobalCache.delete_many(['a', 'b'])
+
+        self.assertEqual(GlobalCache.get_many(['a', 'b'], local=True), {})
+        self.assertIsNone(GlobalCache.get('a', local=True))
+
+    def test_empty_batches(self):
+        GlobalCache.set_many({})
+        GlobalCache.delete_many([])
+        self.assertEqual(GlobalCache.get_many([]), {})
+
+
+@unittest.skipUnless(metrics.HAS_PROMETHEUS, "prometheus_client is not installed")
+class MetricsViewTests(SimpleTestCase):
+
+    def scrape(self, token=None, networks=(), **headers):
+        with mock.patch.object(metrics, 'METRICS_AUTH_TOKEN', token), \
+                mock.patch.object(metrics, 'METRICS_ALLOWED_NETWORKS', [ipaddress.ip_network(n) for n in networks]), \
+                mock.patch.object(metrics, '_registry', return_value=metrics.CollectorRegistry()):
+            return self.client.get('/metrics', **headers).status_code
+
+    def test_closed_without_configuration(self):
+        self.assertEqual(self.scrape(), 403)
+
+    def test_token(self):
+        self.assertEqual(self.scrape(token="s3cret"), 401)
+        self.assertEqual(self.scrape(token="s3cret", HTTP_AUTHORIZATION="Bearer nope"), 401)
+        self.assertEqual(self.scrape(token="s3cret", HTTP_AUTHORIZATION="Bearer s3cret"), 200)
+
+    def test_allowed_networks(self):
+        self.assertEqual(self.scrape(networks=["10.0.0.0/8"], REMOTE_ADDR="10.1.2.3"), 200)
+        self.assertEqual(self.scrape(networks=["10.0.0.0/8"], REMOTE_ADDR="203.0.113.5"), 403)
+
+    def test_failed_publish_leaves_nothing_behind(self):
+        metrics._before_publish(sender="task", headers={'id': "lost"})
+        metrics._before_publish(sender="task", headers={'id': "sent"})
+        metrics._after_publish(sender="task", headers={'id': "sent"})
+
+        self.assertIsNone(metrics._publish_started.entry)
+        # after_task_publish of the lost publish never comes; a late one is ignored
+        metrics._after_publish(sender="task", headers={'id': "lost"})
+        self.assertIsNone(metrics._publish_started.entry)
+
+    def test_one_broker_client(self):
+        self.assertIs(metrics._broker_client("redis://localhost:6379/0"), metrics._broker_client("redis://localhost:6379/0"))
+
+
+class PublishSpanTests(SimpleTestCase):
+
+    def test_failed_publish_is_not_left_open(self):
+        with mock.patch.object(tracing, 'export'), tracing.trace("test", sample_rate=1) as root:
+            # The first publish raises, so only before_task_publish is sent
+            tracing._start_publish_span(sender="task", headers={'id': "lost"})
+            self.assertIs(tracing.current_span(), root)
+            tracing._start_publish_span(sender="task", headers={'id': "sent"})
+            tracing._end_publish_span(sender="task", headers={'id': "sent"})
+
+        lost, sent = root.trace.spans[1:]
+        self.assertEqual(lost.error, "Task was not published")
+        self.assertIsNotNone(sent.end_ns)
+        self.assertIsNone(sent.error)
+        self.assertIs(sent.parent, root)
+        self.assertIsNone(tracing._publish_span.entry)
+
+
+class AbandonedSpanTests(SimpleTestCase):
+    """An OperationLogger whose command raised before success() / fail()"""
+
+    def test_parent_span_closes_it(self):
+        with mock.patch.object(tracing, 'export'), tracing.trace("test", sample_rate=1) as root:
+            with tracing.span("view"):
+                OperationLogger("RoomCommand.Create").start()
+            self.assertIs(tracing.current_span(), root)
+            with tracing.span("render.json") as render:
+                pass
+
+        operation = root.trace.spans[2]
+        self.assertEqual(operation.name, "RoomCommand.Create")
+        self.assertEqual(operation.error, "Span was never ended")
+        self.assertIs(render.parent, root)
+
+    def test_trace_end_closes_it(self):
+        with mock.patch.object(tracing, 'export') as export, tracing.trace("test", sample_rate=1) as root:
+            OperationLogger("RoomCommand.Create").start()
+
+        self.assertIsNone(tracing.current_span())
+        self.assertTrue(all(span.end_ns is not None for span in root.trace.spans))
+        self.assertIsNone(root.error)
+        export.assert_called_once_with(root.trace)
+
+    def test_ended_operations_are_untouched(self):
+        with mock.patch.object(tracing, 'export'), tracing.trace("test", sample_rate=1) as root:
+            with OperationLogger("RoomCommand.Create"):
+                pass
+
+        self.assertIsNone(root.trace.spans[1].error)
+
+    def test_exporters_must_implement_export(self):
+        with self.assertRaises(TypeError):
+            tracing._BackgroundExporter()
+
+
+class ProfilingRateLimitTests(SimpleTestCase):
+
+    def test_cache_errors_mean_no_profiling(self):
+        for method in ('add', 'incr'):
+            with self.subTest(method), \
+                    mock.patch.object(profiling.cache, method, side_effect=ConnectionError("cache down")), \
+                    mock.patch.object(profiling, 'SamplingProfiler') as profiler:
+                with self.assertRaises(profiling.RateLimited):
+                    with profiling.profile('sample', "GET /"):
+                        pass
+                profiler.assert_not_called()
+
+        # The session slot was given back
+        self.assertTrue(profiling._sessions.acquire(blocking=False))
+        profiling._sessions.release()
+
+    def test_window_limit(self):
+        with mock.patch.object(profiling.cache, 'incr', return_value=profiling.PROFILE_MAX_PER_MINUTE + 1):
+            with self.assertRaises(profiling.RateLimited):
+                profiling._take_rate_slot()
+
+
+class RequestContextTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = User.objects.create_user(username="alice", password="x")
+        cls.bob = User.objects.create_user(username="bob", password="x")
+
+    def test_threads_do_not_see_each_others_user(self):
+        start = threading.Barrier(2)
+        seen = {}
+
+        def act_as(user):
+            with user_context(user):
+                start.wait()  # both users are bound before either reads
+                seen[user.username] = get_current_username()
+
+        threads = [threading.Thread(target=act_as, args=(user,)) for user in (self.alice, self.bob)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(seen, {"alice": "alice", "bob": "bob"})
+        self.assertEqual(get_current_username(), "System")
+
+    def test_context_thread_pool_executor_carries_the_user(self):
+        with user_context(self.alice):
+            with ContextThreadPoolExecutor(max_workers=1) as executor:
+                self.assertEqual(executor.submit(get_current_username).result(), "alice")
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                self.assertEqual(executor.submit(get_current_username).result(), "System")
+
+    def publish(self):
+        headers = {}
+        request_context_module._publish_current_user(headers=headers)
+        return headers.get(request_context_module.CURRENT_USER_HEADER)
+
+    def test_celery_header_round_trip(self):
+        with request_context(SimpleNamespace(user=self.alice)):
+            header = self.publish()
+        self.assertEqual(header, {'id': self.alice.pk, 'username': "alice"})
+        self.assertIsNone(self.publish())
+
+        # The worker binds the header's user for the task and unbinds it afterwards
+        task = SimpleNamespace(request=SimpleNamespace(current_user=header))
+        request_context_module._bind_task_user(task_id="t1", task=task)
+        self.assertEqual(get_current_username(), "alice")
+        with self.assertNumQueries(1):
+            self.assertEqual(get_current_user(), self.alice)
+        # A task published from inside the task carries the same user on
+        self.assertEqual(self.publish(), header)
+        request_context_module._unbind_task_user(task_id="t1", task=task)
+
+        self.assertEqual(get_current_username(), "System")
+        self.assertIsNone(get_current_user())
+
+    def test_task_without_header_keeps_the_callers_user(self):
+        task = SimpleNamespace(request=SimpleNamespace(current_user=None))
+        with user_context(self.bob):
+            request_context_module._bind_task_user(task_id="t2", task=task)
+            self.assertEqual(get_current_username(), "bob")
+            request_context_module._unbind_task_user(task_id="t2", task=task)
+            self.assertEqual(get_current_username(), "bob")
+
+
+class SlowQuerySummaryTests(SimpleTestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "slow_queries.log")
+        slow_queries._rotated_cache.clear()
+        self.addCleanup(slow_queries._rotated_cache.clear)
+
+    def entry(self, shape, duration_ms):
+        return json.dumps({'fingerprint': shape, 'duration_ms': duration_ms, 'sql': shape}) + "\n"
+
+    def write_rotated(self, number, *lines):
+        with gzip.open(f"{self.path}.{number}.gz", 'wt', encoding='utf-8') as f:
+            f.writelines(lines)
+
+    def rotate(self, *lines):
+        # What CompressedRotatingFileHandler does: shift the numbers up, gzip the live log as .1
+        rotated = [name for name in os.listdir(os.path.dirname(self.path)) if name.endswith(".gz")]
+        for number in sorted((int(name.rsplit(".", 2)[-2]) for name in rotated), reverse=True):
+            os.rename(f"{self.path}.{number}.gz", f"{self.path}.{number + 1}.gz")
+        self.write_rotated(1, *lines)
+
+    def summarize(self, rotated_files=2):
+        with mock.patch.object(slow_queries.gzip, 'open', wraps=gzip.open) as opened:
+            summary = slow_queries.summarize(path=self.path, rotated_files=rotated_files)
+        return {group['fingerprint']: group['count'] for group in summary}, opened.call_count
+
+    def test_reads_only_the_newest_rotated_files(self):
+        for number in (1, 2, 3, 4):
+            self.write_rotated(number, self.entry("SELECT ?", 10), self.entry(f"file {number}", 10))
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write(self.entry("SELECT ?", 10))
+
+        counts, opened = self.summarize(rotated_files=2)
+
+        self.assertEqual(counts, {"SELECT ?": 3, "file 1": 1, "file 2": 1})
+        self.assertEqual(opened, 2)
+        self.assertEqual(self.summarize(rotated_files=0)[0], {"SELECT ?": 1})
+
+    def test_rotated_files_are_decompressed_once(self):
+        self.rotate(self.entry("SELECT ?", 10))
+        self.rotate(self.entry("SELECT ?", 20), self.entry("UPDATE ?", 5))
+        self.assertEqual(self.summarize(), ({"SELECT ?": 2, "UPDATE ?": 1}, 2))
+        self.assertEqual(self.summarize(), ({"SELECT ?": 2, "UPDATE ?": 1}, 0))
+
+        # After a rotation only the new file is read; the oldest falls out of the window
+        self.rotate(self.entry("DELETE ?", 1))
+        self.assertEqual(self.summarize(), ({"SELECT ?": 1, "UPDATE ?": 1, "DELETE ?": 1}, 1))
+        self.assertEqual(len(slow_queries._rotated_cache), 2)
+
+    def test_cached_totals_are_not_changed_by_the_summary(self):
+        self.rotate(self.entry("SELECT ?", 10), self.entry("SELECT ?", 20))
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write(self.entry("SELECT ?", 30))
+
+        for _ in range(2):
+            [group] = slow_queries.summarize(path=self.path)
+            self.assertEqual((group['count'], group['total_ms'], group['max_ms']), (3, 60, 30))
+
+
+class SlowQueryWrapperTests(SimpleTestCase):
+
+    def setUp(self):
+        self.wrappers = list(connection.execute_wrappers)
+        connection.execute_wrappers[:] = [w for w in self.wrappers if w is not slow_queries.slow_query_wrapper]
+
+    def tearDown(self):
+        connection.execute_wrappers[:] = self.wrappers
+
+    def test_connection_opened_inside_an_execute_wrapper_block(self):
+        def request_wrapper(execute, sql, params, many, context):
+            return execute(sql, params, many, context)
+
+        with execute_wrapper(request_wrapper):
+            # What connection_created does when the first query of a request connects
+            slow_queries._install_on(None, connection)
+
+        # The block removed its own wrapper, not the slow query one
+        self.assertEqual(connection.execute_wrappers, [slow_queries.slow_query_wrapper])
+
+    def test_installed_once(self):
+        slow_queries._install_on(None, connection)
+        slow_queries._install_on(None, connection)
+
+        self.assertEqual(connection.execute_wrappers.count(slow_queries.slow_query_wrapper), 1)
@@ -7,7 +7,9 @@ urlpatterns = [
         "admin/",
         include(
             [
+                path("list/", UserListViewAPI.as_view(), name="user-list"),
                 path("create/", UserCreateViewAPI.as_view()),
+                path("import/", UserImportViewAPI.as_view(), name="user-import"),
                 path("change-password/", ChangeUserPasswordViewAPI.as_view()),
                 path("update/<int:user_id>/", UpdateUserViewAPI.as_view()),
                 path("delete/<int:user_id>/", ToggleDeleteUserViewAPI.as_view()),
@@ -29,6 +31,8 @@ urlpatterns = [
         include(
             [
                 path("create/", FloorCreateAPIView.as_view(), name='floor-create'),
+                path("bulk-create/", FloorBulkCreateAPIView.as_view(), name='floor-bulk-create'),
+                path("bulk-update/", FloorBulkUpdateAPIView.as_view(), name='floor-bulk-update'),
                 path("list/", FloorListAPIView.as_view(), name='floor-list'),
                 path("<int:floor_id>/", FloorDetailAPIView.as_view(), name='floor-detail'),
                 path("<int:floor_id>/update/", FloorUpdateAPIView.as_view(), name='floor-update'),
@@ -55,6 +59,8 @@ urlpatterns = [
         include(
             [
                 path("create/", RoomCreateAPIView.as_view(), name='room-create'),
+                path("bulk-create/", RoomBulkCreateAPIView.as_view(), name='room-bulk-create'),
+                path("bulk-update/", RoomBulkUpdateAPIView.as_view(), name='room-bulk-update'),
                 path("list/", RoomListAPIView.as_view(), name='room-list'),
                 path("<int:room_id>/", RoomDetailAPIView.as_view(), name='room-detail'),
                 path("<int:room_id>/update/", RoomUpdateAPIView.as_view(), name='room-update'),
@@ -62,4 +68,16 @@ urlpatterns = [
             ]
         )
     ),
+    # System / operational endpoints
+    path(
+        "system/",
+        include(
+            [
+                path("cache-metrics/", CacheMetricsAPIView.as_view(), name='system-cache-metrics'),
+                path("slow-queries/", SlowQueriesAPIView.as_view(), name='system-slow-queries'),
+                path("profiles/", ProfileListAPIView.as_view(), name='system-profile-list'),
+                path("profiles/<str:name>/", ProfileDownloadAPIView.as_view(), name='system-profile-download'),
+            ]
+        )
+    ),
 ]
\ No newline at end of file
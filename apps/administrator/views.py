@@ -1,3 +1,4 @@
+from django.http import FileResponse
 from django.shortcuts import render
 from rest_framework import generics
 from django.contrib.auth import get_user_model
@@ -8,16 +9,25 @@ from apps.administrator.BBL.Commands.hotel_command import HotelCommand
 from apps.administrator.BBL.Commands.floor_command import FloorCommand
 from apps.administrator.BBL.Commands.room_type_command import RoomTypeCommand
 from apps.administrator.BBL.Commands.room_command import RoomCommand
+from apps.administrator.BBL.Queries.system_query import SystemQuery
 from apps.administrator.serializers import *
-from apps.hostel.serializers import FloorSerializer, RoomTypeSerializer, RoomSerializer
+from apps.hostel.serializers import (
+    FloorSerializer, RoomTypeSerializer, RoomSerializer,
+    FloorBulkCreateSerializer, FloorBulkUpdateSerializer, RoomBulkCreateSerializer, RoomBulkUpdateSerializer
+)
 from apps.hostel.BBL.Queries.dashboard_query import DashboardQuery
 from apps.hostel.BBL.Queries.floor_query import FloorQuery
 from apps.hostel.BBL.Queries.room_type_query import RoomTypeQuery
 from apps.hostel.BBL.Queries.room_query import RoomQuery
 from utils.permissions import IsAdminPermission
+from utils.bulk import BULK_MAX_ITEMS, invalid_items_result, serializer_item_errors
+from utils.conditional import conditional_get, namespace_etag
+from utils.enums import CacheKeys
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from apps.administrator.BBL.Commands.user_command import UserCommand
+from apps.administrator.BBL.Commands.user_import_command import UserImportCommand
+from apps.users.BBL.Queries.user_command import UserCommand as UserQueryCommand
 from rest_framework import status
 # Create your views here.
 
@@ -39,6 +49,42 @@ class UserCreateViewAPI(generics.GenericAPIView):
         )
         
         return Response(result.to_dict(), status=result.status_code)
+
+
+@conditional_get(etag_func=namespace_etag(CacheKeys.USERS.value))
+class UserListViewAPI(generics.GenericAPIView):
+    permission_classes = [IsAuthenticated, IsAdminPermission]
+    
+    def get(self, request, *args, **kwargs):
+        params = request.query_params
+        result = UserQueryCommand.List(
+            group=params.get('group'),
+            is_active=params.get('active'),
+            is_deleted=params.get('deleted'),
+            search=params.get('search'),
+            cursor=params.get('cursor'),
+            page_size=params.get('page_size'),
+            fields=params.get('fields')
+        )
+        return Response(result.to_dict(), status=result.status_code)
+
+
+class UserImportViewAPI(generics.GenericAPIView):
+    permission_classes = [IsAuthenticated, IsAdminPermission]
+    serializer_class = UserImportSerializer
+    
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        if not serializer.is_valid():
+            return Response({"success": False, "message": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+        
+        result = UserImportCommand.Execute(
+            file_obj=serializer.validated_data['file'],
+            file_format=serializer.validated_data.get('format'),
+            performed_by=request.user,
+            batch_size=serializer.validated_data.get('batch_size')
+        )
+        return Response(result.to_dict(), status=result.status_code)
     
 
 
@@ -120,6 +166,44 @@ class DashboardAPIView(APIView):
         return Response(result.to_dict(), status=result.status_code)
 
 
+class CacheMetricsAPIView(APIView):
+    permission_classes = [IsAuthenticated, IsAdminPermission]
+    
+    def get(self, request):
+        result = SystemQuery.GetCacheMetrics()
+        return Response(result.to_dict(), status=result.status_code)
+
+
+class SlowQueriesAPIView(APIView):
+    permission_classes = [IsAuthenticated, IsAdminPermission]
+    
+    def get(self, request):
+        try:
+            limit = int(request.query_params.get('limit', 20))
+        except ValueError:
+            limit = 20
+        result = SystemQuery.GetSlowQueries(limit=max(1, min(limit, 100)))
+        return Response(result.to_dict(), status=result.status_code)
+
+
+class ProfileListAPIView(APIView):
+    permission_classes = [IsAuthenticated, IsAdminPermission]
+    
+    def get(self, request):
+        result = SystemQuery.GetProfiles()
+        return Response(result.to_dict(), status=result.status_code)
+
+
+class ProfileDownloadAPIView(APIView):
+    permission_classes = [IsAuthenticated, IsAdminPermission]
+    
+    def get(self, request, name):
+        result = SystemQuery.GetProfilePath(name)
+        if not result.is_success:
+            return Response(result.to_dict(), status=result.status_code)
+        return FileResponse(open(result.data, 'rb'), as_attachment=True, filename=name)
+
+
 class FloorCreateAPIView(generics.GenericAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = FloorSerializer
@@ -144,35 +228,52 @@ class FloorUpdateAPIView(generics.GenericAPIView):
         return Response({"success": False, "message": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
 
 
+class FloorBulkCreateAPIView(generics.GenericAPIView):
+    permission_classes = [IsAuthenticated]
+    serializer_class = FloorBulkCreateSerializer
+    
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data, many=True, allow_empty=False, max_length=BULK_MAX_ITEMS)
+        if not serializer.is_valid():
+            result = invalid_items_result(serializer_item_errors(serializer.errors))
+            return Response(result.to_dict(), status=result.status_code)
+        result = FloorCommand.BulkCreate(serializer.validated_data, request.user)
+        return Response(result.to_dict(), status=result.status_code)
+
+
+class FloorBulkUpdateAPIView(generics.GenericAPIView):
+    permission_classes = [IsAuthenticated]
+    serializer_class = FloorBulkUpdateSerializer
+    
+    def patch(self, request):
+        serializer = self.get_serializer(data=request.data, many=True, allow_empty=False, max_length=BULK_MAX_ITEMS)
+        if not serializer.is_valid():
+            result = invalid_items_result(serializer_item_errors(serializer.errors))
+            return Response(result.to_dict(), status=result.status_code)
+        result = FloorCommand.BulkUpdate(serializer.validated_data, request.user)
+        return Response(result.to_dict(), status=result.status_code)
+
+
+@conditional_get(etag_func=namespace_etag(CacheKeys.FLOORS.value))
 class FloorListAPIView(generics.GenericAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = FloorSerializer
     
     def get(self, request):
-        result = FloorQuery.GetAll()
-        if result.success:
-            serializer = self.get_serializer(result.data, many=True)
-            return Response({
-                "success": result.success,
-                "message": result.message,
-                "data": serializer.data
-            }, status=result.status_code)
+        result = FloorQuery.GetAll(
+            cursor=request.query_params.get('cursor'),
+            page_size=request.query_params.get('page_size')
+        )
         return Response(result.to_dict(), status=result.status_code)
 
 
+@conditional_get(etag_func=namespace_etag(CacheKeys.FLOORS.value))
 class FloorDetailAPIView(generics.GenericAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = FloorSerializer
     
     def get(self, request, floor_id):
         result = FloorQuery.GetById(floor_id)
-        if result.success:
-            serializer = self.get_serializer(result.data)
-            return Response({
-                "success": result.success,
-                "message": result.message,
-                "data": serializer.data
-            }, status=result.status_code)
         return Response(result.to_dict(), status=result.status_code)
 
 
@@ -208,35 +309,26 @@ class RoomTypeUpdateAPIView(generics.GenericAPIView):
         return Response({"success": False, "message": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
 
 
+@conditional_get(etag_func=namespace_etag(CacheKeys.ROOM_TYPES.value))
 class RoomTypeListAPIView(generics.GenericAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = RoomTypeSerializer
     
     def get(self, request):
-        result = RoomTypeQuery.GetAll()
-        if result.success:
-            serializer = self.get_serializer(result.data, many=True)
-            return Response({
-                "success": result.success,
-                "message": result.message,
-                "data": serializer.data
-            }, status=result.status_code)
+        result = RoomTypeQuery.GetAll(
+            cursor=request.query_params.get('cursor'),
+            page_size=request.query_params.get('page_size')
+        )
         return Response(result.to_dict(), status=result.status_code)
 
 
+@conditional_get(etag_func=namespace_etag(CacheKeys.ROOM_TYPES.value))
 class RoomTypeDetailAPIView(generics.GenericAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = RoomTypeSerializer
     
     def get(self, request, room_type_id):
         result = RoomTypeQuery.GetById(room_type_id)
-        if result.success:
-            serializer = self.get_serializer(result.data)
-            return Response({
-                "success": result.success,
-                "message": result.message,
-                "data": serializer.data
-            }, status=result.status_code)
         return Response(result.to_dict(), status=result.status_code)
 
 
@@ -272,35 +364,56 @@ class RoomUpdateAPIView(generics.GenericAPIView):
         return Response({"success": False, "message": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
 
 
+class RoomBulkCreateAPIView(generics.GenericAPIView):
+    permission_classes = [IsAuthenticated]
+    serializer_class = RoomBulkCreateSerializer
+    
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data, many=True, allow_empty=False, max_length=BULK_MAX_ITEMS)
+        if not serializer.is_valid():
+            result = invalid_items_result(serializer_item_errors(serializer.errors))
+            return Response(result.to_dict(), status=result.status_code)
+        result = RoomCommand.BulkCreate(serializer.validated_data, request.user)
+        return Response(result.to_dict(), status=result.status_code)
+
+
+class RoomBulkUpdateAPIView(generics.GenericAPIView):
+    permission_classes = [IsAuthenticated]
+    serializer_class = RoomBulkUpdateSerializer
+    
+    def patch(self, request):
+        serializer = self.get_serializer(data=request.data, many=True, allow_empty=False, max_length=BULK_MAX_ITEMS)
+        if not serializer.is_valid():
+            result = invalid_items_result(serializer_item_errors(serializer.errors))
+            return Response(result.to_dict(), status=result.status_code)
+        result = RoomCommand.BulkUpdate(serializer.validated_data, request.user)
+        return Response(result.to_dict(), status=result.status_code)
+
+
+@conditional_get(etag_func=namespace_etag(CacheKeys.ROOMS.value))
 class RoomListAPIView(generics.GenericAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = RoomSerializer
     
     def get(self, request):
-        result = RoomQuery.GetAll()
-        if result.success:
-            serializer = self.get_serializer(result.data, many=True)
-            return Response({
-                "success": result.success,
-                "message": result.message,
-                "data": serializer.data
-            }, status=result.status_code)
+        params = request.query_params
+        result = RoomQuery.GetAll(
+            status=params.get('status'),
+            floor=params.get('floor'),
+            room_type=params.get('room_type'),
+            cursor=params.get('cursor'),
+            page_size=params.get('page_size')
+        )
         return Response(result.to_dict(), status=result.status_code)
 
 
+@conditional_get(etag_func=namespace_etag(CacheKeys.ROOMS.value))
 class RoomDetailAPIView(generics.GenericAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = RoomSerializer
     
     def get(self, request, room_id):
         result = RoomQuery.GetById(room_id)
-        if result.success:
-            serializer = self.get_serializer(result.data)
-            return Response({
-                "success": result.success,
-                "message": result.message,
-                "data": serializer.data
-            }, status=result.status_code)
         return Response(result.to_dict(), status=result.status_code)
 
 
@@ -1,12 +1,18 @@
+import json
 from http import HTTPStatus
+from django.conf import settings
 from django.db.models import Count, Sum, Q
+from rest_framework.utils.encoders import JSONEncoder
 from apps.hostel.models import Hotel, Floor, Room, RoomType, GuestProfile, Booking, Invoice, Payment
-from utils.enums import RoomStatus, BookingStatus, PaymentStatus
+from utils.enums import CacheKeys, RoomStatus, BookingStatus, PaymentStatus
 from utils.base_result import BaseResultWithData
+from utils.cache_helper import GlobalCache
 import logging
 
 logger = logging.getLogger(__name__)
 
+DASHBOARD_CACHE_TTL = getattr(settings, "DASHBOARD_CACHE_TTL", 60)
+
 
 class DashboardQuery:
     """Handle admin dashboard data retrieval"""
@@ -15,87 +21,88 @@ class DashboardQuery:
     def GetDashboardMetrics():
         """
         Retrieve comprehensive dashboard metrics for admin panel.
+        Cached for DASHBOARD_CACHE_TTL seconds; one worker recomputes at a time.
         
         Returns:
             BaseResultWithData: Result with dashboard statistics
         """
+        result_data = GlobalCache.get_or_compute(
+            CacheKeys.DASHBOARD.value,
+            DashboardQuery._compute_metrics,
+            ttl=DASHBOARD_CACHE_TTL
+        )
+        return BaseResultWithData(
+            message="Dashboard metrics retrieved successfully",
+            data=result_data,
+            status_code=HTTPStatus.OK
+        )
+    
+    @staticmethod
+    def _compute_metrics():
+        """Run the dashboard queries and return JSON-ready data"""
         # Count statistics
-        total_hotels = Hotel.objects.filter(is_deleted=False).count()
-        total_floors = Floor.objects.filter(is_deleted=False).count()
-        total_rooms = Room.objects.filter(is_deleted=False).count()
-        total_guests = GuestProfile.objects.filter(is_deleted=False).count()
-        total_bookings = Booking.objects.filter(is_deleted=False).count()
-        total_invoices = Invoice.objects.filter(is_deleted=False).count()
-        total_payments = Payment.objects.filter(is_deleted=False).count()
+        total_hotels = Hotel.objects.count()
+        total_floors = Floor.objects.count()
+        total_rooms = Room.objects.count()
+        total_guests = GuestProfile.objects.count()
+        total_bookings = Booking.objects.count()
+        total_invoices = Invoice.objects.count()
+        total_payments = Payment.objects.count()
         
         # Room status breakdown
         room_available = Room.objects.filter(
-            is_deleted=False,
             status=RoomStatus.AVAILABLE.value
         ).count()
         room_occupied = Room.objects.filter(
-            is_deleted=False,
             status=RoomStatus.OCCUPIED.value
         ).count()
         room_dirty = Room.objects.filter(
-            is_deleted=False,
             status=RoomStatus.DIRTY.value
         ).count()
         room_maintenance = Room.objects.filter(
-            is_deleted=False,
             status=RoomStatus.MAINTENANCE.value
         ).count()
         
         # Booking status breakdown
         booking_reserved = Booking.objects.filter(
-            is_deleted=False,
             status=BookingStatus.RESERVED.value
         ).count()
         booking_checked_in = Booking.objects.filter(
-            is_deleted=False,
             status=BookingStatus.CHECKED_IN.value
         ).count()
         booking_checked_out = Booking.objects.filter(
-            is_deleted=False,
             status=BookingStatus.CHECKED_OUT.value
         ).count()
         booking_cancelled = Booking.objects.filter(
-            is_deleted=False,
             status=BookingStatus.CANCELLED.value
         ).count()
         
         # Payment status breakdown
         payment_pending = Payment.objects.filter(
-            is_deleted=False,
             payment_status=PaymentStatus.PENDING.value
         ).count()
         payment_completed = Payment.objects.filter(
-            is_deleted=False,
             payment_status=PaymentStatus.COMPLETED.value
         ).count()
         payment_failed = Payment.objects.filter(
-            is_deleted=False,
             payment_status=PaymentStatus.FAILED.value
         ).count()
         payment_refunded = Payment.objects.filter(
-            is_deleted=False,
             payment_status=PaymentStatus.REFUNDED.value
         ).count()
         
         # Financial metrics
         total_revenue = Payment.objects.filter(
-            is_deleted=False,
             payment_status=PaymentStatus.COMPLETED.value
         ).aggregate(total=Sum('amount'))['total'] or 0
         
         pending_payments = Payment.objects.filter(
-            is_deleted=False,
             payment_status=PaymentStatus.PENDING.value
         ).aggregate(total=Sum('amount'))['total'] or 0
         
         # Recent bookings
         recent_bookings = list(
-            Booking.objects.filter(is_deleted=False)
+            Booking.objects
             .select_related('guest', 'room')
             .order_by('-created_at')[:5]
             .values(
@@ -106,7 +113,7 @@ class DashboardQuery:
         
         # Recent payments
         recent_payments = list(
-            Payment.objects.filter(is_deleted=False)
+            Payment.objects
             .select_related('invoice')
             .order_by('-created_at')[:5]
             .values(
@@ -117,7 +124,7 @@ class DashboardQuery:
         
         # Hotel occupancy
         hotels_data = []
-        for hotel in Hotel.objects.filter(is_deleted=False):
+        for hotel in Hotel.objects.all():
             total_rooms_hotel = hotel.rooms.filter(is_deleted=False).count()
             occupied_rooms = hotel.rooms.filter(
                 is_deleted=False,
@@ -174,8 +181,6 @@ class DashboardQuery:
             'hotels': hotels_data,
         }
         
-        return BaseResultWithData(
-            message="Dashboard metrics retrieved successfully",
-            data=result_data,
-            status_code=HTTPStatus.OK
-        )
+        # Dates and decimals rendered the way the API renders them, so a cached
+        # response is byte-identical to a freshly computed one
+        return json.loads(json.dumps(result_data, cls=JSONEncoder))
@@ -1,23 +1,57 @@
+from http import HTTPStatus
 from apps.hostel.models import Floor
+from apps.hostel.serializers import FloorSerializer
 from utils.base_result import BaseResultWithData
+from utils.cache_helper import cached_result
+from utils.fast_serializer import ValuesSerializer
+from utils.enums import CacheKeys
+from utils.pagination import KeysetPaginator, paginate_queryset
 
 
 class FloorQuery:
     
     @staticmethod
-    def GetAll():
-        try:
-            floors = Floor.objects.filter(is_deleted=False)
-            return BaseResultWithData(True, "Floors retrieved successfully", list(floors), 200)
-        except Exception as e:
-            return BaseResultWithData(False, str(e), None, 400)
+    def GetAll(cursor=None, page_size=None):
+        """
+        List floors ordered by number with keyset pagination.
+        First pages are cached per namespace version and invalidated by FloorCommand writes.
+        
+        Args:
+            cursor (str): Cursor from the previous page (optional)
+            page_size (int): Page size (optional)
+            
+        Returns:
+            BaseResultWithData: Result with a page of floors and the next cursor
+        """
+        fast = ValuesSerializer.for_serializer(FloorSerializer)
+        return cached_result(
+            CacheKeys.FLOORS.value,
+            (KeysetPaginator.clamp_page_size(page_size),),
+            lambda: paginate_queryset(
+                fast.values(Floor.objects.all(), extra_paths=['number']),
+                ['number'],
+                fast.serialize_rows,
+                cursor=cursor,
+                page_size=page_size,
+                message="Floors retrieved successfully"
+            ),
+            message="Floors retrieved successfully",
+            # Only first pages: a key per client cursor would let anyone fill the cache
+            cacheable=not cursor,
+            local=True
+        )
     
     @staticmethod
     def GetById(floor_id):
         try:
-            floor = Floor.objects.get(id=floor_id, is_deleted=False)
-            return BaseResultWithData(True, "Floor retrieved successfully", floor, 200)
+            floor = Floor.objects.get(id=floor_id)
+            return BaseResultWithData(
+                message="Floor retrieved successfully",
+                data=FloorSerializer(floor).data,
+                status_code=HTTPStatus.OK
+            )
         except Floor.DoesNotExist:
-            return BaseResultWithData(False, "Floor not found", None, 404)
-        except Exception as e:
-            return BaseResultWithData(False, str(e), None, 400)
+            return BaseResultWithData(
+                message="Floor not found",
+                status_code=HTTPStatus.NOT_FOUND
+            )
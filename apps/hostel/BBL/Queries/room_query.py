@@ -1,23 +1,83 @@
+from http import HTTPStatus
 from apps.hostel.models import Room
+from apps.hostel.serializers import RoomSerializer
 from utils.base_result import BaseResultWithData
+from utils.enums import CacheKeys, RoomStatus
+from utils.cache_helper import cached_result
+from utils.fast_serializer import ValuesSerializer
+from utils.pagination import KeysetPaginator, paginate_queryset
 
 
 class RoomQuery:
     
     @staticmethod
-    def GetAll():
-        try:
-            rooms = Room.objects.filter(is_deleted=False)
-            return BaseResultWithData(True, "Rooms retrieved successfully", list(rooms), 200)
-        except Exception as e:
-            return BaseResultWithData(False, str(e), None, 400)
+    def GetAll(status=None, floor=None, room_type=None, cursor=None, page_size=None):
+        """
+        List rooms, newest first, with filters and keyset pagination.
+        
+        Ordered by -id alone (created_at is nullable, which keyset pagination
+        can't seek past); a status filter uses the (status, -id) index.
+        First pages are cached per namespace version and invalidated by room,
+        floor and room type writes.
+        
+        Args:
+            status (str): Room status filter (optional)
+            floor (int): Floor ID filter (optional)
+            room_type (int): Room type ID filter (optional)
+            cursor (str): Cursor from the previous page (optional)
+            page_size (int): Page size (optional)
+            
+        Returns:
+            BaseResultWithData: Result with a page of rooms and the next cursor
+        """
+        queryset = Room.objects.all()
+        
+        if status:
+            if status not in [room_status.value for room_status in RoomStatus]:
+                return BaseResultWithData(
+                    message=f"Invalid status, expected one of: {', '.join(s.value for s in RoomStatus)}",
+                    status_code=HTTPStatus.BAD_REQUEST
+                )
+            queryset = queryset.filter(status=status)
+        
+        for field, value in (('floor_id', floor), ('room_type_id', room_type)):
+            if value in (None, ''):
+                continue
+            if not str(value).isdigit():
+                return BaseResultWithData(
+                    message=f"{field.replace('_id', '')} must be an ID",
+                    status_code=HTTPStatus.BAD_REQUEST
+                )
+            queryset = queryset.filter(**{field: value})
+        
+        fast = ValuesSerializer.for_serializer(RoomSerializer)
+        return cached_result(
+            CacheKeys.ROOMS.value,
+            (status or '', int(floor or 0), int(room_type or 0), KeysetPaginator.clamp_page_size(page_size)),
+            lambda: paginate_queryset(
+                fast.values(queryset, extra_paths=['id']),
+                ['-id'],
+                fast.serialize_rows,
+                cursor=cursor,
+                page_size=page_size,
+                message="Rooms retrieved successfully"
+            ),
+            message="Rooms retrieved successfully",
+            # Only first pages: a key per client cursor would let anyone fill the cache
+            cacheable=not cursor
+        )
     
     @staticmethod
     def GetById(room_id):
         try:
-            room = Room.objects.get(id=room_id, is_deleted=False)
-            return BaseResultWithData(True, "Room retrieved successfully", room, 200)
+            room = Room.objects.select_related('floor', 'room_type').get(id=room_id)
+            return BaseResultWithData(
+                message="Room retrieved successfully",
+                data=RoomSerializer(room).data,
+                status_code=HTTPStatus.OK
+            )
         except Room.DoesNotExist:
-            return BaseResultWithData(False, "Room not found", None, 404)
-        except Exception as e:
-            return BaseResultWithData(False, str(e), None, 400)
+            return BaseResultWithData(
+                message="Room not found",
+                status_code=HTTPStatus.NOT_FOUND
+            )
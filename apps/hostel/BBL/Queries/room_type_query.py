@@ -1,23 +1,57 @@
+from http import HTTPStatus
 from apps.hostel.models import RoomType
+from apps.hostel.serializers import RoomTypeSerializer
 from utils.base_result import BaseResultWithData
+from utils.cache_helper import cached_result
+from utils.fast_serializer import ValuesSerializer
+from utils.enums import CacheKeys
+from utils.pagination import KeysetPaginator, paginate_queryset
 
 
 class RoomTypeQuery:
     
     @staticmethod
-    def GetAll():
-        try:
-            room_types = RoomType.objects.filter(is_deleted=False)
-            return BaseResultWithData(True, "Room types retrieved successfully", list(room_types), 200)
-        except Exception as e:
-            return BaseResultWithData(False, str(e), None, 400)
+    def GetAll(cursor=None, page_size=None):
+        """
+        List room types ordered by name with keyset pagination.
+        First pages are cached per namespace version and invalidated by RoomTypeCommand writes.
+        
+        Args:
+            cursor (str): Cursor from the previous page (optional)
+            page_size (int): Page size (optional)
+            
+        Returns:
+            BaseResultWithData: Result with a page of room types and the next cursor
+        """
+        fast = ValuesSerializer.for_serializer(RoomTypeSerializer)
+        return cached_result(
+            CacheKeys.ROOM_TYPES.value,
+            (KeysetPaginator.clamp_page_size(page_size),),
+            lambda: paginate_queryset(
+                fast.values(RoomType.objects.all(), extra_paths=['name']),
+                ['name'],
+                fast.serialize_rows,
+                cursor=cursor,
+                page_size=page_size,
+                message="Room types retrieved successfully"
+            ),
+            message="Room types retrieved successfully",
+            # Only first pages: a key per client cursor would let anyone fill the cache
+            cacheable=not cursor,
+            local=True
+        )
     
     @staticmethod
     def GetById(room_type_id):
         try:
-            room_type = RoomType.objects.get(id=room_type_id, is_deleted=False)
-            return BaseResultWithData(True, "Room type retrieved successfully", room_type, 200)
+            room_type = RoomType.objects.get(id=room_type_id)
+            return BaseResultWithData(
+                message="Room type retrieved successfully",
+                data=RoomTypeSerializer(room_type).data,
+                status_code=HTTPStatus.OK
+            )
         except RoomType.DoesNotExist:
-            return BaseResultWithData(False, "Room type not found", None, 404)
-        except Exception as e:
-            return BaseResultWithData(False, str(e), None, 400)
+            return BaseResultWithData(
+                message="Room type not found",
+                status_code=HTTPStatus.NOT_FOUND
+            )
@@ -0,0 +1,57 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from utils.cache_helper import GlobalCache
+from utils.enums import RoomStatus
+
+
+BENCH_NAMESPACE = 'benchmark:cache'
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+
+class Command(BaseCommand):
+    help = 'Compares single-key and batch GlobalCache calls (get/set/delete) at several key counts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000], help='Key counts to test')
+
+    def handle(self, *args, **options):
+        mismatches = 0
+
+        for size in options['sizes']:
+            # Shaped like the room status entries a floor plan screen reads
+            entries = {
+                f'room-status:{i}': {'id': i, 'number': f'R{i}', 'status': RoomStatus.AVAILABLE.value}
+                for i in range(size)
+            }
+            keys = list(entries)
+
+            _, single_set = _timed(lambda: [GlobalCache.set(k, v, namespace=BENCH_NAMESPACE) for k, v in entries.items()])
+            single, single_get = _timed(lambda: {k: GlobalCache.get(k, namespace=BENCH_NAMESPACE) for k in keys})
+            _, single_delete = _timed(lambda: [GlobalCache.delete(k, namespace=BENCH_NAMESPACE) for k in keys])
+
+            _, batch_set = _timed(lambda: GlobalCache.set_many(entries, namespace=BENCH_NAMESPACE))
+            batch, batch_get = _timed(lambda: GlobalCache.get_many(keys, namespace=BENCH_NAMESPACE))
+            _, batch_delete = _timed(lambda: GlobalCache.delete_many(keys, namespace=BENCH_NAMESPACE))
+
+            if single != entries or batch != entries:
+                mismatches += 1
+                self.stdout.write(self.style.ERROR(f'{size} keys: batch and single-key reads differ'))
+                continue
+
+            self.stdout.write(self.style.SUCCESS(
+                f'{size} keys, round trips {size} -> 1 per operation: '
+                f'set {single_set:.1f} -> {batch_set:.1f} ms, '
+                f'get {single_get:.1f} -> {batch_get:.1f} ms, '
+                f'delete {single_delete:.1f} -> {batch_delete:.1f} ms'
+            ))
+
+        GlobalCache.invalidate_namespace(BENCH_NAMESPACE)
+        if mismatches:
+            raise CommandError(f'{mismatches} size(s) returned different data')
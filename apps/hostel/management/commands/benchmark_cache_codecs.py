@@ -0,0 +1,84 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django_redis.compressors.zlib import ZlibCompressor
+from django_redis.exceptions import CompressorError
+from django_redis.serializers.json import JSONSerializer
+
+from apps.hostel.BBL.Queries.dashboard_query import DashboardQuery
+from apps.hostel.BBL.Queries.room_query import RoomQuery
+from utils.cache_codecs import HAS_MSGPACK, MsgpackSerializer, ThresholdZlibCompressor
+from utils.enums import RoomStatus
+from utils.pagination import MAX_PAGE_SIZE
+
+
+PAYLOADS = {
+    'room status entry': lambda: {'id': 1, 'number': 'R1', 'status': RoomStatus.AVAILABLE.value},
+    'dashboard': DashboardQuery._compute_metrics,
+    'rooms page': lambda: RoomQuery.GetAll(page_size=MAX_PAGE_SIZE).data,
+}
+
+CODECS = {
+    'json + zlib (previous)': (JSONSerializer, ZlibCompressor),
+    'json + threshold zlib': (JSONSerializer, ThresholdZlibCompressor),
+    'msgpack + threshold zlib': (MsgpackSerializer, ThresholdZlibCompressor),
+}
+
+
+def _encode(serializer, compressor, value):
+    # Same steps as django_redis DefaultClient.encode / decode
+    return compressor.compress(serializer.dumps(value))
+
+
+def _decode(serializer, compressor, value):
+    try:
+        value = compressor.decompress(value)
+    except CompressorError:
+        pass
+    return serializer.loads(value)
+
+
+class Command(BaseCommand):
+    help = 'Compares cache codecs (size, encode and decode time) on dashboard and room list payloads'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=1000, help='Encodes / decodes per payload and codec')
+
+    def handle(self, *args, **options):
+        if not HAS_MSGPACK:
+            self.stdout.write(self.style.WARNING('msgpack is not installed, MsgpackSerializer falls back to JSON'))
+
+        repeat = options['repeat']
+        mismatches = 0
+
+        for payload_name, build in PAYLOADS.items():
+            value = build()
+            baseline = None
+            self.stdout.write(payload_name)
+
+            for codec_name, (serializer_class, compressor_class) in CODECS.items():
+                serializer, compressor = serializer_class({}), compressor_class({})
+
+                start = time.perf_counter()
+                for _ in range(repeat):
+                    encoded = _encode(serializer, compressor, value)
+                encode_us = (time.perf_counter() - start) / repeat * 1e6
+
+                start = time.perf_counter()
+                for _ in range(repeat):
+                    decoded = _decode(serializer, compressor, encoded)
+                decode_us = (time.perf_counter() - start) / repeat * 1e6
+
+                baseline = decoded if baseline is None else baseline
+                if decoded != baseline:
+                    mismatches += 1
+                    self.stdout.write(self.style.ERROR(f'  {codec_name}: reads back different data'))
+                    continue
+
+                self.stdout.write(
+                    f'  {codec_name:<26} {len(encoded):>8} bytes  '
+                    f'encode {encode_us:>8.1f} us  decode {decode_us:>8.1f} us'
+                )
+
+        if mismatches:
+            raise CommandError(f'{mismatches} codec(s) changed the data')
@@ -0,0 +1,53 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from apps.hostel.BBL.Queries.dashboard_query import DashboardQuery
+from apps.hostel.BBL.Queries.room_query import RoomQuery
+from utils.pagination import MAX_PAGE_SIZE
+from utils.renderers import HAS_ORJSON, ORJSONRenderer
+
+
+PAYLOADS = {
+    'dashboard': lambda: DashboardQuery.GetDashboardMetrics().to_dict(),
+    'rooms': lambda: RoomQuery.GetAll(page_size=MAX_PAGE_SIZE).to_dict(),
+}
+
+
+class Command(BaseCommand):
+    help = 'Checks that ORJSONRenderer produces the same bytes as JSONRenderer and times both'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=1000, help='Renders per payload')
+
+    def handle(self, *args, **options):
+        if not HAS_ORJSON:
+            raise CommandError('orjson is not installed')
+
+        stock, fast = JSONRenderer(), ORJSONRenderer()
+        mismatches = 0
+
+        for name, build in PAYLOADS.items():
+            payload = build()
+            timings = {}
+            for label, renderer in (('stock', stock), ('orjson', fast)):
+                start = time.perf_counter()
+                for _ in range(options['repeat']):
+                    output = renderer.render(payload)
+                timings[label] = (time.perf_counter() - start, output)
+
+            if timings['stock'][1] != timings['orjson'][1]:
+                mismatches += 1
+                self.stdout.write(self.style.ERROR(f'{name}: rendered bytes differ'))
+                continue
+
+            stock_time, fast_time = timings['stock'][0], timings['orjson'][0]
+            self.stdout.write(self.style.SUCCESS(
+                f'{name}: identical ({len(timings["stock"][1])} bytes), '
+                f'stock {stock_time * 1000:.1f} ms, orjson {fast_time * 1000:.1f} ms '
+                f'for {options["repeat"]} renders ({stock_time / fast_time:.1f}x)'
+            ))
+
+        if mismatches:
+            raise CommandError(f'{mismatches} payload(s) render differently')
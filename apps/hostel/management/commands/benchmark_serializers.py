@@ -0,0 +1,57 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from apps.hostel.models import Floor, Room, RoomType
+from apps.hostel.serializers import FloorSerializer, RoomSerializer, RoomTypeSerializer
+from apps.users.models import User
+from apps.users.serializers import UserSerializer
+from utils.fast_serializer import ValuesSerializer
+
+
+TARGETS = {
+    'floors': (Floor, FloorSerializer, (), ()),
+    'room_types': (RoomType, RoomTypeSerializer, (), ()),
+    'rooms': (Room, RoomSerializer, ('floor', 'room_type'), ()),
+    'users': (User, UserSerializer, (), ('groups',)),
+}
+
+
+class Command(BaseCommand):
+    help = 'Checks that the values-based list serializers render the same JSON as DRF and times both paths'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target', choices=sorted(TARGETS), action='append', help='Limit to these lists (repeatable)')
+        parser.add_argument('--rows', type=int, default=10000, help='Rows to read per list')
+
+    def handle(self, *args, **options):
+        renderer = JSONRenderer()
+        mismatches = 0
+
+        for name in options['target'] or sorted(TARGETS):
+            model, serializer_class, select, prefetch = TARGETS[name]
+            queryset = model.objects.order_by('-id')
+
+            start = time.perf_counter()
+            instances = queryset.select_related(*select).prefetch_related(*prefetch)[:options['rows']]
+            drf_json = renderer.render(serializer_class(instances, many=True).data)
+            drf_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            fast = ValuesSerializer.for_serializer(serializer_class)
+            fast_json = renderer.render(fast.serialize(queryset[:options['rows']]))
+            fast_time = time.perf_counter() - start
+
+            if drf_json != fast_json:
+                mismatches += 1
+                self.stdout.write(self.style.ERROR(f'{name}: output differs from {serializer_class.__name__}'))
+                continue
+
+            speedup = drf_time / fast_time if fast_time else 0
+            self.stdout.write(self.style.SUCCESS(
+                f'{name}: identical, drf {drf_time * 1000:.1f} ms, values {fast_time * 1000:.1f} ms ({speedup:.1f}x)'
+            ))
+
+        if mismatches:
+            raise CommandError(f'{mismatches} list(s) differ between the serialization paths')
@@ -8,7 +8,7 @@ class Command(BaseCommand):
 
     def handle(self, *args, **options):
         # Check if hotel already exists
-        if Hotel.objects.filter(is_deleted=False).exists():
+        if Hotel.objects.exists():
             self.stdout.write(
                 self.style.ERROR('A hotel already exists in the system. Only one hotel instance is allowed.')
             )
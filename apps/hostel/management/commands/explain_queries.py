@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.hostel.models import Booking, Payment, Room
+from apps.users.models import User
+from utils.enums import BookingStatus, PaymentStatus, RoomStatus
+
+
+def _hot_queries():
+    """(label, queryset, partial index it should use) for the dashboard and list endpoints"""
+    return [
+        ('dashboard room status count',
+         Room.objects.filter(status=RoomStatus.OCCUPIED.value).values('id'), 'room_active_status_idx'),
+        ('dashboard booking status count',
+         Booking.objects.filter(status=BookingStatus.RESERVED.value).values('id'), 'booking_active_status_idx'),
+        ('dashboard payment status count',
+         Payment.objects.filter(payment_status=PaymentStatus.COMPLETED.value).values('id'), 'payment_active_status_idx'),
+        ('dashboard recent bookings',
+         Booking.objects.order_by('-created_at')[:5], 'booking_active_created_idx'),
+        ('dashboard recent payments',
+         Payment.objects.order_by('-created_at')[:5], 'payment_active_created_idx'),
+        ('room list',
+         Room.objects.order_by('-id')[:21], 'room_active_id_idx'),
+        ('room list by status',
+         Room.objects.filter(status=RoomStatus.AVAILABLE.value).order_by('-id')[:21], 'room_active_status_idx'),
+        ('user list',
+         User.objects.order_by('-id')[:21], 'user_active_id_idx'),
+    ]
+
+
+class Command(BaseCommand):
+    help = 'Runs EXPLAIN on the dashboard and list queries and checks they use the partial is_deleted=false indexes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verbose-plans', action='store_true', help='Print every query plan')
+
+    def handle(self, *args, **options):
+        missing = 0
+
+        for label, queryset, index_name in _hot_queries():
+            plan = queryset.explain()
+            if options['verbose_plans']:
+                self.stdout.write(f'{label}:\n{plan}\n')
+
+            if index_name in plan:
+                self.stdout.write(self.style.SUCCESS(f'{label}: uses {index_name}'))
+            else:
+                missing += 1
+                self.stdout.write(self.style.WARNING(f'{label}: does not use {index_name}'))
+
+        if missing:
+            # Small tables are often read with a seq scan; run this against production-sized data
+            raise CommandError(f'{missing} queries did not use their partial index')
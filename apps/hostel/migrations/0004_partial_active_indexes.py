@@ -0,0 +1,158 @@
+# Generated by Django 5.0.2 on 2026-10-19 15:49
+
+import django.db.models.manager
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("hostel", "0003_alter_floor_options_alter_room_options_and_more"),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name="booking",
+            managers=[
+                ("all_objects", django.db.models.manager.Manager()),
+            ],
+        ),
+        migrations.AlterModelManagers(
+            name="floor",
+            managers=[
+                ("all_objects", django.db.models.manager.Manager()),
+            ],
+        ),
+        migrations.AlterModelManagers(
+            name="guestprofile",
+            managers=[
+                ("all_objects", django.db.models.manager.Manager()),
+            ],
+        ),
+        migrations.AlterModelManagers(
+            name="hotel",
+            managers=[
+                ("all_objects", django.db.models.manager.Manager()),
+            ],
+        ),
+        migrations.AlterModelManagers(
+            name="invoice",
+            managers=[
+                ("all_objects", django.db.models.manager.Manager()),
+            ],
+        ),
+        migrations.AlterModelManagers(
+            name="payment",
+            managers=[
+                ("all_objects", django.db.models.manager.Manager()),
+            ],
+        ),
+        migrations.AlterModelManagers(
+            name="room",
+            managers=[
+                ("all_objects", django.db.models.manager.Manager()),
+            ],
+        ),
+        migrations.AlterModelManagers(
+            name="roomtype",
+            managers=[
+                ("all_objects", django.db.models.manager.Manager()),
+            ],
+        ),
+        migrations.RemoveIndex(
+            model_name="booking",
+            name="hostel_book_guest_i_52613a_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="booking",
+            name="hostel_book_check_i_13e5c3_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="booking",
+            name="hostel_book_status_fd959c_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="invoice",
+            name="hostel_invo_payment_f6d551_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="payment",
+            name="hostel_paym_payment_92dddf_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="room",
+            name="hostel_room_status_a08564_idx",
+        ),
+        migrations.AddIndex(
+            model_name="booking",
+            index=models.Index(
+                condition=models.Q(("is_deleted", False)),
+                fields=["guest", "-created_at"],
+                name="booking_active_guest_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="booking",
+            index=models.Index(
+                condition=models.Q(("is_deleted", False)),
+                fields=["check_in", "check_out"],
+                name="booking_active_dates_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="booking",
+            index=models.Index(
+                condition=models.Q(("is_deleted", False)),
+                fields=["status", "-created_at"],
+                name="booking_active_status_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="booking",
+            index=models.Index(
+                condition=models.Q(("is_deleted", False)),
+                fields=["-created_at"],
+                name="booking_active_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="invoice",
+            index=models.Index(
+                condition=models.Q(("is_deleted", False)),
+                fields=["payment_status", "-created_at"],
+                name="invoice_active_status_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="payment",
+            index=models.Index(
+                condition=models.Q(("is_deleted", False)),
+                fields=["payment_status", "-created_at"],
+                name="payment_active_status_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="payment",
+            index=models.Index(
+                condition=models.Q(("is_deleted", False)),
+                fields=["-created_at"],
+                name="payment_active_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="room",
+            index=models.Index(
+                condition=models.Q(("is_deleted", False)),
+                fields=["status", "-created_at"],
+                name="room_active_status_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="room",
+            index=models.Index(
+                condition=models.Q(("is_deleted", False)),
+                fields=["-created_at", "-id"],
+                name="room_active_created_idx",
+            ),
+        ),
+    ]
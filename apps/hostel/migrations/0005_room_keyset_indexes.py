@@ -0,0 +1,37 @@
+# Generated by Django 5.0.2 on 2026-10-19 16:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("hostel", "0004_partial_active_indexes"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="room",
+            name="room_active_status_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="room",
+            name="room_active_created_idx",
+        ),
+        migrations.AddIndex(
+            model_name="room",
+            index=models.Index(
+                condition=models.Q(("is_deleted", False)),
+                fields=["status", "-id"],
+                name="room_active_status_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="room",
+            index=models.Index(
+                condition=models.Q(("is_deleted", False)),
+                fields=["-id"],
+                name="room_active_id_idx",
+            ),
+        ),
+    ]
@@ -65,7 +65,8 @@ class Room(BaseModel):
         verbose_name_plural = "Rooms"
         ordering = ['number']
         indexes = [
-            models.Index(fields=['status', '-created_at']),
+            models.Index(fields=['status', '-id'], name='room_active_status_idx', condition=models.Q(is_deleted=False)),
+            models.Index(fields=['-id'], name='room_active_id_idx', condition=models.Q(is_deleted=False)),
         ]
 
     def __str__(self):
@@ -113,9 +114,10 @@ class Booking(BaseModel):
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['confirmation_code']),
-            models.Index(fields=['guest', '-created_at']),
-            models.Index(fields=['check_in', 'check_out']),
-            models.Index(fields=['status', '-created_at']),
+            models.Index(fields=['guest', '-created_at'], name='booking_active_guest_idx', condition=models.Q(is_deleted=False)),
+            models.Index(fields=['check_in', 'check_out'], name='booking_active_dates_idx', condition=models.Q(is_deleted=False)),
+            models.Index(fields=['status', '-created_at'], name='booking_active_status_idx', condition=models.Q(is_deleted=False)),
+            models.Index(fields=['-created_at'], name='booking_active_created_idx', condition=models.Q(is_deleted=False)),
         ]
 
     def __str__(self):
@@ -140,7 +142,7 @@ class Invoice(BaseModel):
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['invoice_number']),
-            models.Index(fields=['payment_status', '-created_at']),
+            models.Index(fields=['payment_status', '-created_at'], name='invoice_active_status_idx', condition=models.Q(is_deleted=False)),
         ]
 
     def __str__(self):
@@ -165,7 +167,8 @@ class Payment(BaseModel):
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['transaction_id']),
-            models.Index(fields=['payment_status', '-created_at']),
+            models.Index(fields=['payment_status', '-created_at'], name='payment_active_status_idx', condition=models.Q(is_deleted=False)),
+            models.Index(fields=['-created_at'], name='payment_active_created_idx', condition=models.Q(is_deleted=False)),
         ]
 
     def __str__(self):
@@ -24,3 +24,60 @@ class RoomSerializer(serializers.ModelSerializer):
         model = Room
         fields = ['id', 'floor', 'floor_number', 'room_type', 'room_type_name', 'number', 'status', 'price_override', 'notes', 'created_at', 'modified_at', 'is_deleted']
         read_only_fields = ['id', 'created_at', 'modified_at', 'is_deleted']
+
+
+class FloorBulkCreateSerializer(serializers.ModelSerializer):
+    """One item of a bulk floor create, uniqueness is checked for the whole payload at once"""
+    
+    class Meta:
+        model = Floor
+        fields = ['number', 'description']
+        extra_kwargs = {'number': {'validators': []}}
+
+
+class FloorBulkUpdateSerializer(serializers.ModelSerializer):
+    """One item of a bulk floor update, only the fields sent are changed"""
+    
+    id = serializers.IntegerField()
+    
+    class Meta:
+        model = Floor
+        fields = ['id', 'number', 'description']
+        extra_kwargs = {
+            'number': {'validators': [], 'required': False},
+            'description': {'required': False},
+        }
+
+
+class RoomBulkCreateSerializer(serializers.ModelSerializer):
+    """
+    One item of a bulk room create.
+    Floor and room type are plain IDs so they can be checked in one query
+    for the whole payload instead of one query per item.
+    """
+    
+    floor = serializers.IntegerField(allow_null=True, required=False)
+    room_type = serializers.IntegerField()
+    
+    class Meta:
+        model = Room
+        fields = ['floor', 'room_type', 'number', 'status', 'price_override', 'notes']
+        extra_kwargs = {'number': {'validators': []}}
+
+
+class RoomBulkUpdateSerializer(serializers.ModelSerializer):
+    """One item of a bulk room update, only the fields sent are changed"""
+    
+    id = serializers.IntegerField()
+    floor = serializers.IntegerField(allow_null=True, required=False)
+    room_type = serializers.IntegerField(required=False)
+    
+    class Meta:
+        model = Room
+        fields = ['id', 'floor', 'room_type', 'number', 'status', 'price_override', 'notes']
+        extra_kwargs = {
+            'number': {'validators': [], 'required': False},
+            'status': {'required': False},
+            'price_override': {'required': False},
+            'notes': {'required': False},
+        }
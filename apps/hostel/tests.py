@@ -1,3 +1,390 @@
-from django.test import TestCase
+import datetime
+import io
+import unittest
+import uuid
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.apps import apps
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.db.models import Q
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from apps.hostel.BBL.Queries.floor_query import FloorQuery
+from apps.hostel.BBL.Queries.room_query import RoomQuery
+from apps.hostel.management.commands.explain_queries import _hot_queries
+from apps.hostel.models import Floor, Room, RoomType
+from apps.hostel.serializers import FloorSerializer, RoomSerializer, RoomTypeSerializer
+from apps.users.models import User
+from utils.cache_helper import GlobalCache
+from utils.fast_serializer import ValuesSerializer
+from utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursor, KeysetPaginator, paginate_queryset
+from utils.renderers import HAS_ORJSON, ORJSONParser, ORJSONRenderer
+from utils.request_context import user_context
+
+
+class ValuesSerializerTests(TestCase):
+    """The .values() read path must render exactly what the ModelSerializer renders"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.floor = Floor.objects.create(number=1, description="Ground")
+        Floor.objects.create(number=2)
+        cls.room_type = RoomType.objects.create(
+            name="Double", base_price=Decimal("120.50"), max_occupancy=2, amenities=["wifi", "tv"]
+        )
+        Room.objects.create(
+            number="101", floor=cls.floor, room_type=cls.room_type,
+            price_override=Decimal("99.90"), notes="Sea view"
+        )
+        # Null foreign key (floor_number is skipped) and null decimal
+        Room.objects.create(number="102", floor=None, room_type=cls.room_type, status="MAINTENANCE")
+
+    def assertSameOutput(self, serializer_class, queryset, fields=None):
+        expected = serializer_class(queryset, many=True).data
+        if fields is not None:
+            expected = [{k: v for k, v in item.items() if k in fields} for item in expected]
+
+        actual = ValuesSerializer.for_serializer(serializer_class, fields).serialize(queryset)
+
+        self.assertEqual(actual, expected)
+        self.assertEqual(JSONRenderer().render(actual), JSONRenderer().render(expected))
+
+    def test_floor(self):
+        self.assertSameOutput(FloorSerializer, Floor.objects.order_by('number'))
+
+    def test_room_type(self):
+        self.assertSameOutput(RoomTypeSerializer, RoomType.objects.order_by('name'))
+
+    def test_room_related_pks_and_nulls(self):
+        self.assertSameOutput(RoomSerializer, Room.objects.order_by('number'))
+
+    def test_room_field_subset(self):
+        self.assertSameOutput(RoomSerializer, Room.objects.order_by('number'), fields=['id', 'floor_number', 'status'])
+
+    def test_soft_deleted_rows(self):
+        Room.all_objects.filter(number="102").update(is_deleted=True)
+        self.assertSameOutput(RoomSerializer, Room.all_objects.order_by('number'))
+
+    def test_empty_queryset(self):
+        self.assertSameOutput(RoomSerializer, Room.objects.none())
+
+
+class SoftDeleteStampTests(TestCase):
+    """Bulk soft deletes stamp deleted_at / deleted_by once, like save()"""
+
+    def setUp(self):
+        Floor.objects.bulk_create([Floor(number=number) for number in (1, 2)])
+
+    def test_update_stamps_deleted_rows(self):
+        with user_context(SimpleNamespace(username="alice")):
+            Floor.all_objects.filter(number=1).update(is_deleted=True)
+
+        floor = Floor.all_objects.get(number=1)
+        self.assertTrue(floor.is_deleted)
+        self.assertIsNotNone(floor.deleted_at)
+        self.assertEqual(floor.deleted_by, "alice")
+        self.assertEqual(floor.modified_by, "alice")
+
+    def test_update_keeps_existing_stamp(self):
+        with user_context(SimpleNamespace(username="alice")):
+            Floor.all_objects.filter(number=1).update(is_deleted=True)
+        first = Floor.all_objects.get(number=1)
+
+        with user_context(SimpleNamespace(username="bob")):
+            Floor.all_objects.update(is_deleted=True)
+
+        again = Floor.all_objects.get(number=1)
+        self.assertEqual((again.deleted_at, again.deleted_by), (first.deleted_at, "alice"))
+        self.assertEqual(again.modified_by, "bob")
+        other = Floor.all_objects.get(number=2)
+        self.assertEqual(other.deleted_by, "bob")
+        self.assertIsNotNone(other.deleted_at)
+
+    def test_bulk_update_keeps_existing_stamp(self):
+        with user_context(SimpleNamespace(username="alice")):
+            Floor.all_objects.filter(number=1).update(is_deleted=True)
+        first = Floor.all_objects.get(number=1)
+
+        floors = list(Floor.all_objects.all())
+        for floor in floors:
+            floor.is_deleted = True
+        with user_context(SimpleNamespace(username="bob")):
+            Floor.all_objects.bulk_update(floors, ['is_deleted'])
+
+        again = Floor.all_objects.get(number=1)
+        self.assertEqual((again.deleted_at, again.deleted_by), (first.deleted_at, "alice"))
+        self.assertEqual(Floor.all_objects.get(number=2).deleted_by, "bob")
+
+
+class KeysetPaginatorTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        room_type = RoomType.objects.create(name="Single", base_price=Decimal("50.00"), max_occupancy=1)
+        statuses = ["AVAILABLE", "MAINTENANCE", "AVAILABLE", "OCCUPIED", "AVAILABLE", "MAINTENANCE", "AVAILABLE"]
+        Room.objects.bulk_create([
+            Room(number=str(100 + i), room_type=room_type, status=status) for i, status in enumerate(statuses)
+        ])
+
+    def walk(self, paginator, queryset):
+        """Every row id, following next_cursor page by page"""
+        ids, cursor = [], None
+        while True:
+            page = paginator.paginate(queryset, cursor)
+            self.assertLessEqual(len(page.rows), paginator.page_size)
+            ids.extend(row.id for row in page.rows)
+            if not page.has_more:
+                return ids
+            cursor = page.next_cursor
+
+    def test_pages_follow_the_ordering(self):
+        for ordering in (['-id'], ['status', '-id'], ['-status', 'id']):
+            with self.subTest(ordering=ordering):
+                expected = list(Room.objects.order_by(*ordering).values_list('id', flat=True))
+                self.assertEqual(self.walk(KeysetPaginator(ordering, page_size=2), Room.objects.all()), expected)
+
+    def test_seek_filter(self):
+        condition = KeysetPaginator(['status', '-id'])._seek_filter(["B", 5])
+        self.assertEqual(condition, Q(status__gt="B") | (Q(status="B") & Q(id__lt=5)))
+
+    def test_cursor_round_trip(self):
+        paginator = KeysetPaginator(['status', '-id'])
+        values = ["AVAILABLE", 42]
+        cursor = paginator.encode_cursor(values)
+
+        self.assertNotIn('=', cursor)
+        self.assertEqual(paginator.decode_cursor(cursor), values)
+
+    def test_bad_cursors(self):
+        paginator = KeysetPaginator(['status', '-id'])
+        for cursor in ("not base64!", KeysetPaginator.encode_cursor({'a': 1}), KeysetPaginator.encode_cursor([1])):
+            with self.subTest(cursor=cursor), self.assertRaises(InvalidCursor):
+                paginator.decode_cursor(cursor)
+
+    def test_bad_cursor_is_a_bad_request(self):
+        wrong_type = KeysetPaginator.encode_cursor(["not a number"])
+        for cursor in ("garbage", wrong_type):
+            with self.subTest(cursor=cursor):
+                result = paginate_queryset(Room.objects.all(), ['-id'], list, cursor=cursor)
+                self.assertEqual(result.status_code, 400)
+
+    def test_nullable_ordering_field_is_rejected(self):
+        with self.assertRaises(ImproperlyConfigured):
+            KeysetPaginator(['floor', '-id']).paginate(Room.objects.all())
+
+    def test_page_size_is_clamped(self):
+        self.assertEqual(KeysetPaginator.clamp_page_size(10 ** 6), MAX_PAGE_SIZE)
+        self.assertEqual(KeysetPaginator.clamp_page_size(0), 1)
+        self.assertEqual(KeysetPaginator.clamp_page_size("x"), DEFAULT_PAGE_SIZE)
+
+
+class ListCacheKeyTests(TestCase):
+    """Only first pages are cached, so clients can't mint a cache key per cursor"""
+
+    @classmethod
+    def setUpTestData(cls):
+        Floor.objects.bulk_create([Floor(number=number) for number in range(1, 4)])
+
+    def test_cursor_pages_are_not_cached(self):
+        with mock.patch.object(GlobalCache, 'set') as cache_set:
+            first = FloorQuery.GetAll(page_size=2)
+            FloorQuery.GetAll(cursor=first.data['next_cursor'], page_size=2)
+            RoomQuery.GetAll(cursor=KeysetPaginator.encode_cursor([10 ** 9]))
+            FloorQuery.GetAll(cursor="garbage")
+
+        self.assertEqual(cache_set.call_count, 1)
+
+    def test_room_filter_ids_share_a_key(self):
+        with mock.patch.object(GlobalCache, 'set') as cache_set:
+            RoomQuery.GetAll(floor="7")
+            RoomQuery.GetAll(floor="007")
+
+        self.assertEqual(cache_set.call_args_list[0].args[0], cache_set.call_args_list[1].args[0])
+
+
+class PartialIndexTests(TestCase):
+    """
+    The dashboard and list queries must be able to use the partial
+    is_deleted = false indexes. Sequential scans are disabled on PostgreSQL
+    so the tiny test tables don't hide which index the planner can use.
+    """
+
+    def setUp(self):
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+
+    def test_hot_queries_use_partial_indexes(self):
+        for label, queryset, index_name in _hot_queries():
+            with self.subTest(label):
+                self.assertIn(index_name, queryset.explain())
+
+    def test_room_list_query_uses_partial_index(self):
+        fast = ValuesSerializer.for_serializer(RoomSerializer)
+        queryset = fast.values(Room.objects.filter(status="AVAILABLE"), extra_paths=['id']).order_by('-id')[:21]
+        self.assertIn('room_active_status_idx', queryset.explain())
+
+    def test_user_list_query_uses_partial_index(self):
+        queryset = User.all_objects.filter(is_deleted=False).values('id', 'username').order_by('-id')[:21]
+        self.assertIn('user_active_id_idx', queryset.explain())
+
+    def test_deleted_rows_query_cannot_use_partial_index(self):
+        plan = Room.all_objects.order_by('-id')[:21].explain()
+        self.assertNotIn('room_active_id_idx', plan)
+        self.assertNotIn('room_active_status_idx', plan)
+
+
+def _partial_indexes(app_labels=('hostel', 'users')):
+    """(model, index) for every conditional index declared on the apps' models"""
+    return [
+        (model, index)
+        for app_label in app_labels
+        for model in apps.get_app_config(app_label).get_models()
+        for index in model._meta.indexes if index.condition is not None
+    ]
+
+
+def _index_definition(name):
+    """CREATE INDEX statement of an index as the database stores it, None if missing"""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute("SELECT indexdef FROM pg_indexes WHERE indexname = %s", [name])
+        else:
+            cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'index' AND name = %s", [name])
+        row = cursor.fetchone()
+    return row[0] if row else None
+
+
+@unittest.skipUnless(connection.vendor in ('postgresql', 'sqlite'), "reads the index catalog")
+class PartialIndexMigrationTests(TransactionTestCase):
+    """The migrations create the partial indexes the models declare, and roll back cleanly"""
+
+    def assertPartialIndexes(self, model_indexes):
+        for model, index in model_indexes:
+            with self.subTest(index.name):
+                definition = _index_definition(index.name)
+                self.assertIsNotNone(definition)
+                self.assertIn(model._meta.db_table, definition)
+                self.assertRegex(definition.lower(), r'\bwhere\b.*is_deleted')
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+
+    def test_migrated_database_has_the_partial_indexes(self):
+        self.assertPartialIndexes(_partial_indexes())
+
+    def test_migrations_roll_back_and_forward(self):
+        latest = MigrationExecutor(connection).loader.graph.leaf_nodes()
+        self.addCleanup(self.migrate, latest)
+
+        self.migrate([('hostel', '0003_alter_floor_options_alter_room_options_and_more'), ('users', '0003_idnumbercounter')])
+        for _, index in _partial_indexes():
+            with self.subTest(index.name):
+                self.assertIsNone(_index_definition(index.name))
+
+        self.migrate(latest)
+        self.assertPartialIndexes(_partial_indexes())
+
+
+@unittest.skipUnless(HAS_ORJSON, "orjson is not installed")
+class ORJSONRendererTests(SimpleTestCase):
+    """ORJSONRenderer must produce the same bytes as DRF's JSONRenderer"""
+
+    def assertSameBytes(self, data, accepted_media_type=None, renderer_context=None):
+        expected = JSONRenderer().render(data, accepted_media_type, renderer_context)
+        actual = ORJSONRenderer().render(data, accepted_media_type, renderer_context)
+        self.assertEqual(actual, expected)
+
+    def test_api_result_shapes(self):
+        self.assertSameBytes({
+            'message': "Rooms retrieved successfully",
+            'data': {
+                'results': [{'id': 1, 'price_override': "99.90", 'floor': None, 'amenities': ["wifi", "tv"]}],
+                'next_cursor': None,
+                'has_more': False,
+            },
+            'status_code': 200,
+        })
+
+    def test_datetimes_and_dates(self):
+        utc = datetime.datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc)
+        offset = datetime.datetime(2024, 5, 1, 12, 30, tzinfo=datetime.timezone(datetime.timedelta(hours=3)))
+        self.assertSameBytes({
+            'utc': utc,
+            'offset': offset,
+            'naive': datetime.datetime(2024, 5, 1, 12, 30),
+            'date': datetime.date(2024, 5, 1),
+            'time': datetime.time(14, 0),
+        })
+
+    def test_types_handled_by_drf_encoder(self):
+        self.assertSameBytes({
+            'decimal': Decimal("120.50"),
+            'uuid': uuid.UUID("12345678-1234-5678-1234-567812345678"),
+            'lazy': gettext_lazy("Room"),
+            'duration': datetime.timedelta(hours=1, seconds=5),
+            'tuple': (1, 2),
+        })
+
+    def test_strings_and_keys(self):
+        self.assertSameBytes({
+            'unicode': "Zimmer \u00fc \u2603 \U0001f600",
+            'separators': "line\u2028para\u2029end",
+            'escapes': 'quote " backslash \\ newline \n',
+            1: "int key",
+        })
+
+    def test_numbers(self):
+        self.assertSameBytes({'int': 2 ** 53, 'float': 0.1, 'negative': -3, 'bool': True, 'big': 2 ** 70})
+
+    def test_non_finite_numbers_raise_like_stock(self):
+        for value in (float('nan'), float('inf'), [1.5, {'x': -float('inf')}], Decimal('NaN')):
+            with self.subTest(value=value):
+                with self.assertRaises(ValueError):
+                    JSONRenderer().render({'value': value})
+                with self.assertRaises(ValueError):
+                    ORJSONRenderer().render({'value': value})
+
+    def test_non_finite_numbers_without_strict_json(self):
+        renderer = ORJSONRenderer()
+        renderer.strict = False
+        stock = JSONRenderer()
+        stock.strict = False
+        data = {'value': float('nan'), 'none': None}
+        self.assertEqual(renderer.render(data), stock.render(data))
+
+    def test_indent_falls_back_to_stock(self):
+        self.assertSameBytes({'a': [1, 2]}, 'application/json; indent=4')
+
+    def test_none_renders_empty_body(self):
+        self.assertEqual(ORJSONRenderer().render(None), b'')
+
+
+@unittest.skipUnless(HAS_ORJSON, "orjson is not installed")
+class ORJSONParserTests(SimpleTestCase):
+    """ORJSONParser must parse bodies like DRF's JSONParser"""
+
+    def parse(self, parser, body, encoding='utf-8'):
+        return parser.parse(io.BytesIO(body), 'application/json', {'encoding': encoding})
+
+    def test_same_result_as_stock(self):
+        body = '{"number": "101", "price": 1.5, "tags": ["a", "\u00fc"], "floor": null}'.encode()
+        self.assertEqual(self.parse(ORJSONParser(), body), self.parse(JSONParser(), body))
+
+    def test_invalid_json(self):
+        with self.assertRaises(ParseError):
+            self.parse(ORJSONParser(), b'{"number": ')
+
+    def test_other_charset_uses_stock_parser(self):
+        body = '{"name": "Caf\u00e9"}'.encode('latin-1')
+        self.assertEqual(self.parse(ORJSONParser(), body, encoding='latin-1'), {'name': "Caf\u00e9"})
@@ -45,7 +45,7 @@ class UserCommand:
             )
         
         try:
-            user = User.objects.get(id=user_id, is_deleted=False)
+            user = User.objects.get(id=user_id)
             
             # Verify old password
             if not user.check_password(old_password):
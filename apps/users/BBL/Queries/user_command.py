@@ -1,8 +1,18 @@
 from http import HTTPStatus
+from django.db.models import Q
 from utils.base_result import BaseResultWithData
+from utils.fast_serializer import ValuesSerializer
 from utils.log_helpers import OperationLogger
+from utils.pagination import paginate_queryset
 from apps.users.models import User
-from apps.users.serializers import UserDetailSerializer
+from apps.users.serializers import UserSerializer, UserDetailSerializer
+
+
+def _to_bool(value):
+    """Parse a query string flag; None when not provided"""
+    if value is None or value == '':
+        return None
+    return str(value).lower() in ('1', 'true', 'yes')
 
 
 class UserCommand:
@@ -21,7 +31,7 @@ class UserCommand:
         """
         
         try:
-            user = User.objects.get(id=user_id, is_deleted=False)
+            user = User.objects.get(id=user_id)
             return BaseResultWithData(
                 message="User retrieved successfully",
                 data=UserDetailSerializer(user).data,
@@ -32,4 +42,63 @@ class UserCommand:
                 message="User not found",
                 status_code=HTTPStatus.NOT_FOUND
             )
-    
+
+    @staticmethod
+    def List(group=None, is_active=None, is_deleted=None, search=None, cursor=None, page_size=None, fields=None):
+        """
+        List users for the admin screens with keyset pagination.
+        
+        Args:
+            group (str): Group ID or name (optional)
+            is_active (str|bool): Active flag filter (optional)
+            is_deleted (str|bool): Deleted flag filter (default False)
+            search (str): Text search on username, email, names and id_number (optional)
+            cursor (str): Cursor from the previous page (optional)
+            page_size (int): Page size, capped at MAX_PAGE_SIZE (optional)
+            fields (str|list): Comma separated subset of UserSerializer fields (optional)
+            
+        Returns:
+            BaseResultWithData: Result with a page of users and the next cursor
+        """
+        if isinstance(fields, str):
+            fields = [field.strip() for field in fields.split(',') if field.strip()]
+        
+        if fields:
+            unknown = set(fields) - set(UserSerializer.Meta.fields)
+            if unknown:
+                return BaseResultWithData(
+                    message=f"Unknown fields: {', '.join(sorted(unknown))}",
+                    status_code=HTTPStatus.BAD_REQUEST
+                )
+        
+        is_deleted = _to_bool(is_deleted)
+        queryset = User.all_objects.filter(is_deleted=bool(is_deleted))
+        
+        is_active = _to_bool(is_active)
+        if is_active is not None:
+            queryset = queryset.filter(is_active=is_active)
+        
+        if group:
+            group_filter = Q(groups__id=group) if str(group).isdigit() else Q(groups__name=group)
+            queryset = queryset.filter(group_filter)
+        
+        if search:
+            queryset = queryset.filter(
+                Q(username__icontains=search)
+                | Q(email__icontains=search)
+                | Q(first_name__icontains=search)
+                | Q(last_name__icontains=search)
+                | Q(id_number__icontains=search)
+            )
+        
+        # Only the columns the projection needs, serialized straight from .values() rows
+        fast = ValuesSerializer.for_serializer(UserSerializer, fields or None)
+        
+        return paginate_queryset(
+            fast.values(queryset, extra_paths=['id']),
+            ['-id'],
+            fast.serialize_rows,
+            cursor=cursor,
+            page_size=page_size,
+            message="Users retrieved successfully"
+        )
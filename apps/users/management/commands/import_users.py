@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.administrator.BBL.Commands.user_import_command import UserImportCommand
+from apps.users.models import User
+
+
+class Command(BaseCommand):
+    help = 'Bulk imports users from a CSV, JSON or JSON lines file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Path to the import file')
+        parser.add_argument('--format', choices=['csv', 'json', 'jsonl'], help='File format (guessed from extension if omitted)')
+        parser.add_argument('--batch-size', type=int, help='Rows per transaction')
+        parser.add_argument('--performed-by', help='Username recorded as the importer in audit logs')
+
+    def handle(self, *args, **options):
+        performed_by = None
+        if options['performed_by']:
+            performed_by = User.objects.filter(username=options['performed_by']).first()
+            if not performed_by:
+                raise CommandError(f'User "{options["performed_by"]}" does not exist')
+
+        try:
+            with open(options['path'], 'rb') as file_obj:
+                result = UserImportCommand.Execute(
+                    file_obj=file_obj,
+                    file_format=options['format'] or UserImportCommand.detect_format(options['path']),
+                    performed_by=performed_by,
+                    batch_size=options['batch_size']
+                )
+        except FileNotFoundError:
+            raise CommandError(f'File "{options["path"]}" not found')
+
+        for error in (result.data or {}).get('errors', []):
+            self.stdout.write(
+                self.style.WARNING(f'Row {error["row"]} ({error["username"]}): {error["message"]}')
+            )
+
+        if result.is_success:
+            self.stdout.write(self.style.SUCCESS(result.message))
+        else:
+            self.stdout.write(self.style.ERROR(result.message))
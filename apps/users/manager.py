@@ -1,19 +1,23 @@
 from django.contrib.auth.base_user import BaseUserManager
 from django.contrib.auth.models import Group
+from django.db import models, transaction
 
+from utils.base_model import BaseModelQuerySet
 from utils.enums import GroupNames
 
-class UserManager(BaseUserManager):
+class UserManager(BaseUserManager.from_queryset(BaseModelQuerySet)):
     use_in_migrations =True
     
     
-    def create_user(self, username,password=None,  **extra_fields):
+    def create_user(self, username,password=None, group_name=None, **extra_fields):
         
         if not username:
             raise ValueError('username is required')
         
         user = self.model(username=username, **extra_fields)
         user.set_password(password)
+        # Group used to pick the id_number prefix before the initial insert
+        user._id_group_name = group_name
         
         customer_group, created = Group.objects.get_or_create(name=GroupNames.ADMIN.value)
         user.save(using=self.db)
@@ -30,4 +34,39 @@ class UserManager(BaseUserManager):
         if extra_fields.get('is_staff') is not True:
             raise ValueError(('super user must have is_staff true'))
         
-        return self.create_user(username, password,**extra_fields)
\ No newline at end of file
+        return self.create_user(username, password,**extra_fields)
+
+
+class ActiveUserManager(UserManager):
+    """UserManager that hides soft-deleted users (User.objects)"""
+    
+    def get_queryset(self):
+        return super().get_queryset().filter(is_deleted=False)
+
+
+class IdNumberCounterManager(models.Manager):
+    
+    def allocate(self, prefix, count=1):
+        """
+        Reserve a block of consecutive numbers for a prefix.
+        
+        The counter row is locked with SELECT ... FOR UPDATE, so concurrent
+        callers are serialized per prefix and never receive the same number.
+        
+        Args:
+            prefix (str): ID prefix (e.g. 'ADM')
+            count (int): Number of values to reserve
+            
+        Returns:
+            range: The reserved numbers
+        """
+        if count < 1:
+            raise ValueError('count must be at least 1')
+        
+        with transaction.atomic(using=self.db):
+            counter, created = self.select_for_update().get_or_create(prefix=prefix)
+            start = counter.last_value + 1
+            counter.last_value += count
+            counter.save(update_fields=['last_value'])
+        
+        return range(start, start + count)
@@ -0,0 +1,56 @@
+# Generated by Django 5.0.2 on 2026-10-19 15:35
+
+from django.db import migrations, models
+
+
+def seed_counters(apps, schema_editor):
+    """Start each prefix counter after the highest id_number already issued."""
+    User = apps.get_model("users", "User")
+    IdNumberCounter = apps.get_model("users", "IdNumberCounter")
+
+    last_values = {}
+    for id_number in User._base_manager.exclude(id_number__isnull=True).values_list(
+        "id_number", flat=True
+    ):
+        prefix, _, number = id_number.rpartition("-ID-")
+        if not prefix or not number.isdigit():
+            continue
+        last_values[prefix] = max(last_values.get(prefix, 0), int(number))
+
+    IdNumberCounter.objects.bulk_create(
+        [
+            IdNumberCounter(prefix=prefix, last_value=last_value)
+            for prefix, last_value in last_values.items()
+        ]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0002_alter_user_email_alter_user_username"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="IdNumberCounter",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("prefix", models.CharField(max_length=10, unique=True)),
+                ("last_value", models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                "verbose_name": "ID Number Counter",
+                "verbose_name_plural": "ID Number Counters",
+            },
+        ),
+        migrations.RunPython(seed_counters, migrations.RunPython.noop),
+    ]
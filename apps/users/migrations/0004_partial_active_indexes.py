@@ -0,0 +1,34 @@
+# Generated by Django 5.0.2 on 2026-10-19 15:49
+
+import apps.users.manager
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("users", "0003_idnumbercounter"),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name="user",
+            managers=[
+                ("all_objects", apps.users.manager.UserManager()),
+                ("objects", apps.users.manager.ActiveUserManager()),
+            ],
+        ),
+        migrations.RemoveIndex(
+            model_name="user",
+            name="users_user_id_7eb2ea_idx",
+        ),
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(
+                condition=models.Q(("is_deleted", False)),
+                fields=["-id"],
+                name="user_active_id_idx",
+            ),
+        ),
+    ]
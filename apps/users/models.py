@@ -1,6 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser
-from apps.users.manager import UserManager
+from apps.users.manager import ActiveUserManager, UserManager, IdNumberCounterManager
 from utils.base_model import BaseModel
 
 # Create your models here.
@@ -35,15 +35,32 @@ class User(BaseModel, AbstractUser):
         
     
 
-    objects=UserManager()
+    all_objects = UserManager()
+    objects = ActiveUserManager()
     USERNAME_FIELD ='username'
     REQUIRED_FIELDS=[]
 
     class Meta:
         ordering = ['-id']
         indexes = [
-            models.Index(fields=['-id']),
+            models.Index(fields=['-id'], name='user_active_id_idx', condition=models.Q(is_deleted=False)),
         ]
     
     def __str__(self):
         return f"{self.username}"
+
+
+class IdNumberCounter(models.Model):
+    """Per-prefix counter used to allocate sequential user id_numbers"""
+
+    prefix = models.CharField(max_length=10, unique=True)
+    last_value = models.PositiveBigIntegerField(default=0)
+
+    objects = IdNumberCounterManager()
+
+    class Meta:
+        verbose_name = "ID Number Counter"
+        verbose_name_plural = "ID Number Counters"
+
+    def __str__(self):
+        return f"{self.prefix} ({self.last_value})"
@@ -31,6 +31,19 @@ class UserSerializer(serializers.ModelSerializer):
             'modified_at',
             'is_deleted',
         ]
+        # Columns read by method fields, used by the values-based list path
+        method_field_sources = {
+            'full_name': ('first_name', 'last_name'),
+        }
+    
+    def __init__(self, *args, **kwargs):
+        """Accept an optional `fields` list to project a subset of fields"""
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        
+        if fields is not None:
+            for field_name in set(self.fields) - set(fields):
+                self.fields.pop(field_name)
     
     def get_full_name(self, obj):
         """Return full name of user"""
@@ -1,9 +1,7 @@
-from django.db.models.signals import pre_save, post_save
+from django.db.models.signals import m2m_changed, post_delete, pre_save, post_save
 from django.dispatch import receiver
-from django.utils import timezone
-from utils.base_model import BaseModel
-from utils.Middlewares.threadlocals import get_current_user
-from utils.enums import GroupNames
+from utils.cache_helper import GlobalCache
+from utils.enums import CacheKeys, GroupNames
 
 
 # Dynamic Group to ID prefix mapping based on enum
@@ -15,61 +13,81 @@ GROUP_ID_PREFIX = {
 }
 
 
-def generate_id_number(group_name):
-    """Generate an incremental ID number based on group."""
-    from apps.users.models import User
+def format_id_number(prefix, number):
+    """Format as 3-digit number with leading zeros"""
+    return f"{prefix}-ID-{number:03d}"
+
+
+def generate_id_numbers(group_name, count):
+    """Allocate a block of incremental ID numbers for a group (bulk imports)."""
+    from apps.users.models import IdNumberCounter
     
     prefix = GROUP_ID_PREFIX.get(group_name, 'USR')
-    
-    # Find the last user with this prefix
-    last_user = User.objects.filter(
-        id_number__startswith=f"{prefix}-ID-"
-    ).order_by('-id_number').first()
-    
-    if last_user and last_user.id_number:
-        try:
-            last_number = int(last_user.id_number.split('-')[-1])
-            next_number = last_number + 1
-        except (ValueError, IndexError):
-            next_number = 1
-    else:
-        next_number = 1
-    
-    # Format as 3-digit number with leading zeros
-    return f"{prefix}-ID-{next_number:03d}"
+    numbers = IdNumberCounter.objects.allocate(prefix, count)
+    return [format_id_number(prefix, number) for number in numbers]
 
 
+def primary_group_name(groups):
+    """
+    Name of the group that decides a new user's id_number prefix: the one
+    with the lowest pk, what user.groups.first() returns. None without groups.
+    """
+    groups = list(groups)
+    if not groups:
+        return None
+    return min(groups, key=lambda group: group.pk).name
 
-@receiver(post_save)
-def auto_assign_user_id_number(sender, instance, created, **kwargs):
-    """Auto-assign id_number for User model after creation based on groups"""
-    # Only for User model
-    if sender.__name__ != 'User':
-        return
-    
+
+def generate_id_number(group_name):
+    """Generate an incremental ID number based on group."""
+    return generate_id_numbers(group_name, 1)[0]
+
+
+
+@receiver(pre_save, sender='users.User')
+def auto_assign_user_id_number(sender, instance, **kwargs):
+    """Auto-assign id_number for User model before the initial insert"""
     # Only on creation
-    if not created:
+    if not instance._state.adding:
         return
     
     # Only if id_number not already assigned
     if instance.id_number:
         return
     
-    # Auto-assign Admin group to superusers if no groups
+    # Groups can't be read before insert, so callers pass the primary group name
+    group_name = getattr(instance, '_id_group_name', None)
+    if not group_name:
+        group_name = GroupNames.ADMIN.value if instance.is_superuser else GroupNames.USER.value
+    
+    instance.id_number = generate_id_number(group_name)
+
+
+@receiver(post_save, sender='users.User')
+def auto_assign_superuser_group(sender, instance, created, **kwargs):
+    """Auto-assign Admin group to superusers if no groups"""
+    if not created:
+        return
+    
     if instance.is_superuser and not instance.groups.exists():
         from django.contrib.auth.models import Group
         admin_group, _ = Group.objects.get_or_create(name=GroupNames.ADMIN.value)
         instance.groups.add(admin_group)
-    
-    # Get the primary group
-    groups = instance.groups.all()
-    if groups.exists():
-        group_name = groups.first().name
-        instance.id_number = generate_id_number(group_name)
-    else:
-        # Default to User group if no group assigned
-        instance.id_number = generate_id_number('User')
-    
-    # Save without triggering signals again
-    instance.save(update_fields=['id_number'])
-      
\ No newline at end of file
+
+
+# Saves that touch only these fields don't change the user list (logins, password changes)
+_UNLISTED_FIELDS = {'last_login', 'password'}
+
+
+@receiver(post_save, sender='users.User')
+@receiver(post_delete, sender='users.User')
+@receiver(m2m_changed, sender='users.User_groups')
+@receiver(post_save, sender='auth.Group')
+@receiver(post_delete, sender='auth.Group')
+def bump_users_version(sender, update_fields=None, action=None, **kwargs):
+    """Move the users namespace (list ETags) to a new version after user, membership or group writes"""
+    if action is not None and not action.startswith('post_'):
+        return
+    if update_fields and set(update_fields) <= _UNLISTED_FIELDS:
+        return
+    GlobalCache.bump_versions_on_commit(CacheKeys.USERS.value)
@@ -1,3 +1,180 @@
-from django.test import TestCase
+import threading
+import unittest
 
-# Create your tests here.
+from django.contrib.auth.models import Group
+from django.db import connection, connections
+from django.test import TestCase, TransactionTestCase
+from rest_framework.renderers import JSONRenderer
+
+from apps.administrator.BBL.Commands.user_command import UserCommand
+from apps.users.BBL.Queries.user_command import UserCommand as UserQueryCommand
+from apps.users.models import IdNumberCounter, User
+from apps.users.signals import generate_id_numbers, primary_group_name
+from apps.users.serializers import UserSerializer
+from utils.fast_serializer import ValuesSerializer
+
+
+class UserValuesSerializerTests(TestCase):
+    """The .values() read path must render exactly what UserSerializer renders"""
+
+    @classmethod
+    def setUpTestData(cls):
+        staff = Group.objects.create(name="Staff")
+        manager = Group.objects.create(name="Manager")
+
+        both = User.objects.create_user(username="alice", password="x", first_name="Alice", last_name="Smith")
+        both.groups.set([staff, manager])
+        one = User.objects.create_user(username="bob", password="x", email="bob@example.com", first_name="Bob")
+        one.groups.set([staff])
+        # No groups, null email and an empty last name for the method field
+        User.objects.create_user(username="carol", password="x", email=None, is_active=False)
+
+    def assertSameOutput(self, queryset, fields=None):
+        expected = UserSerializer(queryset, many=True, fields=fields).data
+        actual = ValuesSerializer.for_serializer(UserSerializer, fields).serialize(queryset)
+
+        self.assertEqual(actual, expected)
+        self.assertEqual(JSONRenderer().render(actual), JSONRenderer().render(expected))
+
+    def test_method_field_m2m_groups_and_nulls(self):
+        self.assertSameOutput(User.objects.order_by('username'))
+
+    def test_field_subset(self):
+        self.assertSameOutput(User.objects.order_by('-id'), fields=['id', 'full_name', 'groups'])
+
+    def test_many_field_query_count(self):
+        fast = ValuesSerializer.for_serializer(UserSerializer)
+        # One query for the rows and one for every user's groups
+        with self.assertNumQueries(2):
+            fast.serialize(User.objects.all())
+
+
+class UserListTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = Group.objects.create(name="Staff")
+        manager = Group.objects.create(name="Manager")
+
+        alice = User.objects.create_user(username="alice", password="x", email="alice@example.com", first_name="Alice")
+        alice.groups.set([cls.staff, manager])
+        bob = User.objects.create_user(username="bob", password="x", last_name="Walker", is_active=False)
+        bob.groups.set([cls.staff])
+        User.objects.create_user(username="carol", password="x", first_name="Carol")
+        gone = User.objects.create_user(username="dave", password="x")
+        User.all_objects.filter(pk=gone.pk).update(is_deleted=True)
+
+    def usernames(self, **kwargs):
+        result = UserQueryCommand.List(**kwargs)
+        self.assertEqual(result.status_code, 200, result.message)
+        return [user['username'] for user in result.data['results']]
+
+    def test_default_lists_live_users_newest_first(self):
+        self.assertEqual(self.usernames(), ["carol", "bob", "alice"])
+
+    def test_filters(self):
+        self.assertEqual(self.usernames(is_deleted="true"), ["dave"])
+        self.assertEqual(self.usernames(is_active="false"), ["bob"])
+        self.assertEqual(self.usernames(is_active="1"), ["carol", "alice"])
+        self.assertEqual(self.usernames(group="Manager"), ["alice"])
+        self.assertEqual(self.usernames(group=str(self.staff.pk)), ["bob", "alice"])
+        self.assertEqual(self.usernames(group="Staff", is_active="true"), ["alice"])
+
+    def test_search(self):
+        self.assertEqual(self.usernames(search="ALICE@"), ["alice"])
+        self.assertEqual(self.usernames(search="walk"), ["bob"])
+        self.assertEqual(self.usernames(search="car"), ["carol"])
+        usr = User.objects.get(username="bob").id_number
+        self.assertEqual(self.usernames(search=usr), ["bob"])
+
+    def test_pages_and_fields(self):
+        first = UserQueryCommand.List(page_size=2, fields="id,username")
+        self.assertEqual([set(user) for user in first.data['results']], [{'id', 'username'}] * 2)
+        self.assertTrue(first.data['has_more'])
+
+        rest = UserQueryCommand.List(page_size=2, cursor=first.data['next_cursor'])
+        self.assertEqual([user['username'] for user in rest.data['results']], ["alice"])
+        self.assertFalse(rest.data['has_more'])
+
+    def test_unknown_field_and_bad_cursor(self):
+        self.assertEqual(UserQueryCommand.List(fields="username,password").status_code, 400)
+        self.assertEqual(UserQueryCommand.List(cursor="garbage").status_code, 400)
+
+
+class IdNumberAllocationTests(TestCase):
+
+    def test_blocks_are_contiguous_and_never_overlap(self):
+        first = IdNumberCounter.objects.allocate('TST', 3)
+        second = IdNumberCounter.objects.allocate('TST', 2)
+        other = IdNumberCounter.objects.allocate('OTH', 1)
+
+        self.assertEqual(list(first), [1, 2, 3])
+        self.assertEqual(list(second), [4, 5])
+        self.assertEqual(list(other), [1])
+        self.assertEqual(IdNumberCounter.objects.get(prefix='TST').last_value, 5)
+
+    def test_count_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            IdNumberCounter.objects.allocate('TST', 0)
+
+    def test_prefix_per_group(self):
+        self.assertEqual(generate_id_numbers("Admin", 2), ["ADM-ID-001", "ADM-ID-002"])
+        self.assertEqual(generate_id_numbers("Manager", 1), ["MGR-ID-001"])
+        self.assertEqual(generate_id_numbers("Staff", 1), ["STA-ID-001"])
+        self.assertEqual(generate_id_numbers("User", 1), ["USR-ID-001"])
+        # Unknown groups share the User sequence
+        self.assertEqual(generate_id_numbers("Cleaning", 1), ["USR-ID-002"])
+
+    def test_primary_group_is_lowest_pk(self):
+        admin = Group.objects.create(name="Admin")
+        staff = Group.objects.create(name="Staff")
+
+        self.assertEqual(primary_group_name([staff, admin]), "Admin")
+        self.assertIsNone(primary_group_name([]))
+
+    def test_create_uses_the_primary_group_prefix(self):
+        admin = Group.objects.create(name="Admin")
+        staff = Group.objects.create(name="Staff")
+
+        result = UserCommand.Create("dana", "Dana", "Lee", "pw-12345!", [staff, admin])
+
+        self.assertEqual(User.objects.get(username="dana").id_number, "ADM-ID-001", result.message)
+
+    def test_create_assigns_consecutive_numbers(self):
+        staff = Group.objects.create(name="Staff")
+
+        for username in ("eve", "finn"):
+            UserCommand.Create(username, "First", "Last", "pw-12345!", [staff])
+
+        self.assertEqual(
+            list(User.objects.order_by('id').values_list('id_number', flat=True)),
+            ["STA-ID-001", "STA-ID-002"],
+        )
+
+
+@unittest.skipUnless(connection.features.has_select_for_update, "needs row locks (SELECT ... FOR UPDATE)")
+class ConcurrentIdNumberAllocationTests(TransactionTestCase):
+
+    def test_concurrent_allocations_never_share_a_number(self):
+        allocated = []
+        errors = []
+        start = threading.Barrier(8)
+
+        def allocate():
+            try:
+                start.wait()
+                for _ in range(5):
+                    allocated.extend(IdNumberCounter.objects.allocate('CON', 3))
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=allocate) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(sorted(allocated), list(range(1, 8 * 5 * 3 + 1)))
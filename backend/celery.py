@@ -10,6 +10,14 @@ app.config_from_object('django.conf:settings', namespace='CELERY')
 
 app.autodiscover_tasks()
 
+app.conf.beat_schedule = {
+    # Move rows soft-deleted longer than ARCHIVE_AFTER_DAYS out of the hot tables
+    'archive-soft-deleted': {
+        'task': 'apps.administrator.tasks.archive_soft_deleted',
+        'schedule': crontab(hour=3, minute=30),
+    },
+}
+
 
 @app.task(bind=True)
 def debug_task(self):
@@ -41,14 +41,19 @@ THIRD_PARTY_APPS = [
 INSTALLED_APPS = DEFAULT_APPS + CUSTOM_APPS + THIRD_PARTY_APPS
 
 MIDDLEWARE = [
+    # First, so the root span covers every other middleware
+    'utils.Middlewares.tracing.TracingMiddleware',
+    'utils.Middlewares.metrics.MetricsMiddleware',
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    # Admin-only, opt-in per request (X-Profile header)
+    'utils.Middlewares.profiling.ProfilingMiddleware',
     
-    'utils.Middlewares.threadlocals.CurrentUserMiddleware',
+    'utils.Middlewares.request_context.CurrentUserMiddleware',
     
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
@@ -83,24 +88,77 @@ WSGI_APPLICATION = "backend.wsgi.application"
 DATABASES = {}
 
 # Redis Cache Configuration
+# Values up to CACHE_COMPRESS_MIN_BYTES are stored uncompressed
+CACHE_COMPRESS_MIN_BYTES = int(os.environ.get("CACHE_COMPRESS_MIN_BYTES", 1024))
+
+_REDIS_CACHE_OPTIONS = {
+    # DefaultClient plus per-namespace metrics (see cache_stats / admin system endpoints)
+    "CLIENT_CLASS": "utils.cache_metrics.InstrumentedRedisClient",
+    "PARSER_KWARGS": {"encoding": "utf8"},
+    "SOCKET_CONNECT_TIMEOUT": 5,
+    "SOCKET_TIMEOUT": 5,
+    "COMPRESSOR": "utils.cache_codecs.ThresholdZlibCompressor",
+    "COMPRESS_MIN_BYTES": CACHE_COMPRESS_MIN_BYTES,
+}
+
 CACHES = {
     "default": {
         "BACKEND": "django_redis.cache.RedisCache",
         "LOCATION": os.environ.get("REDIS_URL", "redis://127.0.0.1:6379/1"),
         "OPTIONS": {
-            "CLIENT_CLASS": "django_redis.client.DefaultClient",
-            "PARSER_KWARGS": {"encoding": "utf8"},
-            "SOCKET_CONNECT_TIMEOUT": 5,
-            "SOCKET_TIMEOUT": 5,
-            "COMPRESSOR": "django_redis.compressors.zlib.ZlibCompressor",
+            **_REDIS_CACHE_OPTIONS,
             "SERIALIZER": "django_redis.serializers.json.JSONSerializer",
         },
-    }
+    },
+    # Same Redis, binary codec for large payloads; own prefix so codecs never mix
+    "msgpack": {
+        "BACKEND": "django_redis.cache.RedisCache",
+        "LOCATION": os.environ.get("REDIS_URL", "redis://127.0.0.1:6379/1"),
+        "KEY_PREFIX": "mp",
+        "OPTIONS": {
+            **_REDIS_CACHE_OPTIONS,
+            "SERIALIZER": "utils.cache_codecs.MsgpackSerializer",
+        },
+    },
+}
+
+# Cache metrics: each worker adds its counters to a Redis hash this often (seconds)
+CACHE_METRICS_ENABLED = os.environ.get("CACHE_METRICS_ENABLED", "true").lower() == "true"
+CACHE_METRICS_FLUSH_INTERVAL = int(os.environ.get("CACHE_METRICS_FLUSH_INTERVAL", 10))
+
+# Cache namespace (key prefix) -> CACHES alias, see GlobalCache
+CACHE_NAMESPACE_ALIASES = {
+    "administrator:dashboard": "msgpack",
+    "hostel:rooms": "msgpack",
 }
 
 # Cache TTL (Time To Live) in seconds - 1 day default
 CACHE_TTL = int(os.environ.get("CACHE_TTL", 60 * 60 * 24))
 
+# In-process L1 in front of Redis for keys read with local=True
+CACHE_L1_ENABLED = os.environ.get("CACHE_L1_ENABLED", "true").lower() == "true"
+CACHE_L1_MAX_ENTRIES = int(os.environ.get("CACHE_L1_MAX_ENTRIES", 1024))
+CACHE_L1_TTL = int(os.environ.get("CACHE_L1_TTL", 30))  # upper bound on staleness if an invalidation is lost
+CACHE_L1_RECONNECT_MAX_DELAY = int(os.environ.get("CACHE_L1_RECONNECT_MAX_DELAY", 30))  # seconds between reconnects while Redis is down
+
+# GlobalCache.get_or_compute stampede protection
+CACHE_COMPUTE_LOCK_TIMEOUT = int(os.environ.get("CACHE_COMPUTE_LOCK_TIMEOUT", 30))
+CACHE_COMPUTE_WAIT_TIMEOUT = float(os.environ.get("CACHE_COMPUTE_WAIT_TIMEOUT", 2.0))
+CACHE_COMPUTE_STALE_TTL = int(os.environ.get("CACHE_COMPUTE_STALE_TTL", 300))
+DASHBOARD_CACHE_TTL = int(os.environ.get("DASHBOARD_CACHE_TTL", 60))
+
+# Bulk user import
+USER_IMPORT_BATCH_SIZE = int(os.environ.get("USER_IMPORT_BATCH_SIZE", 500))
+USER_IMPORT_HASH_WORKERS = int(os.environ["USER_IMPORT_HASH_WORKERS"]) if os.environ.get("USER_IMPORT_HASH_WORKERS") else None  # Hashing threads, None = CPU count
+
+# Bulk floor / room endpoints
+BULK_MAX_ITEMS = int(os.environ.get("BULK_MAX_ITEMS", 500))
+
+# Archival of long soft-deleted rows
+ARCHIVE_AFTER_DAYS = int(os.environ.get("ARCHIVE_AFTER_DAYS", 90))
+ARCHIVE_BATCH_SIZE = int(os.environ.get("ARCHIVE_BATCH_SIZE", 500))
+ARCHIVE_MODELS = ["hostel.Room", "hostel.Floor", "hostel.RoomType", "users.User"]  # dependents first
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
@@ -189,13 +247,13 @@ REST_FRAMEWORK = {
         "rest_framework_simplejwt.authentication.JWTAuthentication",
     ),
     "DEFAULT_RENDERER_CLASSES": [
-        "rest_framework.renderers.JSONRenderer",
+        "utils.renderers.ORJSONRenderer",
     ],
     # "EXCEPTION_HANDLER": "drf_standardized_errors.handler.exception_handler",
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 20,
     "DEFAULT_PARSER_CLASSES": (
-        "rest_framework.parsers.JSONParser",
+        "utils.renderers.ORJSONParser",
         "rest_framework.parsers.FormParser",
         "rest_framework.parsers.MultiPartParser",
     ),
@@ -231,6 +289,55 @@ ADMINS = [
 LOG_DIR = 'logs'
 os.makedirs(LOG_DIR, exist_ok=True)
 
+# Request tracing (utils.tracing): share of requests traced, and where traces go
+TRACE_SAMPLE_RATE = float(os.environ.get("TRACE_SAMPLE_RATE", 0.0))
+TRACE_EXPORTER = os.environ.get("TRACE_EXPORTER", "jsonl")  # "jsonl" or "otlp"
+TRACE_JSONL_PATH = os.path.join(LOG_DIR, "traces.jsonl")
+TRACE_OTLP_ENDPOINT = os.environ.get("TRACE_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+TRACE_SERVICE_NAME = os.environ.get("TRACE_SERVICE_NAME", "hostel-api")
+
+# /metrics (utils.metrics) is closed by default. With a token, scrapers must send
+# "Authorization: Bearer <token>"; without one, only clients in METRICS_ALLOWED_NETWORKS
+# (comma separated CIDRs, as seen in REMOTE_ADDR, so not behind a local reverse proxy).
+# Multi-process servers also need PROMETHEUS_MULTIPROC_DIR in the environment.
+METRICS_AUTH_TOKEN = os.environ.get("METRICS_AUTH_TOKEN")
+METRICS_ALLOWED_NETWORKS = [network.strip() for network in os.environ.get("METRICS_ALLOWED_NETWORKS", "").split(",") if network.strip()]
+
+# On-demand request profiling (utils.profiling)
+PROFILE_DIR = os.path.join(LOG_DIR, "profiles")
+PROFILE_SAMPLE_INTERVAL = float(os.environ.get("PROFILE_SAMPLE_INTERVAL", 0.005))
+PROFILE_MAX_CONCURRENT = int(os.environ.get("PROFILE_MAX_CONCURRENT", 1))
+PROFILE_MAX_PER_MINUTE = int(os.environ.get("PROFILE_MAX_PER_MINUTE", 6))
+PROFILE_KEEP = int(os.environ.get("PROFILE_KEEP", 50))
+
+# Slow query log (utils.slow_queries): queries over SLOW_QUERY_MS go to slow_queries.log with their plan
+SLOW_QUERY_ENABLED = os.environ.get("SLOW_QUERY_ENABLED", "True").lower() == "true"
+SLOW_QUERY_MS = float(os.environ.get("SLOW_QUERY_MS", 200))
+SLOW_QUERY_EXPLAIN = os.environ.get("SLOW_QUERY_EXPLAIN", "True").lower() == "true"
+SLOW_QUERY_EXPLAIN_INTERVAL = int(os.environ.get("SLOW_QUERY_EXPLAIN_INTERVAL", 600))
+SLOW_QUERY_LOG_PATH = os.path.join(LOG_DIR, "slow_queries.log")
+# Rotated slow query files (newest first) the admin summary reads besides the live log
+SLOW_QUERY_SUMMARY_FILES = int(os.environ.get("SLOW_QUERY_SUMMARY_FILES", 3))
+
+# app.log rotation: by size (LOG_MAX_BYTES) unless LOG_ROTATE_WHEN is set (e.g. "midnight")
+LOG_MAX_BYTES = int(os.environ.get("LOG_MAX_BYTES", 10 * 1024 * 1024))
+LOG_BACKUP_COUNT = int(os.environ.get("LOG_BACKUP_COUNT", 10))
+LOG_ROTATE_WHEN = os.environ.get("LOG_ROTATE_WHEN")
+LOG_QUEUE_SIZE = int(os.environ.get("LOG_QUEUE_SIZE", 10000))
+
+_LOG_FILE_HANDLER = {
+    'level': 'ERROR',  # Only write errors and tracebacks to file
+    'filename': os.path.join(LOG_DIR, 'app.log'),
+    'formatter': 'json',
+    'backupCount': LOG_BACKUP_COUNT,
+    'encoding': 'utf-8',
+    'delay': True,
+}
+if LOG_ROTATE_WHEN:
+    _LOG_FILE_HANDLER.update({'class': 'utils.logger.CompressedTimedRotatingFileHandler', 'when': LOG_ROTATE_WHEN, 'utc': True})
+else:
+    _LOG_FILE_HANDLER.update({'class': 'utils.logger.CompressedRotatingFileHandler', 'maxBytes': LOG_MAX_BYTES})
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -249,6 +356,10 @@ LOGGING = {
             'format': '{levelname}: {message}',
             'style': '{',
         },
+        # One JSON object per line
+        'json': {
+            '()': 'utils.logger.JSONFormatter',
+        },
     },
 
     # ===== FILTERS =====
@@ -266,25 +377,43 @@ LOGGING = {
         'console': {
             'level': 'DEBUG',  # Show everything in console
             'class': 'logging.StreamHandler',
-            'formatter': 'verbose',
-        },
-        'file': {
-            'level': 'ERROR',  # Only write errors and tracebacks to file
-            'class': 'logging.FileHandler',
-            'filename': os.path.join(LOG_DIR, 'app.log'),
-            'formatter': 'verbose',
+            'formatter': 'structured',
         },
+        'file': _LOG_FILE_HANDLER,
         'mail_admins': {
             'level': 'ERROR',
             'class': 'django.utils.log.AdminEmailHandler',
             'formatter': 'verbose',
             'filters': ['require_debug_false'],
         },
+        # Hands records to console + file on a background thread. Its name must
+        # sort after the handlers it references (dictConfig builds them by name)
+        'queue': {
+            '()': 'utils.logger.QueueListenerHandler',
+            'handlers': ['cfg://handlers.console', 'cfg://handlers.file'],
+            'queue_size': LOG_QUEUE_SIZE,
+        },
+        # Slow query log, JSON lines read back by the admin summary (utils.slow_queries)
+        'slow_query_file': {
+            'level': 'WARNING',
+            'class': 'utils.logger.CompressedRotatingFileHandler',
+            'filename': SLOW_QUERY_LOG_PATH,
+            'maxBytes': LOG_MAX_BYTES,
+            'backupCount': LOG_BACKUP_COUNT,
+            'formatter': 'json',
+            'encoding': 'utf-8',
+            'delay': True,
+        },
+        'slow_query_queue': {
+            '()': 'utils.logger.QueueListenerHandler',
+            'handlers': ['cfg://handlers.slow_query_file'],
+            'queue_size': LOG_QUEUE_SIZE,
+        },
     },
 
     # ===== ROOT LOGGER =====
     'root': {
-        'handlers': ['console', 'file'],
+        'handlers': ['queue'],
         'level': 'DEBUG',
     },
 
@@ -292,14 +421,14 @@ LOGGING = {
     'loggers': {
         # General Django logs
         'django': {
-            'handlers': ['console', 'file'],
+            'handlers': ['queue'],
             'level': 'INFO',
             'propagate': True,
         },
 
         # 🔥 Request logger: captures 500s with traceback
         'django.request': {
-            'handlers': ['console', 'file'],
+            'handlers': ['queue'],
             'level': 'ERROR',
             'propagate': False,
         },
@@ -314,9 +443,15 @@ LOGGING = {
             'propagate': False,
         },
 
+        'utils.slow_queries': {
+            'handlers': ['slow_query_queue'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+
         # Optional: your project logger
         'project': {
-            'handlers': ['console', 'file'],
+            'handlers': ['queue'],
             'level': 'DEBUG',
             'propagate': False,
         },
@@ -34,4 +34,11 @@ CORS_ALLOWED_ORIGINS = [
     "http://127.0.0.1:5501",
     "http://127.0.0.1:5501",
     "http://192.168.0.199:5501"
-]
\ No newline at end of file
+]
+
+# Query counts / N+1 detection per request (utils.Middlewares.query_budget)
+MIDDLEWARE = MIDDLEWARE + ['utils.Middlewares.query_budget.QueryBudgetMiddleware']
+QUERY_BUDGET_DEFAULT = int(os.environ["QUERY_BUDGET_DEFAULT"]) if os.environ.get("QUERY_BUDGET_DEFAULT") else None
+QUERY_BUDGET_ENFORCE = os.environ.get("QUERY_BUDGET_ENFORCE", "False").lower() == "true"
+QUERY_BUDGET_N_PLUS_ONE_THRESHOLD = int(os.environ.get("QUERY_BUDGET_N_PLUS_ONE_THRESHOLD", 5))
+QUERY_BUDGET_REPORT_PATH = os.path.join(LOG_DIR, "query_budget.jsonl")
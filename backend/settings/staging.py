@@ -20,4 +20,11 @@ EMAIL_USE_SSL = True
 EMAIL_PORT = os.environ.get("EMAIL_PORT")
 EMAIL_HOST_USER = os.environ.get("EMAIL_USER")
 EMAIL_HOST_PASSWORD = os.environ.get("EMAIL_PASSWORD")
-DEFAULT_FROM_EMAIL = "no-reply@yourdomain.com"
\ No newline at end of file
+DEFAULT_FROM_EMAIL = "no-reply@yourdomain.com"
+
+# Query counts / N+1 detection per request (utils.Middlewares.query_budget)
+MIDDLEWARE = MIDDLEWARE + ['utils.Middlewares.query_budget.QueryBudgetMiddleware']
+QUERY_BUDGET_DEFAULT = int(os.environ["QUERY_BUDGET_DEFAULT"]) if os.environ.get("QUERY_BUDGET_DEFAULT") else None
+QUERY_BUDGET_ENFORCE = os.environ.get("QUERY_BUDGET_ENFORCE", "False").lower() == "true"
+QUERY_BUDGET_N_PLUS_ONE_THRESHOLD = int(os.environ.get("QUERY_BUDGET_N_PLUS_ONE_THRESHOLD", 5))
+QUERY_BUDGET_REPORT_PATH = os.path.join(LOG_DIR, "query_budget.jsonl")
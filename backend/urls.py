@@ -9,6 +9,7 @@ from django.views.static import serve
 from django.views.generic import RedirectView
 
 from backend.schema import BothHttpAndHttpsSchemaGenerator, swagger_protect
+from utils.metrics import metrics_view
 
 
 schema_view = get_schema_view(
@@ -31,6 +32,7 @@ urlpatterns = [
     path('auth/api/', include("apps.users.urls")),
     path('hotel/api/', include("apps.hostel.urls")),
     path('admin/api/', include("apps.administrator.urls")),
+    path('metrics', metrics_view, name='metrics'),
     
     path(
         "doc/",
@@ -0,0 +1,46 @@
+import time
+
+from django.core.exceptions import MiddlewareNotUsed
+
+from utils.db import execute_wrapper
+from utils.metrics import HAS_PROMETHEUS, record_request
+
+UNRESOLVED_VIEW = "<unresolved>"
+
+
+class _QueryTimer:
+    """Execute wrapper collecting the query durations of one request"""
+
+    def __init__(self):
+        self.durations = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.durations.append(time.perf_counter() - start)
+
+
+class MetricsMiddleware:
+    """
+    Request latency and ORM queries per URL name for /metrics (utils.metrics).
+    Unnamed or unresolved routes share one "<unresolved>" series so scans
+    and 404s can't blow up the label count. Removed from the stack when
+    prometheus_client is not installed.
+    """
+    def __init__(self, get_response):
+        if not HAS_PROMETHEUS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timer = _QueryTimer()
+        start = time.perf_counter()
+        with execute_wrapper(timer):
+            response = self.get_response(request)
+
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match is not None and match.url_name else UNRESOLVED_VIEW
+        record_request(request.method, view, response.status_code, time.perf_counter() - start, timer.durations)
+        return response
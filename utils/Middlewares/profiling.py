@@ -0,0 +1,64 @@
+import logging
+
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+
+from utils.enums import GroupNames
+from utils.profiling import MODES, RateLimited, profile
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_QUERY_PARAM = "__profile"
+
+
+def _requested_mode(request):
+    value = request.headers.get(PROFILE_HEADER) or request.GET.get(PROFILE_QUERY_PARAM)
+    if not value:
+        return None
+    value = value.lower()
+    return value if value in MODES else 'sample'
+
+
+def _is_admin(request):
+    # DRF authenticates in the view, after this middleware; check the JWT here
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        try:
+            authenticated = JWTAuthentication().authenticate(request)
+        except (InvalidToken, AuthenticationFailed):
+            return False
+        user = authenticated[0] if authenticated else None
+    return user is not None and user.groups.filter(name=GroupNames.ADMIN.value).exists()
+
+
+class ProfilingMiddleware:
+    """
+    Profiles a request when an admin asks for it with an "X-Profile: sample"
+    (or "cprofile") header or a ?__profile=sample query flag. The response
+    names the stored profile in X-Profile-Id; download it from
+    admin/api/system/profiles/<name>/. The flag is ignored for everyone else.
+
+    When no session is available (see utils.profiling) the request runs
+    unprofiled and the response says X-Profile: rate-limited.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        mode = _requested_mode(request)
+        if mode is None or not _is_admin(request):
+            return self.get_response(request)
+
+        try:
+            with profile(mode, f"{request.method} {request.path}") as result:
+                response = self.get_response(request)
+        except RateLimited as e:
+            logger.info(f"Profiling of {request.method} {request.path} skipped: {e}")
+            response = self.get_response(request)
+            response[PROFILE_HEADER] = 'rate-limited'
+            return response
+
+        response['X-Profile-Id'] = result['name']
+        return response
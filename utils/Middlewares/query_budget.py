@@ -0,0 +1,143 @@
+import json
+import logging
+import os
+import time
+from http import HTTPStatus
+
+from django.conf import settings
+from django.http import JsonResponse
+
+from utils.base_result import BaseResultWithData
+from utils.db import execute_wrapper, fingerprint
+
+logger = logging.getLogger(__name__)
+
+QUERY_BUDGET_DEFAULT = getattr(settings, "QUERY_BUDGET_DEFAULT", None)
+QUERY_BUDGET_ENFORCE = getattr(settings, "QUERY_BUDGET_ENFORCE", False)
+QUERY_BUDGET_N_PLUS_ONE_THRESHOLD = getattr(settings, "QUERY_BUDGET_N_PLUS_ONE_THRESHOLD", 5)
+QUERY_BUDGET_REPORT_PATH = getattr(
+    settings, "QUERY_BUDGET_REPORT_PATH", os.path.join(getattr(settings, "LOG_DIR", "logs"), "query_budget.jsonl")
+)
+QUERY_BUDGET_SQL_MAX_LENGTH = 500
+
+
+def query_budget(max_queries):
+    """
+    Maximum number of queries one request to this view may run.
+
+    Example:
+        @query_budget(10)
+        class RoomListAPIView(generics.GenericAPIView):
+            ...
+    """
+    def decorator(view):
+        view.query_budget = max_queries
+        return view
+    return decorator
+
+
+def _view_budget(view_func):
+    # DRF / class based views keep the class on the function returned by as_view()
+    view = getattr(view_func, 'cls', None) or getattr(view_func, 'view_class', None) or view_func
+    return getattr(view, 'query_budget', QUERY_BUDGET_DEFAULT)
+
+
+class QueryRecorder:
+    """Counts the queries of one request and groups them by shape"""
+
+    def __init__(self):
+        self.count = 0
+        self.time_ms = 0.0
+        self.shapes = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self.count += 1
+            self.time_ms += elapsed_ms
+            shape = self.shapes.setdefault(fingerprint(sql), {'count': 0, 'time_ms': 0.0, 'sample': sql})
+            shape['count'] += 1
+            shape['time_ms'] += elapsed_ms
+
+    def n_plus_one(self):
+        """Query shapes repeated QUERY_BUDGET_N_PLUS_ONE_THRESHOLD times or more, most repeated first"""
+        repeated = [
+            {
+                'count': shape['count'],
+                'time_ms': round(shape['time_ms'], 3),
+                'sql': shape['sample'][:QUERY_BUDGET_SQL_MAX_LENGTH],
+            }
+            for shape in self.shapes.values() if shape['count'] >= QUERY_BUDGET_N_PLUS_ONE_THRESHOLD
+        ]
+        return sorted(repeated, key=lambda shape: -shape['count'])
+
+
+class QueryBudgetMiddleware:
+    """
+    Counts the queries and DB time of every request and flags query shapes
+    repeated QUERY_BUDGET_N_PLUS_ONE_THRESHOLD+ times as likely N+1s.
+
+    Every response gets X-Query-Count / X-Query-Time-Ms / X-Query-N-Plus-One
+    headers and a ``query_report`` attribute (what the test client returns,
+    so tests can assert on it). Requests that flag an N+1 or go over budget
+    are logged and appended to QUERY_BUDGET_REPORT_PATH.
+
+    The budget is the view's ``query_budget`` (see @query_budget) or
+    QUERY_BUDGET_DEFAULT. With QUERY_BUDGET_ENFORCE, an over-budget request
+    is answered with a 500 instead of its response.
+
+    Meant for dev / staging: it adds a wrapper around every query.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        with execute_wrapper(recorder):
+            response = self.get_response(request)
+
+        match = getattr(request, 'resolver_match', None)
+        budget = _view_budget(match.func) if match is not None else QUERY_BUDGET_DEFAULT
+        report = {
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match is not None else None,
+            'status_code': response.status_code,
+            'queries': recorder.count,
+            'db_time_ms': round(recorder.time_ms, 3),
+            'budget': budget,
+            'over_budget': budget is not None and recorder.count > budget,
+            'n_plus_one': recorder.n_plus_one(),
+        }
+
+        if report['over_budget'] or report['n_plus_one']:
+            self._write_report(report)
+            logger.warning(
+                f"{request.method} {request.path}: {recorder.count} queries (budget {budget}), "
+                f"{len(report['n_plus_one'])} repeated query shape(s)"
+            )
+
+        if report['over_budget'] and QUERY_BUDGET_ENFORCE:
+            result = BaseResultWithData(
+                message=f"Query budget exceeded: {recorder.count} queries, budget is {budget}",
+                data=report,
+                status_code=HTTPStatus.INTERNAL_SERVER_ERROR,
+            )
+            response = JsonResponse(result.to_dict(), status=result.status_code)
+
+        response.query_report = report
+        response['X-Query-Count'] = str(recorder.count)
+        response['X-Query-Time-Ms'] = f"{recorder.time_ms:.3f}"
+        response['X-Query-N-Plus-One'] = str(len(report['n_plus_one']))
+        return response
+
+    @staticmethod
+    def _write_report(report):
+        try:
+            with open(QUERY_BUDGET_REPORT_PATH, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(report, default=str) + "\n")
+        except OSError as e:
+            logger.warning(f"Could not write query budget report: {e}")
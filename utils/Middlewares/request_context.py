@@ -0,0 +1,29 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from utils.request_context import request_context
+
+
+class CurrentUserMiddleware:
+    """
+    Binds the request to the current context (utils.request_context) for
+    the duration of the request, so model saves and audit fields see its
+    user. Works under WSGI and ASGI; the binding is reset when the response
+    is returned, even on errors.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with request_context(request):
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        with request_context(request):
+            return await self.get_response(request)
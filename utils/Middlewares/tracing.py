@@ -0,0 +1,21 @@
+from utils.tracing import trace
+
+
+class TracingMiddleware:
+    """
+    Root span per request for a TRACE_SAMPLE_RATE share of requests.
+    Sampled responses carry the trace id in X-Trace-Id.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with trace(f"{request.method} {request.path}", method=request.method, path=request.path) as root:
+            response = self.get_response(request)
+            if root is not None:
+                root.set_attribute('status_code', response.status_code)
+                match = getattr(request, 'resolver_match', None)
+                if match is not None:
+                    root.set_attribute('route', match.route)
+                response['X-Trace-Id'] = root.trace.trace_id
+            return response
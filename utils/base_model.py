@@ -1,4 +1,79 @@
 from django.db import models
+from django.db.models import Case, F, Q, Value, When
+from django.utils import timezone
+
+from utils.request_context import get_current_username
+
+
+class BaseModelQuerySet(models.QuerySet):
+    """
+    QuerySet that stamps the audit fields on bulk writes.
+
+    bulk_create, bulk_update and update() skip pre_save signals, so the
+    stamping done by auto_fill_audit_fields is repeated here using the
+    current user. Values set explicitly by the caller are kept.
+    """
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        action_by = get_current_username()
+        now = timezone.now()
+        for obj in objs:
+            if not obj.created_by:
+                obj.created_by = action_by
+            if obj.is_deleted and not obj.deleted_at:
+                obj.deleted_at = now
+                obj.deleted_by = action_by
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs = list(objs)
+        fields = list(fields)
+        action_by = get_current_username()
+        now = timezone.now()
+        # auto_now isn't applied by bulk_update either
+        for obj in objs:
+            obj.modified_at = now
+            obj.modified_by = action_by
+        stamped = ['modified_at', 'modified_by']
+
+        if 'is_deleted' in fields:
+            for obj in objs:
+                if obj.is_deleted and not obj.deleted_at:
+                    obj.deleted_at = now
+                    obj.deleted_by = action_by
+            stamped += ['deleted_at', 'deleted_by']
+
+        fields += [field for field in stamped if field not in fields]
+        return super().bulk_update(objs, fields, *args, **kwargs)
+
+    def update(self, **kwargs):
+        action_by = get_current_username()
+        now = timezone.now()
+        kwargs.setdefault('modified_at', now)
+        kwargs.setdefault('modified_by', action_by)
+        if kwargs.get('is_deleted') is True:
+            # Like the save path: rows that are already deleted keep their stamp
+            not_stamped = Q(deleted_at__isnull=True)
+            kwargs.setdefault('deleted_at', Case(When(not_stamped, then=Value(now)), default=F('deleted_at')))
+            kwargs.setdefault('deleted_by', Case(When(not_stamped, then=Value(action_by)), default=F('deleted_by')))
+        return super().update(**kwargs)
+
+    update.alters_data = True
+
+
+class BaseModelManager(models.Manager.from_queryset(BaseModelQuerySet)):
+    """Manager over every row, deleted ones included (BaseModel.all_objects)"""
+
+
+class ActiveManager(BaseModelManager):
+    """
+    Manager that hides soft-deleted rows (BaseModel.objects).
+    Its WHERE NOT is_deleted matches the partial indexes on the hot tables.
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().filter(is_deleted=False)
 
 
 class BaseModel(models.Model):
@@ -10,5 +85,10 @@ class BaseModel(models.Model):
     deleted_at = models.DateTimeField(null=True, blank=True)
     deleted_by = models.CharField(max_length=100, null=True, blank=True)
 
+    # all_objects is declared first so it stays Django's default manager:
+    # admin, unique validators and ModelBackend keep seeing deleted rows.
+    all_objects = BaseModelManager()
+    objects = ActiveManager()
+
     class Meta:
-        abstract = True
\ No newline at end of file
+        abstract = True
@@ -0,0 +1,99 @@
+import json
+from http import HTTPStatus
+
+from django.conf import settings
+from rest_framework.utils.encoders import JSONEncoder
+
+from utils.base_result import BaseResultWithData
+
+BULK_MAX_ITEMS = getattr(settings, "BULK_MAX_ITEMS", 500)
+
+
+def item_error(index, field, message):
+    """One per-item error entry, index is the position in the request payload"""
+    return {'index': index, 'field': field, 'message': str(message)}
+
+
+def serializer_item_errors(errors):
+    """
+    Flatten many=True serializer errors into per-item error entries.
+
+    Args:
+        errors (list|dict): ListSerializer.errors
+
+    Returns:
+        list: [{'index', 'field', 'message'}, ...]
+    """
+    if not isinstance(errors, list):
+        # The payload itself was rejected (not a list, empty, too long)
+        return [
+            item_error(None, field, message)
+            for field, messages in errors.items()
+            for message in messages
+        ]
+
+    return [
+        item_error(index, field, message)
+        for index, item_errors in enumerate(errors)
+        for field, messages in item_errors.items()
+        for message in (messages if isinstance(messages, list) else [messages])
+    ]
+
+
+def duplicate_item_errors(items, field, label):
+    """Errors for items repeating a unique value already used earlier in the payload"""
+    errors = []
+    seen = set()
+    for index, item in enumerate(items):
+        value = item.get(field)
+        if value is None:
+            continue
+        if value in seen:
+            errors.append(item_error(index, field, f"Duplicate {label} {value} in payload"))
+        seen.add(value)
+    return errors
+
+
+def bulk_update_unique(manager, objs, fields, unique_field, old_values, temporary_value):
+    """
+    bulk_update for payloads that may swap or rotate a unique field between
+    their own rows (floor 1 <-> 2, or 1 -> 2 -> 3). A single UPDATE would
+    hit the unique constraint on a row still holding a value another row
+    wants, so those rows are first parked on a temporary value. Call it
+    inside a transaction; an IntegrityError then means a real conflict with
+    rows outside the payload.
+
+    Args:
+        manager: Manager to update through (e.g. Floor.all_objects)
+        objs (list): Instances with their new values already set
+        fields (list): Fields to update
+        unique_field (str): Unique field the payload may swap
+        old_values (dict): pk -> value of unique_field before the changes
+        temporary_value (callable): Unused value to park an instance on
+    """
+    claimed = {getattr(obj, unique_field): obj.pk for obj in objs}
+    holders = [obj for obj in objs if claimed.get(old_values[obj.pk], obj.pk) != obj.pk]
+
+    if holders:
+        final_values = [getattr(obj, unique_field) for obj in holders]
+        for obj in holders:
+            setattr(obj, unique_field, temporary_value(obj))
+        manager.bulk_update(holders, [unique_field])
+        for obj, value in zip(holders, final_values):
+            setattr(obj, unique_field, value)
+
+    manager.bulk_update(objs, fields)
+
+
+def invalid_items_result(errors, message="Some items are invalid, nothing was saved"):
+    """400 result carrying per-item errors sorted by position"""
+    return BaseResultWithData(
+        message=message,
+        data={'errors': sorted(errors, key=lambda error: (error['index'] is not None, error['index'] or 0))},
+        status_code=HTTPStatus.BAD_REQUEST
+    )
+
+
+def jsonable(value):
+    """Normalize Decimals, dates and the like so audit metadata survives the Celery JSON serializer"""
+    return json.loads(json.dumps(value, cls=JSONEncoder))
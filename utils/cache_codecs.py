@@ -0,0 +1,67 @@
+"""
+Serializers and compressors for django_redis caches.
+
+Set them per cache alias in CACHES OPTIONS (SERIALIZER / COMPRESSOR) and
+route namespaces to an alias with CACHE_NAMESPACE_ALIASES.
+"""
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django_redis.compressors.zlib import ZlibCompressor
+from django_redis.serializers.json import JSONSerializer
+
+try:
+    import msgpack
+    HAS_MSGPACK = True
+except ImportError:
+    HAS_MSGPACK = False
+
+CACHE_COMPRESS_MIN_BYTES = getattr(settings, "CACHE_COMPRESS_MIN_BYTES", 1024)
+
+
+class ThresholdZlibCompressor(ZlibCompressor):
+    """
+    zlib, but only for values larger than COMPRESS_MIN_BYTES.
+
+    Small values cost more CPU to compress than they save in memory. Reading
+    needs no flag: django_redis already falls back to the raw bytes when
+    they are not zlib data.
+
+    OPTIONS:
+        COMPRESS_MIN_BYTES (int): Size threshold (default CACHE_COMPRESS_MIN_BYTES)
+        COMPRESS_LEVEL (int): zlib level (default 6)
+    """
+
+    def __init__(self, options):
+        super().__init__(options)
+        self.min_length = options.get("COMPRESS_MIN_BYTES", CACHE_COMPRESS_MIN_BYTES)
+        self.preset = options.get("COMPRESS_LEVEL", self.preset)
+
+
+def _msgpack_default(value):
+    """Types msgpack does not know are stored the way the JSON serializer stores them"""
+    return DjangoJSONEncoder().default(value)
+
+
+class MsgpackSerializer(JSONSerializer):
+    """
+    msgpack serializer, falling back to JSON when msgpack is not installed.
+
+    Values read back like the JSON serializer's (datetimes and decimals as
+    strings, tuples as lists), except that non-string dict keys keep their
+    type. Values written as JSON (before msgpack was installed) still load.
+    """
+
+    def dumps(self, value):
+        if not HAS_MSGPACK:
+            return super().dumps(value)
+        return msgpack.packb(value, default=_msgpack_default, use_bin_type=True)
+
+    def loads(self, value):
+        if not HAS_MSGPACK:
+            return super().loads(value)
+        try:
+            return msgpack.unpackb(value, raw=False, strict_map_key=False)
+        except (ValueError, msgpack.UnpackException):
+            return json.loads(value.decode())
@@ -1,51 +1,457 @@
-from django.core.cache import cache
+import math
+import random
+import threading
+import time
+import uuid
+from http import HTTPStatus
+
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
 from django.conf import settings
+from django.db import transaction
+
+from utils.base_result import BaseResultWithData
+from utils.local_cache import CACHE_L1_ENABLED, CACHE_L1_TTL, invalidator, local_cache
 
 CACHE_TTL = getattr(settings, "CACHE_TTL", 60 * 60 * 24)  # 1 day fallback
+CACHE_COMPUTE_LOCK_TIMEOUT = getattr(settings, "CACHE_COMPUTE_LOCK_TIMEOUT", 30)
+CACHE_COMPUTE_WAIT_TIMEOUT = getattr(settings, "CACHE_COMPUTE_WAIT_TIMEOUT", 2.0)
+CACHE_COMPUTE_STALE_TTL = getattr(settings, "CACHE_COMPUTE_STALE_TTL", 300)
+
+# Key prefix -> cache alias, so a namespace can use its own codec (see utils.cache_codecs).
+# Longest prefix first; everything else goes to the default cache.
+_NAMESPACE_ALIASES = sorted(
+    getattr(settings, "CACHE_NAMESPACE_ALIASES", {}).items(),
+    key=lambda item: len(item[0]),
+    reverse=True,
+)
+
+_WAIT_POLL_INTERVAL = 0.05
+
+
+class _Counters:
+    """Thread-safe named counters for this process"""
+
+    def __init__(self, *names):
+        self._lock = threading.Lock()
+        self._counts = dict.fromkeys(names, 0)
+
+    def incr(self, name):
+        with self._lock:
+            self._counts[name] += 1
+
+    def as_dict(self):
+        with self._lock:
+            return dict(self._counts)
+
+
+def _cache_for(key):
+    """Cache backend that stores a key, picked by its namespace prefix"""
+    for prefix, alias in _NAMESPACE_ALIASES:
+        if key.startswith(prefix):
+            return caches[alias]
+    # The backend itself, not the django.core.cache.cache proxy, so it can key a dict
+    return caches[DEFAULT_CACHE_ALIAS]
+
+
+def _group_by_cache(keys):
+    """Split stored keys by the backend that holds them"""
+    groups = {}
+    for key in keys:
+        groups.setdefault(_cache_for(key), []).append(key)
+    return groups.items()
+
+
+_l2_stats = _Counters('hits', 'misses')
+_compute_stats = _Counters(
+    'hits', 'misses', 'early_refreshes', 'lock_acquired', 'lock_contended',
+    'wait_satisfied', 'stale_served', 'wait_timeouts',
+)
 
 
 class GlobalCache:
+    """
+    Two-tier cache: an optional per-process LRU (L1) in front of Redis (L2).
+
+    L1 is opt-in per key with local=True and meant for tiny, hot, read-only
+    values. Entries live at most CACHE_L1_TTL seconds; writes and deletes
+    through GlobalCache drop the key from every process's L1 via Redis
+    pub/sub, so the TTL only bounds staleness when a message is lost.
+    """
+
+    @staticmethod
+    def _use_local(local):
+        if not (local and CACHE_L1_ENABLED):
+            return False
+        invalidator.ensure_listening()
+        return True
+
+    @staticmethod
+    def _resolve_key(key, namespace):
+        return GlobalCache.versioned_key(namespace, key) if namespace else key
+
+    @staticmethod
+    def get(key, local=False, namespace=None):
+        """
+        Fetch cached data by key
+
+        Args:
+            key (str): Cache key
+            local (bool): Check / fill the in-process L1 first
+            namespace (str): Read the key under the namespace's current version
+        """
+        key = GlobalCache._resolve_key(key, namespace)
+        use_local = GlobalCache._use_local(local)
+        if use_local:
+            value = local_cache.get(key)
+            if value is not None:
+                return value
+            generation = local_cache.generation
+
+        value = _cache_for(key).get(key)
+        _l2_stats.incr('hits' if value is not None else 'misses')
+        if use_local and value is not None:
+            local_cache.set(key, value, CACHE_L1_TTL, generation=generation)
+        return value
+
+    @staticmethod
+    def set(key, value, timeout=CACHE_TTL, local=False, namespace=None):
+        """
+        Store data globally
+
+        For read-through caching build the key once with versioned_key()
+        before computing the value (as cached_result does): passing namespace
+        here reads the version again, and a bump in between would file a
+        stale value under the new version.
+
+        Args:
+            key (str): Cache key
+            value: JSON-serializable value
+            timeout (int): Redis TTL in seconds
+            local (bool): Also keep it in this process's L1
+            namespace (str): Write the key under the namespace's current version
+        """
+        if namespace:
+            key = GlobalCache.versioned_key(namespace, key)
+            # Keys of old versions are never deleted, they have to expire
+            timeout = timeout or CACHE_TTL
+        _cache_for(key).set(key, value, timeout)
+        # Only L1 keys can be held by other processes, so only they are published
+        if GlobalCache._use_local(local):
+            GlobalCache._invalidate_local(key)
+            local_cache.set(key, value, min(CACHE_L1_TTL, timeout) if timeout else CACHE_L1_TTL)
+
+    @staticmethod
+    def delete(key, namespace=None):
+        """Delete a single cache key (under the namespace's current version if given)"""
+        key = GlobalCache._resolve_key(key, namespace)
+        _cache_for(key).delete(key)
+        GlobalCache._invalidate_local(key)
+
+    @staticmethod
+    def _resolve_keys(keys, namespace):
+        """Map caller keys to stored keys, reading the namespace version once"""
+        if not namespace:
+            return {key: key for key in keys}
+        version = GlobalCache.get_version(namespace)
+        return {key: f"{namespace}:v{version}:{key}" for key in keys}
+
+    @staticmethod
+    def get_many(keys, local=False, namespace=None):
+        """
+        Fetch several keys in one round trip (MGET)
+
+        Values are decoded exactly like get(); missing keys are left out.
+
+        Args:
+            keys (list): Cache keys
+            local (bool): Check / fill the in-process L1 first
+            namespace (str): Read the keys under the namespace's current version
+
+        Returns:
+            dict: {key: value} for the keys found, keyed by the caller's keys
+        """
+        stored = GlobalCache._resolve_keys(keys, namespace)
+        found = {}
+        use_local = GlobalCache._use_local(local)
+        if use_local:
+            generation = local_cache.generation
+            for key, stored_key in stored.items():
+                value = local_cache.get(stored_key)
+                if value is not None:
+                    found[key] = value
+
+        remaining = {stored_key: key for key, stored_key in stored.items() if key not in found}
+        if remaining:
+            values = {}
+            for backend, backend_keys in _group_by_cache(remaining):
+                values.update(backend.get_many(backend_keys))
+            for stored_key, key in remaining.items():
+                value = values.get(stored_key)
+                _l2_stats.incr('hits' if value is not None else 'misses')
+                if value is None:
+                    continue
+                found[key] = value
+                if use_local:
+                    local_cache.set(stored_key, value, CACHE_L1_TTL, generation=generation)
+        return found
+
+    @staticmethod
+    def set_many(mapping, timeout=CACHE_TTL, local=False, namespace=None):
+        """
+        Store several keys in one pipelined round trip
+
+        Args:
+            mapping (dict): {key: value}
+            timeout (int): Redis TTL in seconds, shared by all keys
+            local (bool): Also keep them in this process's L1
+            namespace (str): Write the keys under the namespace's current version
+        """
+        if not mapping:
+            return
+        stored = GlobalCache._resolve_keys(mapping, namespace)
+        if namespace:
+            timeout = timeout or CACHE_TTL
+        values = {stored[key]: value for key, value in mapping.items()}
+        for backend, backend_keys in _group_by_cache(values):
+            backend.set_many({key: values[key] for key in backend_keys}, timeout)
+        if GlobalCache._use_local(local):
+            GlobalCache._invalidate_local(*stored.values())
+            l1_timeout = min(CACHE_L1_TTL, timeout) if timeout else CACHE_L1_TTL
+            for key, value in mapping.items():
+                local_cache.set(stored[key], value, l1_timeout)
+
+    @staticmethod
+    def delete_many(keys, namespace=None):
+        """Delete several keys with a single DEL (under the namespace's current version if given)"""
+        if not keys:
+            return
+        stored = list(GlobalCache._resolve_keys(keys, namespace).values())
+        for backend, backend_keys in _group_by_cache(stored):
+            backend.delete_many(backend_keys)
+        GlobalCache._invalidate_local(*stored)
+
     @staticmethod
-    def get(key):
-        """Fetch cached data by key"""
-        return cache.get(key)
+    def _invalidate_local(*keys):
+        """Drop keys from this process's L1 and tell the other processes to do the same"""
+        if not CACHE_L1_ENABLED:
+            return
+        local_cache.delete(*keys)
+        invalidator.publish(keys=keys)
 
     @staticmethod
-    def set(key, value, timeout=CACHE_TTL):
-        """Store data globally"""
-        cache.set(key, value, timeout)
+    def stats():
+        """Hit / miss counters of both tiers and get_or_compute for this process"""
+        return {'l1': local_cache.stats(), 'l2': _l2_stats.as_dict(), 'compute': _compute_stats.as_dict()}
+
+    @staticmethod
+    def _should_refresh(envelope, beta):
+        """
+        XFetch: refresh early with a probability that grows as expiry nears
+        and with how long the value took to compute.
+        """
+        jitter = envelope['delta'] * beta * -math.log(1.0 - random.random())
+        return time.time() + jitter >= envelope['expires_at']
+
+    @staticmethod
+    def _compute_and_store(key, fn, ttl, stale_ttl):
+        start = time.monotonic()
+        value = fn()
+        envelope = {
+            'value': value,
+            'delta': time.monotonic() - start,
+            'expires_at': time.time() + ttl,
+        }
+        # Kept past its logical expiry so waiters have something stale to fall back on
+        _cache_for(key).set(key, envelope, ttl + stale_ttl)
+        return value
+
+    @staticmethod
+    def _wait_for_refresh(key, expires_at, wait_timeout):
+        """Poll until another worker stores a newer envelope, or give up"""
+        deadline = time.monotonic() + wait_timeout
+        while time.monotonic() < deadline:
+            time.sleep(_WAIT_POLL_INTERVAL)
+            envelope = _cache_for(key).get(key)
+            if envelope is not None and envelope['expires_at'] != expires_at:
+                return envelope
+        return None
+
+    @staticmethod
+    def get_or_compute(key, fn, ttl=CACHE_TTL, namespace=None, beta=1.0,
+                       lock_timeout=CACHE_COMPUTE_LOCK_TIMEOUT,
+                       wait_timeout=CACHE_COMPUTE_WAIT_TIMEOUT,
+                       stale_ttl=CACHE_COMPUTE_STALE_TTL):
+        """
+        Read-through cache that recomputes a value in one worker at a time.
+
+        - Values are refreshed a little before they expire (XFetch), so a
+          popular key is usually recomputed before anyone sees a miss
+        - Only the worker holding the lock (cache.add) recomputes; others
+          keep serving the current value during an early refresh
+        - Once the value has expired, non-holders wait up to wait_timeout
+          for the fresh one and then fall back to the stale value, which is
+          kept stale_ttl seconds past expiry. With nothing cached at all they
+          compute it themselves rather than fail
+        - Lock contention is counted in GlobalCache.stats()['compute']
+
+        fn must return a value the cache serializer can store and read back
+        unchanged (plain JSON types).
+
+        Args:
+            key (str): Cache key
+            fn (callable): Computes the value, called without arguments
+            ttl (int): Seconds the value is considered fresh
+            namespace (str): File the key under the namespace's current version
+            beta (float): XFetch eagerness, > 1 refreshes earlier
+            lock_timeout (int): Seconds before an abandoned lock frees itself
+            wait_timeout (float): Seconds a non-holder waits for a fresh value
+            stale_ttl (int): Seconds an expired value stays available as fallback
+
+        Returns:
+            The cached or freshly computed value
+        """
+        key = GlobalCache._resolve_key(key, namespace)
+        backend = _cache_for(key)
+        envelope = backend.get(key)
+
+        if envelope is not None:
+            if not GlobalCache._should_refresh(envelope, beta):
+                _compute_stats.incr('hits')
+                return envelope['value']
+            expired = time.time() >= envelope['expires_at']
+            if not expired:
+                _compute_stats.incr('early_refreshes')
+        else:
+            expired = True
+            _compute_stats.incr('misses')
+
+        lock_key = f"{key}:lock"
+        token = uuid.uuid4().hex
+        if backend.add(lock_key, token, lock_timeout):
+            _compute_stats.incr('lock_acquired')
+            try:
+                return GlobalCache._compute_and_store(key, fn, ttl, stale_ttl)
+            finally:
+                # Not atomic, but the lock only guards against duplicate work
+                if backend.get(lock_key) == token:
+                    backend.delete(lock_key)
+
+        _compute_stats.incr('lock_contended')
+        if not expired:
+            # Early refresh already running elsewhere, the current value is still fresh
+            return envelope['value']
+
+        refreshed = GlobalCache._wait_for_refresh(
+            key, envelope['expires_at'] if envelope else None, wait_timeout
+        )
+        if refreshed is not None:
+            _compute_stats.incr('wait_satisfied')
+            return refreshed['value']
+
+        _compute_stats.incr('wait_timeouts')
+        if envelope is not None:
+            _compute_stats.incr('stale_served')
+            return envelope['value']
+        return GlobalCache._compute_and_store(key, fn, ttl, stale_ttl)
 
     @staticmethod
-    def delete(key):
-        """Delete a single cache key"""
-        cache.delete(key)
+    def _version_key(namespace):
+        return f"{namespace}:version"
+
+    @staticmethod
+    def get_version(namespace):
+        """
+        Current version of a cache namespace.
+        A missing version is seeded from the clock, so losing the version key
+        can never bring back entries written under an older version.
+        """
+        key = GlobalCache._version_key(namespace)
+        version = GlobalCache.get(key, local=True)
+        if version is None:
+            _cache_for(key).add(key, int(time.time() * 1000), None)
+            version = GlobalCache.get(key, local=True)
+        return version
+
+    @staticmethod
+    def bump_version(namespace):
+        """Invalidate every key in a namespace in O(1) by moving to a new version"""
+        key = GlobalCache._version_key(namespace)
+        try:
+            version = _cache_for(key).incr(key)
+        except ValueError:
+            # Version key missing: seeding from the clock is already a new version
+            version = None
+        GlobalCache._invalidate_local(key)
+        return version if version is not None else GlobalCache.get_version(namespace)
+
+    @staticmethod
+    def bump_versions_on_commit(*namespaces):
+        """Bump namespace versions once the current transaction commits"""
+        def bump():
+            for namespace in namespaces:
+                GlobalCache.bump_version(namespace)
+        transaction.on_commit(bump)
+
+    @staticmethod
+    def versioned_key(namespace, *parts):
+        """Build a key that embeds the namespace's current version"""
+        suffix = ":".join(str(part) for part in parts)
+        return f"{namespace}:v{GlobalCache.get_version(namespace)}:{suffix}"
 
     @staticmethod
     def clear():
         """Clear all cache data (GLOBAL CLEAR)"""
-        cache.clear()
+        for alias in {DEFAULT_CACHE_ALIAS, *(alias for _, alias in _NAMESPACE_ALIASES)}:
+            caches[alias].clear()
+        if CACHE_L1_ENABLED:
+            local_cache.clear()
+            invalidator.publish(clear=True)
+        return True
+
+    @staticmethod
+    def invalidate_namespace(namespace):
+        """
+        Invalidate every key written under a namespace in O(1).
+
+        Only the version counter changes; keys of the old version are no
+        longer reachable and expire with their TTL.
+        """
+        GlobalCache.bump_version(namespace)
         return True
 
     @staticmethod
     def delete_prefix(prefix: str):
         """
-        Delete all cache keys starting with a given prefix.
-        Works with Redis and LocMemCache (if keys() supported).
+        Invalidate a namespace given as a key prefix, e.g. "hostel:rooms:".
+
+        Kept for older callers: it no longer scans the keyspace (SCAN with
+        delete_pattern) nor clears the whole cache on backends without
+        pattern support. Only keys written through the namespace API
+        (namespace=..., versioned_key, cached_result) are affected.
         """
-        pattern = f"{prefix}*"
-        try:
-            # For RedisCache (supports delete_pattern)
-            if hasattr(cache, "delete_pattern"):
-                cache.delete_pattern(pattern)
-            # For caches that expose .keys() (like LocMemCache)
-            elif hasattr(cache, "keys"):
-                for key in cache.keys(pattern):
-                    cache.delete(key)
-            else:
-                # fallback: do a full clear if prefix filtering isn't supported
-                cache.clear()
-                print(f"⚠️ Cache backend doesn't support prefix delete — cleared all cache.")
-            return True
-        except Exception as e:
-            print(f"⚠️ Failed to delete prefix '{prefix}' from cache: {e}")
-            return False
\ No newline at end of file
+        return GlobalCache.invalidate_namespace(prefix.rstrip(":*"))
+
+
+def cached_result(namespace, key_parts, fetch, message, timeout=CACHE_TTL, local=False, cacheable=True):
+    """
+    Read-through cache for BBL query results.
+
+    Returns the cached data for the namespace's current version when present,
+    otherwise calls fetch() and caches the data of a successful result.
+    Writers invalidate with GlobalCache.bump_versions_on_commit(namespace).
+    Pass local=True for small reference data worth keeping in the L1 tier.
+    Pass cacheable=False to skip the cache for requests whose key parts a
+    client could vary freely (e.g. pagination cursors).
+    """
+    if not cacheable:
+        return fetch()
+
+    key = GlobalCache.versioned_key(namespace, *key_parts)
+    data = GlobalCache.get(key, local=local)
+    if data is not None:
+        return BaseResultWithData(message=message, data=data, status_code=HTTPStatus.OK)
+
+    result = fetch()
+    if result.is_success:
+        GlobalCache.set(key, result.data, timeout, local=local)
+    return result
@@ -0,0 +1,313 @@
+"""
+Per-namespace cache metrics: calls, hits, misses, errors, latency and bytes.
+
+InstrumentedRedisClient records every Redis cache operation into a
+per-process CacheMetrics. Each process adds its counters to one Redis hash
+every CACHE_METRICS_FLUSH_INTERVAL seconds, so collect() sees all workers.
+"""
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+from django.conf import settings
+from django_redis.client import DefaultClient
+
+from utils.tracing import span
+
+CACHE_METRICS_ENABLED = getattr(settings, "CACHE_METRICS_ENABLED", True)
+CACHE_METRICS_FLUSH_INTERVAL = getattr(settings, "CACHE_METRICS_FLUSH_INTERVAL", 10)
+CACHE_METRICS_KEY = getattr(settings, "CACHE_METRICS_KEY", "cache:metrics")
+
+# Upper bounds (ms) of the latency histogram buckets; slower calls go to "inf"
+LATENCY_BUCKETS_MS = (0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 1000)
+
+
+def namespace_of(key):
+    """
+    Namespace of a cache key: its first two segments ("hostel:rooms" for
+    "hostel:rooms:v12:..." and "hostel:rooms:version").
+    """
+    return ":".join(str(key).split(":", 2)[:2])
+
+
+def _bucket(elapsed_ms):
+    for bound in LATENCY_BUCKETS_MS:
+        if elapsed_ms <= bound:
+            return f"le_{bound}"
+    return "le_inf"
+
+
+class _Operation:
+    """What one cache call did, filled in while it runs"""
+
+    __slots__ = ('hits', 'misses', 'bytes_read', 'bytes_written')
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+
+
+class CacheMetrics:
+    """Counters of this process that have not been flushed to Redis yet"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._last_flush = time.monotonic()
+        self._local = threading.local()
+
+    def current(self):
+        """The operation being tracked on this thread, if any"""
+        return getattr(self._local, 'operation', None)
+
+    @contextmanager
+    def track(self, key, op):
+        """
+        Time a cache call and record it under the key's namespace.
+
+        Nested calls (add -> set, set_many -> set) are part of the outer call
+        and not recorded separately.
+        """
+        if not CACHE_METRICS_ENABLED or self.current() is not None:
+            yield _Operation()
+            return
+
+        operation = _Operation()
+        self._local.operation = operation
+        start = time.perf_counter()
+        error = False
+        try:
+            yield operation
+        except Exception:
+            error = True
+            raise
+        finally:
+            self._local.operation = None
+            self._record(namespace_of(key), op, (time.perf_counter() - start) * 1000, operation, error)
+
+    def _record(self, namespace, op, elapsed_ms, operation, error):
+        updates = {
+            f"{op}_calls": 1,
+            "hits": operation.hits,
+            "misses": operation.misses,
+            "errors": int(error),
+            "bytes_read": operation.bytes_read,
+            "bytes_written": operation.bytes_written,
+            "latency_ms_sum": elapsed_ms,
+            f"latency_{_bucket(elapsed_ms)}": 1,
+        }
+        with self._lock:
+            counters = self._counters.setdefault(namespace, {})
+            for name, value in updates.items():
+                if value:
+                    counters[name] = counters.get(name, 0) + value
+
+    def _take(self):
+        with self._lock:
+            counters, self._counters = self._counters, {}
+            self._last_flush = time.monotonic()
+        return counters
+
+    def flush(self, redis_client):
+        """Add this process's counters to the shared hash (one pipelined round trip)"""
+        counters = self._take()
+        if not counters:
+            return
+        pipeline = redis_client.pipeline(transaction=False)
+        for namespace, values in counters.items():
+            for name, value in values.items():
+                pipeline.hincrbyfloat(CACHE_METRICS_KEY, f"{namespace}|{name}", value)
+        try:
+            pipeline.execute()
+        except Exception:
+            # Keep the numbers for the next flush
+            with self._lock:
+                for namespace, values in counters.items():
+                    merged = self._counters.setdefault(namespace, {})
+                    for name, value in values.items():
+                        merged[name] = merged.get(name, 0) + value
+
+    def maybe_flush(self, redis_client):
+        if time.monotonic() - self._last_flush >= CACHE_METRICS_FLUSH_INTERVAL:
+            self.flush(redis_client)
+
+    def local_snapshot(self):
+        with self._lock:
+            return {namespace: dict(values) for namespace, values in self._counters.items()}
+
+
+cache_metrics = CacheMetrics()
+
+
+class InstrumentedRedisClient(DefaultClient):
+    """
+    django_redis client that records every call in cache_metrics.
+
+    Use it as OPTIONS["CLIENT_CLASS"]. Byte sizes are of the encoded
+    (serialized and compressed) values; integers such as namespace versions
+    are stored raw and count as zero bytes.
+    """
+
+    def encode(self, value):
+        encoded = super().encode(value)
+        operation = cache_metrics.current()
+        if operation is not None and isinstance(encoded, bytes):
+            operation.bytes_written += len(encoded)
+        return encoded
+
+    def decode(self, value):
+        operation = cache_metrics.current()
+        if operation is not None and isinstance(value, bytes):
+            operation.bytes_read += len(value)
+        return super().decode(value)
+
+    @contextmanager
+    def _track(self, key, op):
+        # Nested calls (add -> set) belong to the outer call's span
+        call_span = span(f"cache.{op}", namespace=namespace_of(key)) if cache_metrics.current() is None else nullcontext()
+        with call_span, cache_metrics.track(key, op) as operation:
+            yield operation
+        try:
+            cache_metrics.maybe_flush(self.get_client(write=True))
+        except Exception:
+            pass
+
+    def get(self, key, default=None, version=None, client=None):
+        with self._track(key, 'get') as operation:
+            value = super().get(key, default=default, version=version, client=client)
+            if value is default:
+                operation.misses += 1
+            else:
+                operation.hits += 1
+        return value
+
+    def get_many(self, keys, version=None, client=None):
+        keys = list(keys)
+        if not keys:
+            return super().get_many(keys, version=version, client=client)
+        # A batch is recorded under the namespace of its first key
+        with self._track(keys[0], 'get_many') as operation:
+            values = super().get_many(keys, version=version, client=client)
+            operation.hits += len(values)
+            operation.misses += len(keys) - len(values)
+        return values
+
+    def set(self, key, value, *args, **kwargs):
+        with self._track(key, 'set'):
+            return super().set(key, value, *args, **kwargs)
+
+    def add(self, key, value, *args, **kwargs):
+        with self._track(key, 'add'):
+            return super().add(key, value, *args, **kwargs)
+
+    def set_many(self, data, *args, **kwargs):
+        if not data:
+            return super().set_many(data, *args, **kwargs)
+        with self._track(next(iter(data)), 'set_many'):
+            return super().set_many(data, *args, **kwargs)
+
+    def incr(self, key, *args, **kwargs):
+        with self._track(key, 'incr'):
+            return super().incr(key, *args, **kwargs)
+
+    def delete(self, key, *args, **kwargs):
+        with self._track(key, 'delete'):
+            return super().delete(key, *args, **kwargs)
+
+    def delete_many(self, keys, *args, **kwargs):
+        keys = list(keys)
+        if not keys:
+            return super().delete_many(keys, *args, **kwargs)
+        with self._track(keys[0], 'delete_many'):
+            return super().delete_many(keys, *args, **kwargs)
+
+
+def _percentile(counters, calls, fraction):
+    """Upper bound (ms) of the histogram bucket holding the given fraction of calls"""
+    if not calls:
+        return None
+    seen = 0
+    for bound in (*LATENCY_BUCKETS_MS, "inf"):
+        seen += counters.get(f"latency_le_{bound}", 0)
+        if seen >= calls * fraction:
+            return bound
+    return "inf"
+
+
+def summarize(raw):
+    """
+    Turn raw counters into a readable summary per namespace.
+
+    Args:
+        raw (dict): {namespace: {counter: value}}
+
+    Returns:
+        dict: {namespace: summary}, busiest namespace first
+    """
+    summary = {}
+    for namespace, counters in raw.items():
+        calls = {
+            name[:-len("_calls")]: int(value)
+            for name, value in counters.items() if name.endswith("_calls")
+        }
+        total_calls = sum(calls.values())
+        hits, misses = int(counters.get("hits", 0)), int(counters.get("misses", 0))
+        bytes_read = int(counters.get("bytes_read", 0))
+        summary[namespace] = {
+            'calls': calls,
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': round(hits / (hits + misses), 4) if hits + misses else None,
+            'errors': int(counters.get("errors", 0)),
+            'avg_latency_ms': round(counters.get("latency_ms_sum", 0) / total_calls, 3) if total_calls else None,
+            'p50_latency_ms': _percentile(counters, total_calls, 0.5),
+            'p95_latency_ms': _percentile(counters, total_calls, 0.95),
+            'p99_latency_ms': _percentile(counters, total_calls, 0.99),
+            'latency_histogram_ms': {
+                str(bound): int(counters.get(f"latency_le_{bound}", 0))
+                for bound in (*LATENCY_BUCKETS_MS, "inf")
+            },
+            'bytes_read': bytes_read,
+            'bytes_written': int(counters.get("bytes_written", 0)),
+            'avg_hit_bytes': round(bytes_read / hits) if hits else None,
+        }
+    return dict(sorted(summary.items(), key=lambda item: -sum(item[1]['calls'].values())))
+
+
+def _redis_connection():
+    try:
+        from django_redis import get_redis_connection
+        return get_redis_connection("default")
+    except NotImplementedError:
+        # Not a django_redis backend: only this process's numbers exist
+        return None
+
+
+def collect():
+    """
+    Metrics of every process, read from the shared hash.
+
+    Returns:
+        dict: {namespace: summary}, see summarize()
+    """
+    connection = _redis_connection()
+    if connection is None:
+        return summarize(cache_metrics.local_snapshot())
+
+    cache_metrics.flush(connection)
+    raw = {}
+    for field, value in connection.hgetall(CACHE_METRICS_KEY).items():
+        field = field.decode() if isinstance(field, bytes) else field
+        namespace, _, name = field.rpartition("|")
+        raw.setdefault(namespace, {})[name] = float(value)
+    return summarize(raw)
+
+
+def reset():
+    """Forget all recorded metrics (shared hash and this process)"""
+    cache_metrics._take()
+    connection = _redis_connection()
+    if connection is not None:
+        connection.delete(CACHE_METRICS_KEY)
@@ -0,0 +1,55 @@
+import hashlib
+from functools import wraps
+
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+
+from utils.cache_helper import GlobalCache
+
+
+def _path_digest(request):
+    """Short digest of path + query string, so filters and cursors get their own ETag"""
+    return hashlib.md5(request.get_full_path().encode(), usedforsecurity=False).hexdigest()[:16]
+
+
+def namespace_etag(*namespaces):
+    """
+    ETag built from cache namespace versions.
+    Costs one cache read per namespace and no DB query or serialization.
+    """
+    def etag_func(request, *args, **kwargs):
+        versions = "-".join(str(GlobalCache.get_version(namespace)) for namespace in namespaces)
+        return f"{versions}-{_path_digest(request)}"
+    return etag_func
+
+
+def _validators_on_success_only(view_func):
+    """
+    Drop the ETag / Last-Modified that condition() adds to error responses,
+    so a client never revalidates a 400 against the ETag of the data.
+    """
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        response = view_func(request, *args, **kwargs)
+        if response.status_code != 304 and not 200 <= response.status_code < 300:
+            response.headers.pop('ETag', None)
+            response.headers.pop('Last-Modified', None)
+        return response
+    return wrapper
+
+
+def conditional_get(etag_func=None, last_modified_func=None):
+    """
+    Class decorator adding ETag / Last-Modified support to a view's get().
+    Runs after DRF authentication and permission checks. A matching
+    If-None-Match / If-Modified-Since returns 304 before the view queries
+    or serializes anything. Only 2xx responses carry the validators.
+
+    Example:
+        @conditional_get(etag_func=namespace_etag(CacheKeys.FLOORS.value))
+        class FloorListAPIView(generics.GenericAPIView): ...
+    """
+    def decorator(view_func):
+        conditional_view = condition(etag_func=etag_func, last_modified_func=last_modified_func)(view_func)
+        return _validators_on_success_only(conditional_view)
+    return method_decorator(decorator, name='get')
@@ -0,0 +1,35 @@
+"""
+Helpers for code that watches ORM queries (tracing, query budgets).
+"""
+import re
+from contextlib import ExitStack, contextmanager
+
+from django.db import connections
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\((?:\s*(?:%s|\?|\$\d+)\s*,?)+\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint(sql):
+    """
+    Shape of a query with literal values and IN lists collapsed, so the same
+    query issued for different rows gets the same fingerprint.
+
+    Example:
+        'SELECT ... WHERE "room"."floor_id" = %s'  (for floor 1, 2, 3 ...)
+    """
+    shape = _STRING_LITERAL.sub("?", sql)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    shape = _IN_LIST.sub("IN (...)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+@contextmanager
+def execute_wrapper(wrapper):
+    """Install an execute wrapper on every database connection of this thread for the block"""
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(wrapper))
+        yield
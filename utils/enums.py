@@ -99,6 +99,16 @@ class CacheKeys(Enum):
     Centralized cache key names for consistency across the project.
     Always use CacheKeys.KEY_NAME.value when accessing cache.
     """
+    
+    # Versioned namespaces for reference data lists
+    FLOORS = "hostel:floors"
+    ROOM_TYPES = "hostel:room_types"
+    ROOMS = "hostel:rooms"
+    USERS = "users:users"
+
+    # Plain keys (TTL-based)
+    DASHBOARD = "administrator:dashboard"
+    PROFILING = "administrator:profiling"
 
     @classmethod
     def format(cls, key, **kwargs):
@@ -0,0 +1,207 @@
+from types import SimpleNamespace
+
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework import serializers
+from rest_framework.relations import ManyRelatedField, PKOnlyObject, RelatedField
+
+
+# Field kinds in a compiled field map
+PLAIN = 'plain'
+RELATED_PK = 'related_pk'
+METHOD = 'method'
+MANY = 'many'
+
+
+class ValuesSerializer:
+    """
+    Fast read path for a DRF ModelSerializer.
+
+    Builds the same output as ``serializer_class(rows, many=True).data`` from
+    ``.values()`` dicts, without creating model instances or a serializer per
+    row. The field map is compiled once per (serializer, fields) pair. Each
+    value then goes through the bound DRF field's own to_representation, so
+    dates, decimals and choices come out exactly as DRF formats them.
+
+    Supported fields: model fields, dotted sources across foreign keys
+    (``floor.number``), primary key related fields, SerializerMethodFields
+    (called with a row object that exposes the fetched values) and many=True
+    related fields. A serializer can list the columns each method field reads
+    in ``Meta.method_field_sources``; otherwise every concrete column is
+    fetched for method fields. Many related fields are loaded with one batched query
+    over the through table.
+
+    Example:
+        fast = ValuesSerializer.for_serializer(RoomSerializer)
+        data = fast.serialize(Room.objects.all())
+    """
+
+    _compiled = {}
+
+    def __init__(self, serializer_class, fields=None):
+        self.serializer_class = serializer_class
+        self.model = serializer_class.Meta.model
+        self._serializer = serializer_class()
+        self.field_map = []
+        self.paths = []
+        self._compile(fields)
+
+    @classmethod
+    def for_serializer(cls, serializer_class, fields=None):
+        """Return the cached compiled serializer for a serializer class and field subset"""
+        key = (serializer_class, tuple(sorted(fields)) if fields else None)
+        if key not in cls._compiled:
+            cls._compiled[key] = cls(serializer_class, fields)
+        return cls._compiled[key]
+
+    def _add_path(self, path):
+        if path not in self.paths:
+            self.paths.append(path)
+
+    def _compile(self, fields):
+        readable = [field for field in self._serializer._readable_fields]
+        if fields is not None:
+            readable = [field for field in readable if field.field_name in fields]
+
+        for field in readable:
+            if isinstance(field, serializers.SerializerMethodField):
+                self.field_map.append((field.field_name, METHOD, field, None, ()))
+                continue
+
+            if isinstance(field, ManyRelatedField):
+                self.field_map.append((field.field_name, MANY, field, self._through_lookup(field), ()))
+                continue
+
+            if field.source == '*' or isinstance(field, serializers.BaseSerializer):
+                raise ImproperlyConfigured(
+                    f"{self.serializer_class.__name__}.{field.field_name} is not supported by ValuesSerializer"
+                )
+
+            attrs = field.source_attrs
+            path = '__'.join(attrs)
+            # A null foreign key on the way makes DRF skip the field entirely
+            null_checks = tuple('__'.join(attrs[:i + 1]) for i in range(len(attrs) - 1))
+            for check in null_checks:
+                self._add_path(check)
+            self._add_path(path)
+
+            kind = RELATED_PK if isinstance(field, RelatedField) else PLAIN
+            self.field_map.append((field.field_name, kind, field, path, null_checks))
+
+        method_sources = getattr(self.serializer_class.Meta, 'method_field_sources', {})
+        for field_name, kind, _, _, _ in self.field_map:
+            if kind != METHOD:
+                continue
+            if field_name in method_sources:
+                for path in method_sources[field_name]:
+                    self._add_path(path)
+            else:
+                # Unknown dependencies, so fetch every concrete column
+                for model_field in self.model._meta.concrete_fields:
+                    self._add_path(model_field.attname)
+
+        if any(kind == MANY for _, kind, _, _, _ in self.field_map):
+            self._add_path(self.model._meta.pk.name)
+
+    def _through_lookup(self, field):
+        """Resolve (through model, owner fk attname, target fk name) for a many related field"""
+        if len(field.source_attrs) != 1:
+            raise ImproperlyConfigured(
+                f"{self.serializer_class.__name__}.{field.field_name}: nested many related sources are not supported"
+            )
+
+        model_field = self.model._meta.get_field(field.source_attrs[0])
+        if not model_field.many_to_many or model_field.auto_created:
+            raise ImproperlyConfigured(
+                f"{self.serializer_class.__name__}.{field.field_name} must be a forward many-to-many field"
+            )
+
+        through = model_field.remote_field.through
+        owner_field = model_field.m2m_field_name()
+        target_field = model_field.m2m_reverse_field_name()
+        return through, f"{owner_field}_id", target_field
+
+    def _load_many(self, rows):
+        """One query per many related field for the whole page"""
+        pk_name = self.model._meta.pk.name
+        pks = [row[pk_name] for row in rows]
+        related = {}
+
+        for field_name, kind, field, lookup, _ in self.field_map:
+            if kind != MANY:
+                continue
+
+            through, owner_attname, target_field = lookup
+            grouped = {pk: [] for pk in pks}
+            # Same order as a prefetch: the target's Meta.ordering, else its pk
+            target_model = through._meta.get_field(target_field).related_model
+            ordering = [
+                f"-{target_field}__{order.lstrip('-')}" if order.startswith('-') else f"{target_field}__{order}"
+                for order in (target_model._meta.ordering or ['pk'])
+            ]
+            links = (
+                through.objects.filter(**{f"{owner_attname}__in": pks})
+                .select_related(target_field)
+                .order_by(*ordering)
+            )
+            for link in links:
+                grouped[getattr(link, owner_attname)].append(
+                    field.child_relation.to_representation(getattr(link, target_field))
+                )
+            related[field_name] = grouped
+
+        return related
+
+    def serialize_rows(self, rows):
+        """Serialize a list of dicts fetched with .values(*self.paths)"""
+        rows = list(rows)
+        related = self._load_many(rows) if rows and any(kind == MANY for _, kind, _, _, _ in self.field_map) else {}
+        pk_name = self.model._meta.pk.name
+        field_map = self.field_map
+        results = []
+
+        for row in rows:
+            item = {}
+            row_object = None
+            for field_name, kind, field, path, null_checks in field_map:
+                if kind == METHOD:
+                    if row_object is None:
+                        row_object = SimpleNamespace(**row)
+                    item[field_name] = field.to_representation(row_object)
+                    continue
+
+                if kind == MANY:
+                    item[field_name] = related[field_name][row[pk_name]]
+                    continue
+
+                if null_checks and any(row[check] is None for check in null_checks):
+                    continue
+
+                value = row[path]
+                if value is None:
+                    item[field_name] = None
+                elif kind == RELATED_PK:
+                    item[field_name] = field.to_representation(PKOnlyObject(pk=value))
+                else:
+                    item[field_name] = field.to_representation(value)
+            results.append(item)
+
+        return results
+
+    def values(self, queryset, extra_paths=()):
+        """
+        Apply .values() with every path the field map needs.
+
+        Args:
+            queryset: Queryset of the serializer's model
+            extra_paths (iterable): Additional columns, e.g. keyset ordering fields
+
+        Returns:
+            QuerySet: Dict rows ready for serialize_rows
+        """
+        paths = list(self.paths)
+        paths.extend(path for path in extra_paths if path not in paths)
+        return queryset.values(*paths)
+
+    def serialize(self, queryset):
+        """Fetch and serialize a queryset in one go"""
+        return self.serialize_rows(self.values(queryset))
@@ -0,0 +1,203 @@
+import json
+import logging
+import os
+import pickle
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+CACHE_L1_ENABLED = getattr(settings, "CACHE_L1_ENABLED", True)
+CACHE_L1_MAX_ENTRIES = getattr(settings, "CACHE_L1_MAX_ENTRIES", 1024)
+CACHE_L1_TTL = getattr(settings, "CACHE_L1_TTL", 30)
+CACHE_L1_CHANNEL = getattr(settings, "CACHE_L1_CHANNEL", "cache:l1:invalidate")
+CACHE_L1_RECONNECT_MAX_DELAY = getattr(settings, "CACHE_L1_RECONNECT_MAX_DELAY", 30)
+
+
+class LocalCache:
+    """
+    Bounded per-process LRU with a TTL per entry.
+
+    Values are stored pickled, like Django's LocMemCache, so every get()
+    returns a fresh copy that the caller is free to change.
+    """
+
+    _MISSING = object()
+
+    def __init__(self, max_entries=CACHE_L1_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Bumped by every invalidation, see set(generation=...)
+        self.generation = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key, self._MISSING)
+            if entry is not self._MISSING:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return pickle.loads(value)
+                del self._entries[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value, timeout, generation=None):
+        """
+        Store a value for timeout seconds.
+
+        Pass the generation read before fetching the value from Redis: if an
+        invalidation arrived in between, the value may already be stale and
+        is not stored.
+        """
+        pickled = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._entries[key] = (time.monotonic() + timeout, pickled)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, *keys):
+        with self._lock:
+            self.generation += 1
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+            }
+
+
+class Invalidator:
+    """
+    Keeps every process's LocalCache coherent through Redis pub/sub.
+
+    Writers publish the keys they changed; a daemon thread in each process
+    drops those keys from its own LocalCache. Messages lost while the
+    subscription is down are covered by clearing the local cache on
+    reconnect, and by CACHE_L1_TTL bounding how stale an entry can get.
+    Without a Redis cache backend nothing is published, which is fine for a
+    single process since local writes drop local entries directly.
+    """
+
+    def __init__(self, local, channel=CACHE_L1_CHANNEL):
+        self.local = local
+        self.channel = channel
+        self.origin = uuid.uuid4().hex
+        self._pid = None
+        self._lock = threading.Lock()
+        self._available = True
+
+    def _connection(self):
+        try:
+            from django_redis import get_redis_connection
+            return get_redis_connection("default")
+        except (ImportError, NotImplementedError):
+            # Not a django_redis backend (e.g. LocMemCache in tests)
+            self._available = False
+            return None
+
+    def ensure_listening(self):
+        """Start the listener thread once per process (again after a fork)"""
+        if self._pid == os.getpid() or not self._available:
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            # A forked worker inherits entries but not the parent's thread
+            self.local.clear()
+            self.origin = uuid.uuid4().hex
+            if self._connection() is None:
+                return
+            threading.Thread(target=self._listen, name="cache-l1-invalidator", daemon=True).start()
+            self._pid = os.getpid()
+
+    def _listen(self):
+        """
+        Subscribe and handle messages forever. While Redis is unreachable,
+        reconnects back off exponentially up to CACHE_L1_RECONNECT_MAX_DELAY
+        seconds, and the outage is logged once rather than on every attempt.
+        """
+        delay = 1
+        failures = 0
+        while True:
+            pubsub = None
+            try:
+                pubsub = self._connection().pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                if failures:
+                    logger.info(f"L1 cache invalidation listener reconnected after {failures} failed attempts")
+                    delay, failures = 1, 0
+                # Anything published before the subscription went through is lost
+                self.local.clear()
+                while True:
+                    # Polling with a timeout instead of listen(): an idle channel
+                    # would otherwise hit the client's SOCKET_TIMEOUT
+                    message = pubsub.get_message(timeout=1.0)
+                    if message:
+                        self._handle(message.get('data'))
+            except Exception as e:
+                if not failures:
+                    logger.warning(f"L1 cache invalidation listener dropped, reconnecting in the background: {e}")
+                failures += 1
+                self.local.clear()
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+                time.sleep(delay)
+                delay = min(delay * 2, CACHE_L1_RECONNECT_MAX_DELAY)
+
+    def _handle(self, data):
+        try:
+            payload = json.loads(data)
+        except (TypeError, ValueError):
+            return
+        if payload.get('origin') == self.origin:
+            return
+        if payload.get('clear'):
+            self.local.clear()
+            return
+        self.local.delete(*payload.get('keys', ()))
+
+    def publish(self, keys=(), clear=False):
+        """Tell the other processes to drop keys (or everything)"""
+        if not self._available:
+            return
+        connection = self._connection()
+        if connection is None:
+            return
+        payload = {'origin': self.origin, 'keys': list(keys), 'clear': clear}
+        try:
+            connection.publish(self.channel, json.dumps(payload))
+        except Exception as e:
+            # Other processes fall back to CACHE_L1_TTL expiry
+            logger.warning(f"L1 cache invalidation publish failed: {e}")
+
+
+local_cache = LocalCache()
+invalidator = Invalidator(local_cache)
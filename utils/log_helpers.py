@@ -1,50 +1,120 @@
+import functools
 import logging
 import time
-import traceback
-from datetime import datetime
+
+from utils.metrics import observe_operation
+from utils.tracing import end_span, start_span
 
 logger = logging.getLogger(__name__)
 
 
+class _Fields:
+    """Renders operation fields as key=value only if the record is actually emitted"""
+
+    __slots__ = ('fields',)
+
+    def __init__(self, fields):
+        self.fields = fields
+
+    def __str__(self):
+        return " ".join(f"{key}={value}" for key, value in self.fields.items())
+
+
 class OperationLogger:
-    """Utility class for structured operation logging with timestamps."""
+    """
+    Utility class for structured operation logging with timings.
+
+    Each call emits one single-line record; the operation name, event and
+    fields also travel as extra attributes for the JSON formatter. Nothing
+    is formatted when the level is disabled.
+
+    Inside a sampled trace the operation is also a span (see utils.tracing),
+    parent of the queries, cache calls and operations it runs, and its
+    duration goes to the operation_duration_seconds metric (utils.metrics). If
+    an exception skips success() / fail(), the span is closed as "never
+    ended" when its parent span ends. Besides start() / success() / fail()
+    it works as a context manager, which always ends it, and
+    OperationLogger.wrap() decorates a function:
+
+        with OperationLogger("RoomCommand.Create", number=number):
+            ...
+
+        @OperationLogger.wrap()
+        def Create(...): ...
+    """
 
     def __init__(self, command_name: str, **kwargs):
         self.command_name = command_name
         self.kwargs = kwargs
         self.start_time = None
+        self._span = self._token = None
+        self._ended = False
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._ended:
+            return False
+        if exc is not None:
+            self.fail(str(exc), exc=exc)
+        else:
+            self.success()
+        return False
+
+    @classmethod
+    def wrap(cls, command_name: str = None):
+        """Decorator running the function as one operation, named after it by default"""
+        def decorator(func):
+            name = command_name or func.__qualname__
 
-    def _timestamp(self):
-        """Return formatted timestamp."""
-        return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with cls(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def _duration(self):
+        return time.perf_counter() - self.start_time if self.start_time else 0
+
+    def _end(self, error=None):
+        self._ended = True
+        end_span(self._span, self._token, error=error)
+        self._span = self._token = None
+
+    def _extra(self, event, **values):
+        return {'operation': self.command_name, 'event': event, **values}
 
     def start(self):
         """Mark the start of an operation."""
-        self.start_time = time.time()
-        lines = [
-            "----------------------------------------------",
-            f"[{self._timestamp()}] [INFO] [{self.command_name}] Starting operation...",
-        ]
-        for key, val in self.kwargs.items():
-            lines.append(f"| {key.capitalize():<12}: {val}")
-        lines.append("| Status       : In Progress")
-        lines.append("----------------------------------------------")
-        logger.info("\n" + "\n".join(lines))
+        self.start_time = time.perf_counter()
+        self._span, self._token = start_span(self.command_name, **self.kwargs)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "[%s] started %s", self.command_name, _Fields(self.kwargs),
+                extra=self._extra('start', fields=self.kwargs)
+            )
 
     def success(self, message: str = "Completed successfully"):
         """Log success with timing."""
-        duration = time.time() - self.start_time if self.start_time else 0
-        logger.info(
-            f"[{self._timestamp()}] [INFO] [{self.command_name}] {message} "
-            f"in {duration:.2f}s"
-        )
+        self._end()
+        duration = self._duration()
+        observe_operation(self.command_name, 'success', duration)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "[%s] %s in %.2fs", self.command_name, message, duration,
+                extra=self._extra('success', duration_ms=round(duration * 1000, 2))
+            )
 
     def fail(self, message: str = "Operation failed", exc: Exception = None):
         """Log failure with timing and optional traceback."""
-        duration = time.time() - self.start_time if self.start_time else 0
+        self._end(error=exc or message)
+        duration = self._duration()
+        observe_operation(self.command_name, 'fail', duration)
         logger.error(
-            f"[{self._timestamp()}] [ERROR] [{self.command_name}] {message} "
-            f"after {duration:.2f}s"
+            "[%s] %s after %.2fs", self.command_name, message, duration,
+            exc_info=exc,
+            extra=self._extra('fail', duration_ms=round(duration * 1000, 2))
         )
-        if exc:
-            logger.debug(traceback.format_exc())
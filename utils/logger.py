@@ -1,3 +1,153 @@
+import atexit
+import copy
+import gzip
+import json
 import logging
+import os
+import queue
+import shutil
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler, TimedRotatingFileHandler
 
-logger = logging.getLogger(__name__)
\ No newline at end of file
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+logger = logging.getLogger(__name__)
+
+# Attributes every LogRecord has; anything else was passed with extra=
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    One JSON object per line.
+
+    Standard fields (ts, level, logger, msg, module, process, thread) plus
+    whatever the caller passed with extra=..., and the traceback as "exc".
+    """
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+            'module': record.module,
+            'process': record.process,
+            'thread': record.thread,
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exc'] = record.exc_text
+        if record.stack_info:
+            entry['stack'] = record.stack_info
+
+        if HAS_ORJSON:
+            return orjson.dumps(entry, default=str).decode()
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+def _gzip_rotator(source, dest):
+    with open(source, 'rb') as f_in, gzip.open(dest, 'wb') as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    os.remove(source)
+
+
+def _gzip_namer(name):
+    return f"{name}.gz"
+
+
+class CompressedRotatingFileHandler(RotatingFileHandler):
+    """RotatingFileHandler (by size) that gzips rotated files: app.log.1.gz, app.log.2.gz, ..."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.rotator = _gzip_rotator
+        self.namer = _gzip_namer
+
+
+class CompressedTimedRotatingFileHandler(TimedRotatingFileHandler):
+    """TimedRotatingFileHandler that gzips rotated files: app.log.2024-01-31.gz, ..."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.rotator = _gzip_rotator
+        self.namer = _gzip_namer
+
+
+class QueueListenerHandler(QueueHandler):
+    """
+    Puts records on a bounded in-memory queue; a background thread passes
+    them to the real handlers, so formatting and disk writes never run on
+    the request thread.
+
+    In LOGGING, list the target handlers as cfg:// references. dictConfig
+    builds handlers in name order, so the targets' names must sort before
+    this handler's name:
+
+        'queue': {
+            '()': 'utils.logger.QueueListenerHandler',
+            'handlers': ['cfg://handlers.console', 'cfg://handlers.file'],
+        }
+
+    When the queue is full, records are dropped (and counted) rather than
+    blocking the caller.
+    """
+
+    def __init__(self, handlers, queue_size=10000):
+        targets = [handlers[i] for i in range(len(handlers))]  # resolves cfg:// references
+        for target in targets:
+            if not isinstance(target, logging.Handler):
+                raise TypeError(f"QueueListenerHandler target {target!r} is not a configured handler")
+        self.targets = targets
+        self.queue_size = queue_size
+        self.dropped = 0
+        super().__init__(queue.Queue(queue_size))
+        self._start()
+        atexit.register(self._stop)
+        # A forked worker gets a copy of the queue but not the listener thread
+        os.register_at_fork(after_in_child=self._restart_in_child)
+
+    def _start(self):
+        self.listener = QueueListener(self.queue, *self.targets, respect_handler_level=True)
+        self.listener.start()
+
+    def _stop(self):
+        listener, self.listener = getattr(self, 'listener', None), None
+        if listener is not None and listener._thread is not None:
+            listener.stop()
+
+    def _restart_in_child(self):
+        self.queue = queue.Queue(self.queue_size)
+        self._start()
+
+    def prepare(self, record):
+        """
+        Make the record safe to hand to another thread: only merge args into
+        the message, since they may change once the caller moves on. The
+        traceback and extra fields stay on the record for the target
+        formatters, which run on the listener thread (the stock prepare()
+        formats the whole record here).
+        """
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self):
+        # Drain the queue into the targets before they are closed
+        self._stop()
+        super().close()
@@ -0,0 +1,242 @@
+"""
+Prometheus metrics, served as text by metrics_view at /metrics.
+
+Collected here:
+    http_request_duration_seconds    per method / URL name / status (MetricsMiddleware)
+    db_queries_total, db_query_duration_seconds    per URL name (MetricsMiddleware)
+    operation_duration_seconds       every OperationLogger operation, per outcome
+    celery_task_publish_duration_seconds, celery_task_queue_wait_seconds    per task
+    cache_*                          per namespace, read from utils.cache_metrics at scrape time
+    celery_queue_length              broker queue of the audit task, read at scrape time
+
+Under a pre-fork server set PROMETHEUS_MULTIPROC_DIR (an empty directory,
+shared by the web and Celery processes of the host) before start; every
+process then writes its samples there and a scrape adds them up. The
+server must call mark_process_dead(pid) when a worker exits, e.g. in the
+gunicorn config:
+
+    from utils.metrics import mark_process_dead
+
+    def child_exit(server, worker):
+        mark_process_dead(worker.pid)
+
+The endpoint is closed unless access is configured: scrapers send
+"Authorization: Bearer <METRICS_AUTH_TOKEN>", or come from one of the
+METRICS_ALLOWED_NETWORKS. Without prometheus_client installed every call
+here is a no-op and the endpoint answers 503.
+"""
+import functools
+import hmac
+import ipaddress
+import os
+import threading
+import time
+
+import redis
+from celery import current_app
+from celery.signals import after_task_publish, before_task_publish, task_prerun
+from django.conf import settings
+from django.http import HttpResponse
+
+from utils.cache_metrics import collect as collect_cache_metrics
+
+try:
+    from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest
+    from prometheus_client import multiprocess
+    from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+    HAS_PROMETHEUS = True
+except ImportError:
+    HAS_PROMETHEUS = False
+
+METRICS_AUTH_TOKEN = getattr(settings, "METRICS_AUTH_TOKEN", None)
+METRICS_ALLOWED_NETWORKS = [
+    ipaddress.ip_network(network) for network in getattr(settings, "METRICS_ALLOWED_NETWORKS", [])
+]
+METRICS_AUDIT_TASK = "apps.administrator.tasks.log_audit_event"
+
+# Seconds; requests and operations run from ~1ms to several seconds, queries mostly well under 100ms
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1)
+
+
+def _multiprocess():
+    return bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR") or os.environ.get("prometheus_multiproc_dir"))
+
+
+if HAS_PROMETHEUS:
+    HTTP_REQUEST_DURATION = Histogram(
+        "http_request_duration_seconds", "Time spent answering HTTP requests",
+        ["method", "view", "status"], buckets=LATENCY_BUCKETS,
+    )
+    DB_QUERIES = Counter("db_queries_total", "ORM queries run while answering requests", ["view"])
+    DB_QUERY_DURATION = Histogram(
+        "db_query_duration_seconds", "Time spent in single ORM queries", ["view"], buckets=QUERY_BUCKETS,
+    )
+    OPERATION_DURATION = Histogram(
+        "operation_duration_seconds", "Duration of OperationLogger operations",
+        ["operation", "outcome"], buckets=LATENCY_BUCKETS,
+    )
+    CELERY_PUBLISH_DURATION = Histogram(
+        "celery_task_publish_duration_seconds", "Time spent sending a task to the broker",
+        ["task"], buckets=QUERY_BUCKETS,
+    )
+    CELERY_QUEUE_WAIT = Histogram(
+        "celery_task_queue_wait_seconds", "Time from publish until a worker starts the task",
+        ["task"], buckets=LATENCY_BUCKETS + (30, 60, 300),
+    )
+
+
+def observe_operation(operation, outcome, duration):
+    """Record one OperationLogger operation (outcome: "success" or "fail")"""
+    if HAS_PROMETHEUS:
+        OPERATION_DURATION.labels(operation, outcome).observe(duration)
+
+
+def mark_process_dead(pid):
+    """Drop the live-gauge files of an exited worker (multiprocess mode only)"""
+    if HAS_PROMETHEUS and _multiprocess():
+        multiprocess.mark_process_dead(pid)
+
+
+# ===== HTTP and DB =====
+
+def record_request(method, view, status, duration, query_durations=()):
+    """Record a finished request and the queries it ran"""
+    if not HAS_PROMETHEUS:
+        return
+    HTTP_REQUEST_DURATION.labels(method, view, str(status)).observe(duration)
+    if query_durations:
+        DB_QUERIES.labels(view).inc(len(query_durations))
+        histogram = DB_QUERY_DURATION.labels(view)
+        for query_duration in query_durations:
+            histogram.observe(query_duration)
+
+
+# ===== Celery =====
+
+# Publishing is synchronous, so both signals of a publish run on the same
+# thread. One slot per thread: a publish that raises never sends
+# after_task_publish, and its entry is simply overwritten by the next one.
+_publish_started = threading.local()
+
+
+@before_task_publish.connect(dispatch_uid="metrics_before_task_publish")
+def _before_publish(sender=None, headers=None, **kwargs):
+    if not HAS_PROMETHEUS or headers is None:
+        return
+    # Read back by the worker (task.request.published_at) to measure the queue wait
+    headers['published_at'] = time.time()
+    _publish_started.entry = (headers.get('id'), time.perf_counter())
+
+
+@after_task_publish.connect(dispatch_uid="metrics_after_task_publish")
+def _after_publish(sender=None, headers=None, **kwargs):
+    entry = getattr(_publish_started, 'entry', None)
+    if entry is None or entry[0] != (headers or {}).get('id'):
+        return
+    _publish_started.entry = None
+    CELERY_PUBLISH_DURATION.labels(sender).observe(time.perf_counter() - entry[1])
+
+
+@task_prerun.connect(dispatch_uid="metrics_task_prerun")
+def _task_prerun(sender=None, task=None, **kwargs):
+    if not HAS_PROMETHEUS or task is None:
+        return
+    published_at = getattr(task.request, 'published_at', None)
+    if published_at and not task.request.is_eager:
+        CELERY_QUEUE_WAIT.labels(task.name).observe(max(time.time() - published_at, 0))
+
+
+# ===== Scrape-time collectors =====
+
+class CacheMetricsCollector:
+    """
+    Cache counters per namespace from utils.cache_metrics. Those are
+    already summed over all processes in Redis, so this is read once per
+    scrape rather than kept in prometheus_client.
+    """
+
+    def collect(self):
+        calls = CounterMetricFamily("cache_calls", "Cache calls", labels=["namespace", "op"])
+        hits = CounterMetricFamily("cache_hits", "Cache reads that found a value", labels=["namespace"])
+        misses = CounterMetricFamily("cache_misses", "Cache reads that found nothing", labels=["namespace"])
+        errors = CounterMetricFamily("cache_errors", "Cache calls that raised", labels=["namespace"])
+        ratio = GaugeMetricFamily("cache_hit_ratio", "hits / (hits + misses)", labels=["namespace"])
+        try:
+            summary = collect_cache_metrics()
+        except Exception:
+            summary = {}
+        for namespace, values in summary.items():
+            for op, count in values['calls'].items():
+                calls.add_metric([namespace, op], count)
+            hits.add_metric([namespace], values['hits'])
+            misses.add_metric([namespace], values['misses'])
+            errors.add_metric([namespace], values['errors'])
+            if values['hit_ratio'] is not None:
+                ratio.add_metric([namespace], values['hit_ratio'])
+        return [calls, hits, misses, errors, ratio]
+
+
+@functools.lru_cache(maxsize=1)
+def _broker_client(broker_url):
+    """One client (and connection pool) per process for scrape-time queue reads"""
+    return redis.Redis.from_url(broker_url, socket_timeout=1, socket_connect_timeout=1)
+
+
+class CeleryQueueCollector:
+    """Length of the broker queue the audit task is sent to (Redis brokers only)"""
+
+    def collect(self):
+        gauge = GaugeMetricFamily("celery_queue_length", "Messages waiting in a broker queue", labels=["queue"])
+        broker_url = current_app.conf.broker_url or ""
+        if not broker_url.startswith(("redis://", "rediss://")):
+            return [gauge]
+        task = current_app.tasks.get(METRICS_AUDIT_TASK)
+        queue = getattr(task, 'queue', None) or current_app.conf.task_default_queue
+        try:
+            gauge.add_metric([queue], _broker_client(broker_url).llen(queue))
+        except Exception:
+            pass
+        return [gauge]
+
+
+def _registry():
+    registry = CollectorRegistry()
+    if _multiprocess():
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry.register(REGISTRY)
+    registry.register(CacheMetricsCollector())
+    registry.register(CeleryQueueCollector())
+    return registry
+
+
+def _from_allowed_network(request):
+    try:
+        address = ipaddress.ip_address(request.META.get("REMOTE_ADDR", ""))
+    except ValueError:
+        return False
+    return any(address in network for network in METRICS_ALLOWED_NETWORKS)
+
+
+def _scrape_allowed(request):
+    """
+    A valid bearer token when METRICS_AUTH_TOKEN is set, otherwise a client
+    address in METRICS_ALLOWED_NETWORKS. Nothing configured: closed.
+    """
+    if METRICS_AUTH_TOKEN:
+        return hmac.compare_digest(
+            request.headers.get("Authorization", "").encode(), f"Bearer {METRICS_AUTH_TOKEN}".encode()
+        )
+    return _from_allowed_network(request)
+
+
+def metrics_view(request):
+    """Prometheus text exposition of all of the above"""
+    if not HAS_PROMETHEUS:
+        return HttpResponse("prometheus_client is not installed", status=503, content_type="text/plain")
+    if not _scrape_allowed(request):
+        if METRICS_AUTH_TOKEN:
+            return HttpResponse("Unauthorized", status=401, content_type="text/plain")
+        return HttpResponse("Forbidden", status=403, content_type="text/plain")
+    return HttpResponse(generate_latest(_registry()), content_type=CONTENT_TYPE_LATEST)
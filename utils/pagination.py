@@ -0,0 +1,174 @@
+import base64
+import json
+from http import HTTPStatus
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured, ValidationError
+from django.db.models import Q
+
+from utils.base_result import BaseResultWithData
+
+DEFAULT_PAGE_SIZE = settings.REST_FRAMEWORK.get("PAGE_SIZE", 20)
+MAX_PAGE_SIZE = getattr(settings, "MAX_PAGE_SIZE", 100)
+
+
+class InvalidCursor(ValueError):
+    """Raised when a client sends a cursor that can't be decoded"""
+
+
+class KeysetPage:
+    """One page of rows plus the cursor for the next page"""
+
+    def __init__(self, rows, next_cursor=None, page_size=DEFAULT_PAGE_SIZE):
+        self.rows = rows
+        self.next_cursor = next_cursor
+        self.page_size = page_size
+
+    @property
+    def has_more(self):
+        return self.next_cursor is not None
+
+    def to_dict(self, results):
+        return {
+            'results': results,
+            'next_cursor': self.next_cursor,
+            'has_more': self.has_more,
+            'page_size': self.page_size,
+        }
+
+
+class KeysetPaginator:
+    """
+    Keyset (seek) pagination over a fixed ordering.
+
+    The last field of the ordering must be unique (usually the pk) so every
+    row has a stable position, and no field may be nullable: NULL sorts
+    differently per database and can't be compared in the seek condition,
+    so a page ending on a NULL would have no usable cursor. Instead of an
+    OFFSET, the next page is read with a WHERE clause built from the
+    previous page's last row, so every page costs one index range scan.
+    Memory stays bounded by page_size no matter how big the table gets.
+
+    Example:
+        paginator = KeysetPaginator(['-id'], page_size=20)
+        page = paginator.paginate(Room.objects.all(), cursor=request_cursor)
+    """
+
+    def __init__(self, ordering, page_size=None):
+        self.ordering = tuple(ordering)
+        self.fields = [field.lstrip('-') for field in self.ordering]
+        self.page_size = self.clamp_page_size(page_size)
+
+    @staticmethod
+    def clamp_page_size(page_size):
+        """Coerce a client supplied page size into 1..MAX_PAGE_SIZE"""
+        try:
+            page_size = int(page_size)
+        except (TypeError, ValueError):
+            return DEFAULT_PAGE_SIZE
+        return max(1, min(page_size, MAX_PAGE_SIZE))
+
+    @staticmethod
+    def encode_cursor(values):
+        raw = json.dumps(values, default=lambda value: value.isoformat() if hasattr(value, 'isoformat') else str(value))
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        except (ValueError, TypeError) as e:
+            raise InvalidCursor("Invalid cursor") from e
+
+        if not isinstance(values, list) or len(values) != len(self.fields):
+            raise InvalidCursor("Invalid cursor")
+        return values
+
+    def _seek_filter(self, values):
+        """
+        Build the lexicographic "comes after" condition, e.g. for
+        ('status', '-id'): status > a OR (status = a AND id < b)
+        """
+        condition = Q()
+        equal_so_far = Q()
+        for ordering, field, value in zip(self.ordering, self.fields, values):
+            lookup = 'lt' if ordering.startswith('-') else 'gt'
+            condition |= equal_so_far & Q(**{f"{field}__{lookup}": value})
+            equal_so_far &= Q(**{field: value})
+        return condition
+
+    def _check_ordering(self, model):
+        for field_name in self.fields:
+            try:
+                field = model._meta.get_field(field_name)
+            except FieldDoesNotExist:
+                # Annotations and related paths are the caller's responsibility
+                continue
+            if field.null:
+                raise ImproperlyConfigured(
+                    f"Keyset ordering can't use nullable field {model.__name__}.{field_name}"
+                )
+
+    def _row_values(self, row):
+        if isinstance(row, dict):
+            return [row[field] for field in self.fields]
+        return [getattr(row, field) for field in self.fields]
+
+    def paginate(self, queryset, cursor=None):
+        """
+        Fetch one page from the queryset.
+
+        Rows can be model instances or dicts (from .values()), as long as
+        they include the ordering fields.
+
+        Returns:
+            KeysetPage: Page rows and next cursor
+        """
+        self._check_ordering(queryset.model)
+        queryset = queryset.order_by(*self.ordering)
+        if cursor:
+            values = self.decode_cursor(cursor)
+            try:
+                queryset = queryset.filter(self._seek_filter(values))
+            except (ValueError, ValidationError) as e:
+                # Cursor values of the wrong type fail while building the lookups
+                raise InvalidCursor("Invalid cursor") from e
+
+        # One extra row tells us whether another page exists
+        rows = list(queryset[:self.page_size + 1])
+        next_cursor = None
+        if len(rows) > self.page_size:
+            rows = rows[:self.page_size]
+            next_cursor = self.encode_cursor(self._row_values(rows[-1]))
+
+        return KeysetPage(rows, next_cursor, self.page_size)
+
+
+def paginate_queryset(queryset, ordering, serialize, cursor=None, page_size=None, message="Records retrieved successfully"):
+    """
+    Shared list helper for the BBL query classes.
+
+    Args:
+        queryset: Filtered queryset (model instances or .values() rows)
+        ordering (list): Keyset ordering, last field unique
+        serialize (callable): Turns the page rows into a list of dicts
+        cursor (str): Cursor from the previous page (optional)
+        page_size (int): Requested page size (optional)
+        message (str): Success message
+
+    Returns:
+        BaseResultWithData: Result with results, next_cursor and has_more
+    """
+    try:
+        page = KeysetPaginator(ordering, page_size=page_size).paginate(queryset, cursor)
+    except InvalidCursor as e:
+        return BaseResultWithData(
+            message=str(e),
+            status_code=HTTPStatus.BAD_REQUEST
+        )
+
+    return BaseResultWithData(
+        message=message,
+        data=page.to_dict(serialize(page.rows)),
+        status_code=HTTPStatus.OK
+    )
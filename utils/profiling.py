@@ -0,0 +1,203 @@
+"""
+On-demand profiling of single requests (see ProfilingMiddleware).
+
+Two modes:
+    sample    a background thread samples the request thread's stack every
+              PROFILE_SAMPLE_INTERVAL seconds and writes folded stacks
+              (".collapsed", one "outer;...;inner count" line per stack),
+              ready for flamegraph.pl, speedscope or inferno. Low overhead.
+    cprofile  deterministic cProfile of every call, written as pstats
+              (".prof") for snakeviz / flameprof / python -m pstats.
+              Exact call counts, but slows the request down noticeably.
+
+Profiles go to PROFILE_DIR (LOG_DIR/profiles); only the newest PROFILE_KEEP
+are kept. Sessions are limited to PROFILE_MAX_CONCURRENT at a time per
+process and PROFILE_MAX_PER_MINUTE across all processes.
+"""
+import cProfile
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+
+from utils.enums import CacheKeys
+
+PROFILE_DIR = getattr(settings, "PROFILE_DIR", os.path.join(getattr(settings, "LOG_DIR", "logs"), "profiles"))
+PROFILE_SAMPLE_INTERVAL = getattr(settings, "PROFILE_SAMPLE_INTERVAL", 0.005)
+PROFILE_MAX_CONCURRENT = getattr(settings, "PROFILE_MAX_CONCURRENT", 1)
+PROFILE_MAX_PER_MINUTE = getattr(settings, "PROFILE_MAX_PER_MINUTE", 6)
+PROFILE_KEEP = getattr(settings, "PROFILE_KEEP", 50)
+
+MODES = {'sample': '.collapsed', 'cprofile': '.prof'}
+
+_PROFILE_NAME = re.compile(r"^[\w.-]+\.(collapsed|prof)$")
+_UNSAFE_CHARS = re.compile(r"[^\w-]+")
+_BASE_DIR = str(getattr(settings, "BASE_DIR", ""))
+
+_sessions = threading.BoundedSemaphore(PROFILE_MAX_CONCURRENT)
+
+
+class RateLimited(Exception):
+    """No profiling session is available right now"""
+
+
+# ===== Profilers =====
+
+def _frame_label(frame):
+    code = frame.f_code
+    filename = code.co_filename
+    if _BASE_DIR and filename.startswith(_BASE_DIR):
+        filename = os.path.relpath(filename, _BASE_DIR)
+    else:
+        # Third-party / stdlib: package and module are enough
+        filename = "/".join(filename.replace("\\", "/").split("/")[-2:])
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(";", ",")
+
+
+class SamplingProfiler:
+    """Counts the stacks of one thread, sampled from a background thread"""
+
+    def __init__(self, thread_id, interval=PROFILE_SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def dump(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class DeterministicProfiler:
+    """cProfile of the current thread"""
+
+    def __init__(self):
+        self.profile = cProfile.Profile()
+
+    def start(self):
+        self.profile.enable()
+
+    def stop(self):
+        self.profile.disable()
+
+    def dump(self, path):
+        self.profile.dump_stats(path)
+
+
+# ===== Sessions =====
+
+def _take_rate_slot():
+    """
+    Take one of PROFILE_MAX_PER_MINUTE slots of the current minute, shared by all processes.
+
+    Raises:
+        RateLimited: No slot left, or the cache is unreachable (the limit can't
+            be enforced then, so the request runs unprofiled)
+    """
+    key = f"{CacheKeys.PROFILING.value}:window:{int(time.time() // 60)}"
+    try:
+        cache.add(key, 0, 120)
+        count = cache.incr(key)
+    except ValueError:
+        # Window key expired between add and incr
+        raise RateLimited("Profiling window rolled over")
+    except Exception as e:
+        raise RateLimited(f"Profiling rate limit unavailable: {type(e).__name__}: {e}") from e
+    if count > PROFILE_MAX_PER_MINUTE:
+        raise RateLimited(f"More than {PROFILE_MAX_PER_MINUTE} profiling sessions this minute")
+
+
+@contextmanager
+def profile(mode, label):
+    """
+    Profile the block on this thread and write the result to PROFILE_DIR.
+
+    Args:
+        mode (str): "sample" or "cprofile"
+        label (str): Goes into the file name, e.g. "GET /admin/api/room/list/"
+
+    Yields:
+        dict: Filled with 'name' (the profile file name) when the block ends
+
+    Raises:
+        RateLimited: PROFILE_MAX_CONCURRENT / PROFILE_MAX_PER_MINUTE reached,
+            or the rate limit can't be checked
+    """
+    if not _sessions.acquire(blocking=False):
+        raise RateLimited("Another profiling session is running")
+    try:
+        _take_rate_slot()
+
+        profiler = SamplingProfiler(threading.get_ident()) if mode == 'sample' else DeterministicProfiler()
+        stamp = datetime.now().strftime("%Y%m%dT%H%M%S%f")
+        name = f"{stamp}-{mode}-{_UNSAFE_CHARS.sub('-', label).strip('-')[:80]}{MODES[mode]}"
+        result = {'name': name}
+        profiler.start()
+        try:
+            yield result
+        finally:
+            profiler.stop()
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            profiler.dump(os.path.join(PROFILE_DIR, name))
+            _prune()
+    finally:
+        _sessions.release()
+
+
+def _prune():
+    for name in [entry['name'] for entry in list_profiles()][PROFILE_KEEP:]:
+        try:
+            os.remove(os.path.join(PROFILE_DIR, name))
+        except OSError:
+            pass
+
+
+def list_profiles():
+    """Stored profiles, newest first"""
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    profiles = []
+    for entry in os.scandir(PROFILE_DIR):
+        if entry.is_file() and _PROFILE_NAME.match(entry.name):
+            stat = entry.stat()
+            profiles.append({
+                'name': entry.name,
+                'mode': 'sample' if entry.name.endswith('.collapsed') else 'cprofile',
+                'size': stat.st_size,
+                'created_at': datetime.fromtimestamp(stat.st_mtime).isoformat(timespec='seconds'),
+            })
+    return sorted(profiles, key=lambda entry: entry['name'], reverse=True)
+
+
+def profile_path(name):
+    """Path of a stored profile, or None for unknown or unsafe names"""
+    if not _PROFILE_NAME.match(name or ""):
+        return None
+    path = os.path.join(PROFILE_DIR, name)
+    return path if os.path.isfile(path) else None
@@ -0,0 +1,99 @@
+import math
+from decimal import Decimal
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from utils.tracing import span
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+# Types orjson doesn't handle natively (Decimal, timedelta, lazy strings,
+# querysets...) go through DRF's encoder so they keep their current format.
+_drf_default = JSONEncoder().default
+
+
+def _has_non_finite(data):
+    """True if data holds a NaN or infinite float / Decimal anywhere"""
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, float):
+            if not math.isfinite(value):
+                return True
+        elif isinstance(value, Decimal):
+            if not value.is_finite():
+                return True
+        elif isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+    return False
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    Drop-in replacement for DRF's JSONRenderer backed by orjson.
+
+    Keeps the stock wire format: compact separators, UTF-8 output, 'Z' for
+    UTC datetimes, Decimal as float (serializer fields already coerce them
+    to strings), non-string dict keys as strings and escaped U+2028/U+2029.
+    Indented output (browsable API / ?indent) and anything orjson refuses,
+    such as integers over 64 bits, fall back to the stock renderer. So do
+    NaN and Infinity, which orjson writes as null: the stock renderer raises
+    on them (or writes NaN with STRICT_JSON off).
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        with span("render.json"):
+            return self._render(data, accepted_media_type, renderer_context)
+
+    def _render(self, data, accepted_media_type, renderer_context):
+
+        renderer_context = renderer_context or {}
+        if not HAS_ORJSON or self.get_indent(accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(
+                data,
+                default=_drf_default,
+                option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS,
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Non-finite numbers come out as null, so only output with a null needs the walk
+        if b'null' in ret and _has_non_finite(data):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Same as the stock renderer: these are valid JSON but break JavaScript
+        return ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
+
+
+class ORJSONParser(JSONParser):
+    """
+    Drop-in replacement for DRF's JSONParser backed by orjson.
+    Bodies in a charset other than UTF-8 are handed to the stock parser.
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if not HAS_ORJSON or encoding.lower().replace('_', '-') not in ('utf-8', 'utf8'):
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
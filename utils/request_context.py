@@ -0,0 +1,160 @@
+"""
+Current request and user, kept in contextvars.
+
+CurrentUserMiddleware binds the request for the duration of a request
+(sync or async). The user is read from it when asked for, because DRF's
+JWT authentication sets request.user after the middleware has run.
+
+Outside a request the user can be bound explicitly with user_context(),
+and it follows the work it started:
+    - into executor threads: run them on a ContextThreadPoolExecutor
+    - into Celery tasks: published tasks carry the user in a "current_user"
+      header and the worker binds it while the task runs. The user row is
+      only loaded if something asks for the object; the username (all
+      audit stamping needs) comes from the header.
+"""
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from celery.signals import before_task_publish, task_postrun, task_prerun
+from django.contrib.auth import get_user_model
+from django.utils.functional import cached_property
+
+_current_request = contextvars.ContextVar("current_request", default=None)
+_current_user = contextvars.ContextVar("current_user", default=None)
+
+CURRENT_USER_HEADER = "current_user"
+
+
+class _UserRef:
+    """A user known by id and username; the row is loaded on first access"""
+
+    def __init__(self, user_id, username):
+        self.user_id = user_id
+        self.username = username
+
+    @cached_property
+    def user(self):
+        if self.user_id is None:
+            return None
+        return get_user_model().objects.filter(pk=self.user_id).first()
+
+
+def _username(user):
+    return getattr(user, "username", None) or getattr(user, "email", None)
+
+
+def get_current_request():
+    """Request being handled in this context, if any"""
+    return _current_request.get()
+
+
+def get_current_user():
+    """
+    User of the request handled in this context, or the user bound with
+    user_context() / propagated to this task. None if there is neither.
+    """
+    request = _current_request.get()
+    if request is not None:
+        return getattr(request, "user", None)
+    user = _current_user.get()
+    return user.user if isinstance(user, _UserRef) else user
+
+
+def get_current_username():
+    """Name stamped into created_by / modified_by / deleted_by"""
+    request = _current_request.get()
+    if request is not None:
+        return _username(getattr(request, "user", None)) or "System"
+    user = _current_user.get()
+    if isinstance(user, _UserRef):
+        return user.username or "System"
+    return _username(user) or "System"
+
+
+@contextmanager
+def request_context(request):
+    """Bind a request for the block (used by CurrentUserMiddleware)"""
+    token = _current_request.set(request)
+    try:
+        yield request
+    finally:
+        _current_request.reset(token)
+
+
+@contextmanager
+def user_context(user):
+    """
+    Act as a user for the block, e.g. in management commands or scripts.
+
+    Example:
+        with user_context(admin):
+            ArchiveCommand.Restore(...)
+    """
+    request_token = _current_request.set(None)
+    user_token = _current_user.set(user)
+    try:
+        yield user
+    finally:
+        _current_user.reset(user_token)
+        _current_request.reset(request_token)
+
+
+class ContextThreadPoolExecutor(ThreadPoolExecutor):
+    """ThreadPoolExecutor running every task in a copy of the submitter's context"""
+
+    def submit(self, fn, /, *args, **kwargs):
+        return super().submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+# ===== Celery propagation =====
+
+def _current_user_header():
+    request = _current_request.get()
+    if request is not None:
+        user = getattr(request, "user", None)
+        if user is None or not user.is_authenticated:
+            return None
+        return {'id': user.pk, 'username': _username(user)}
+    user = _current_user.get()
+    if isinstance(user, _UserRef):
+        return {'id': user.user_id, 'username': user.username}
+    if user is not None:
+        return {'id': getattr(user, 'pk', None), 'username': _username(user)}
+    return None
+
+
+@before_task_publish.connect(dispatch_uid="request_context_before_task_publish")
+def _publish_current_user(headers=None, **kwargs):
+    if headers is None:
+        return
+    header = _current_user_header()
+    if header is not None:
+        headers[CURRENT_USER_HEADER] = header
+
+
+# Tokens to undo the binding, kept on the task's request (one per execution)
+_TOKENS_ATTRIBUTE = "_current_user_tokens"
+
+
+@task_prerun.connect(dispatch_uid="request_context_task_prerun")
+def _bind_task_user(task=None, **kwargs):
+    header = getattr(task.request, CURRENT_USER_HEADER, None) if task is not None else None
+    if not header:
+        # Eager tasks run in the caller's context and keep its user
+        return
+    setattr(task.request, _TOKENS_ATTRIBUTE, (
+        _current_request.set(None),
+        _current_user.set(_UserRef(header.get('id'), header.get('username'))),
+    ))
+
+
+@task_postrun.connect(dispatch_uid="request_context_task_postrun")
+def _unbind_task_user(task=None, **kwargs):
+    tokens = getattr(task.request, _TOKENS_ATTRIBUTE, None) if task is not None else None
+    if tokens is not None:
+        setattr(task.request, _TOKENS_ATTRIBUTE, None)
+        request_token, user_token = tokens
+        _current_user.reset(user_token)
+        _current_request.reset(request_token)
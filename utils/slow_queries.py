@@ -0,0 +1,240 @@
+"""
+Slow query log.
+
+install() hooks every new database connection (connection_created) with an
+execute wrapper. Queries slower than SLOW_QUERY_MS are logged to the
+"utils.slow_queries" logger (LOGGING sends it to LOG_DIR/slow_queries.log,
+rotated and gzipped) with their fingerprint, call site and, for SELECTs, the
+plan from EXPLAIN without ANALYZE (the query is not run again). Each
+fingerprint is explained at most once per SLOW_QUERY_EXPLAIN_INTERVAL per
+process. Parameters are never logged.
+
+summarize() reads the log back, grouped by fingerprint, for the admin endpoint:
+the live log and the newest SLOW_QUERY_SUMMARY_FILES rotated files.
+"""
+import contextvars
+import glob
+import gzip
+import json
+import logging
+import os
+import re
+import sys
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+from django.db.backends.signals import connection_created
+
+from utils.db import fingerprint
+
+logger = logging.getLogger(__name__)
+
+SLOW_QUERY_ENABLED = getattr(settings, "SLOW_QUERY_ENABLED", True)
+SLOW_QUERY_MS = getattr(settings, "SLOW_QUERY_MS", 200)
+SLOW_QUERY_EXPLAIN = getattr(settings, "SLOW_QUERY_EXPLAIN", True)
+SLOW_QUERY_EXPLAIN_INTERVAL = getattr(settings, "SLOW_QUERY_EXPLAIN_INTERVAL", 600)
+SLOW_QUERY_LOG_PATH = getattr(
+    settings, "SLOW_QUERY_LOG_PATH", os.path.join(getattr(settings, "LOG_DIR", "logs"), "slow_queries.log")
+)
+SLOW_QUERY_SUMMARY_FILES = getattr(settings, "SLOW_QUERY_SUMMARY_FILES", 3)
+SLOW_QUERY_SQL_MAX_LENGTH = 2000
+
+_EXPLAIN_PREFIX = {
+    'postgresql': "EXPLAIN (ANALYZE off) ",
+    'sqlite': "EXPLAIN QUERY PLAN ",
+    'mysql': "EXPLAIN ",
+}
+# Plan lines that read a whole table: Postgres "Seq Scan on t", SQLite "SCAN t" (without an index)
+_FULL_SCAN = re.compile(r"Seq Scan on (\w+)|\bSCAN (\w+)(?! USING)")
+
+_BASE_DIR = str(getattr(settings, "BASE_DIR", ""))
+# Our own query wrappers; the call site is the first frame outside these and third-party code
+_SKIPPED_FILES = tuple(
+    os.path.join(_BASE_DIR, path) for path in ("utils/db.py", "utils/slow_queries.py", "utils/tracing.py", "utils/Middlewares")
+)
+
+_explaining = contextvars.ContextVar("slow_query_explaining", default=False)
+_last_explained = {}
+# Per-fingerprint totals of rotated log files, see _rotated_groups()
+_rotated_cache = {}
+
+
+def _call_site():
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(_BASE_DIR) and not filename.startswith(_SKIPPED_FILES) and "site-packages" not in filename:
+            return f"{os.path.relpath(filename, _BASE_DIR)}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return None
+
+
+def _explain(connection, sql, params):
+    prefix = _EXPLAIN_PREFIX.get(connection.vendor)
+    if prefix is None:
+        return None
+    token = _explaining.set(True)
+    try:
+        # In a savepoint, so a failing EXPLAIN can't break the caller's transaction
+        with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            cursor.execute(prefix + sql, params)
+            rows = cursor.fetchall()
+    except Exception as e:
+        return f"EXPLAIN failed: {e}"
+    finally:
+        _explaining.reset(token)
+    if connection.vendor == 'sqlite':
+        return "\n".join(str(row[-1]) for row in rows)
+    return "\n".join(str(row[0]) if len(row) == 1 else " | ".join(map(str, row)) for row in rows)
+
+
+def _should_explain(shape, sql, many):
+    if not SLOW_QUERY_EXPLAIN or many or not sql.lstrip()[:6].upper().startswith(("SELECT", "WITH")):
+        return False
+    now = time.monotonic()
+    if now - _last_explained.get(shape, float('-inf')) < SLOW_QUERY_EXPLAIN_INTERVAL:
+        return False
+    _last_explained[shape] = now
+    return True
+
+
+def slow_query_wrapper(execute, sql, params, many, context):
+    """Execute wrapper logging queries slower than SLOW_QUERY_MS"""
+    if _explaining.get():
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    result = execute(sql, params, many, context)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    if elapsed_ms < SLOW_QUERY_MS:
+        return result
+
+    connection = context['connection']
+    shape = fingerprint(sql)
+    plan = _explain(connection, sql, params) if _should_explain(shape, sql, many) else None
+    logger.warning(
+        "Slow query (%.1f ms): %s", elapsed_ms, shape[:200],
+        extra={
+            'fingerprint': shape,
+            'sql': sql[:SLOW_QUERY_SQL_MAX_LENGTH],
+            'duration_ms': round(elapsed_ms, 3),
+            'call_site': _call_site(),
+            'db': connection.alias,
+            'many': many,
+            'plan': plan,
+        }
+    )
+    return result
+
+
+def _install_on(sender, connection, **kwargs):
+    # Prepended, not appended: connections open lazily, often inside a
+    # connection.execute_wrapper() block (MetricsMiddleware, QueryBudgetMiddleware),
+    # and that block removes its wrapper with a pop() from the end of the list
+    if slow_query_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, slow_query_wrapper)
+
+
+def install():
+    """Wrap every connection opened from now on (called from AppConfig.ready)"""
+    if SLOW_QUERY_ENABLED:
+        connection_created.connect(_install_on, dispatch_uid="slow_query_wrapper")
+
+
+# ===== Summary =====
+
+def _aggregate(lines):
+    groups = {}
+    for line in lines:
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            continue
+        shape = entry.get('fingerprint')
+        if not shape:
+            continue
+        group = groups.setdefault(shape, {
+            'fingerprint': shape, 'count': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+            'last_seen': None, 'sql': None, 'plan': None, 'call_sites': Counter(),
+        })
+        duration = entry.get('duration_ms') or 0
+        group['count'] += 1
+        group['total_ms'] += duration
+        group['max_ms'] = max(group['max_ms'], duration)
+        group['last_seen'] = entry.get('ts')
+        group['sql'] = entry.get('sql')
+        group['plan'] = entry.get('plan') or group['plan']
+        if entry.get('call_site'):
+            group['call_sites'][entry['call_site']] += 1
+    return groups
+
+
+def _merge(groups, newer):
+    for shape, part in newer.items():
+        group = groups.get(shape)
+        if group is None:
+            groups[shape] = {**part, 'call_sites': Counter(part['call_sites'])}
+            continue
+        group['count'] += part['count']
+        group['total_ms'] += part['total_ms']
+        group['max_ms'] = max(group['max_ms'], part['max_ms'])
+        group['last_seen'] = part['last_seen']
+        group['sql'] = part['sql']
+        group['plan'] = part['plan'] or group['plan']
+        group['call_sites'].update(part['call_sites'])
+
+
+def _rotated_groups(rotated):
+    # A rotated file never changes again, only its number goes up; the
+    # inode, size and mtime survive the rename, the name doesn't
+    stat = os.stat(rotated)
+    key = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+    groups = _rotated_cache.get(key)
+    if groups is None:
+        with gzip.open(rotated, 'rt', encoding='utf-8') as f:
+            groups = _rotated_cache[key] = _aggregate(f)
+    return key, groups
+
+
+def summarize(limit=20, path=SLOW_QUERY_LOG_PATH, rotated_files=SLOW_QUERY_SUMMARY_FILES):
+    """
+    Slow queries in the log, grouped by fingerprint.
+
+    Rotated files are decompressed once per process; their totals are
+    cached and only the live log is parsed on every call.
+
+    Args:
+        limit (int): Number of fingerprints to return
+        path (str): Log file; the newest rotated "<path>.N.gz" files are read too
+        rotated_files (int): How many rotated files to read
+
+    Returns:
+        list: One dict per fingerprint, most total time first
+    """
+    numbered = sorted(glob.glob(f"{path}.*.gz"), key=lambda name: int(name.rsplit(".", 2)[-2]))
+    groups = {}
+    seen = set()
+    # Oldest rotated file first, the live log last
+    for rotated in reversed(numbered[:max(rotated_files, 0)]):
+        try:
+            key, part = _rotated_groups(rotated)
+        except (OSError, EOFError):
+            continue  # rotated away (or still being written) meanwhile
+        seen.add(key)
+        _merge(groups, part)
+    for key in set(_rotated_cache) - seen:
+        _rotated_cache.pop(key, None)
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            _merge(groups, _aggregate(f))
+
+    summary = []
+    for group in sorted(groups.values(), key=lambda group: -group['total_ms'])[:limit]:
+        group['total_ms'] = round(group['total_ms'], 3)
+        group['avg_ms'] = round(group['total_ms'] / group['count'], 3)
+        group['call_sites'] = [{'call_site': site, 'count': count} for site, count in group['call_sites'].most_common(5)]
+        group['full_scans'] = sorted({a or b for a, b in _FULL_SCAN.findall(group['plan'] or "")})
+        summary.append(group)
+    return summary
@@ -0,0 +1,379 @@
+"""
+Lightweight request tracing: nested spans kept in a contextvar.
+
+A trace is started per request by TracingMiddleware (or with trace() for
+commands and tasks) for a TRACE_SAMPLE_RATE share of requests. Inside a
+sampled trace, span() / @traced, OperationLogger, ORM queries, cache calls
+and Celery publishes become child spans. The finished trace is handed to
+the exporter picked by TRACE_EXPORTER ("jsonl" or "otlp") on a background
+thread. Outside a sampled trace every call here is a cheap no-op.
+"""
+import abc
+import contextvars
+import functools
+import json
+import logging
+import os
+import queue
+import random
+import secrets
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+
+from celery.signals import after_task_publish, before_task_publish
+from django.conf import settings
+
+from utils.db import execute_wrapper
+
+logger = logging.getLogger(__name__)
+
+TRACE_SAMPLE_RATE = getattr(settings, "TRACE_SAMPLE_RATE", 0.0)
+TRACE_EXPORTER = getattr(settings, "TRACE_EXPORTER", "jsonl")
+TRACE_JSONL_PATH = getattr(settings, "TRACE_JSONL_PATH", os.path.join(getattr(settings, "LOG_DIR", "logs"), "traces.jsonl"))
+TRACE_OTLP_ENDPOINT = getattr(settings, "TRACE_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+TRACE_SERVICE_NAME = getattr(settings, "TRACE_SERVICE_NAME", "hostel-api")
+TRACE_MAX_SPANS = getattr(settings, "TRACE_MAX_SPANS", 1000)
+TRACE_SQL_MAX_LENGTH = 500
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+class Trace:
+    """All spans of one sampled request / task"""
+
+    __slots__ = ('trace_id', 'spans', 'dropped')
+
+    def __init__(self):
+        self.trace_id = secrets.token_hex(16)
+        self.spans = []
+        self.dropped = 0
+
+
+class Span:
+    __slots__ = ('trace', 'span_id', 'parent', 'name', 'attributes', 'start_ns', 'end_ns', 'error')
+
+    def __init__(self, trace, name, parent=None, attributes=None):
+        self.trace = trace
+        self.span_id = secrets.token_hex(8)
+        self.parent = parent
+        self.name = name
+        self.attributes = attributes or {}
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.error = None
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def finish(self, error=None):
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.time_ns()
+        if isinstance(error, BaseException):
+            self.error = f"{type(error).__name__}: {error}"
+        elif error is not None:
+            self.error = str(error)
+
+    @property
+    def duration_ms(self):
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+
+def current_span():
+    return _current_span.get()
+
+
+def current_trace_id():
+    """Trace id of the sampled trace running in this context, or None"""
+    span = _current_span.get()
+    return span.trace.trace_id if span is not None else None
+
+
+def start_span(name, **attributes):
+    """
+    Open a child of the current span and make it current.
+
+    Returns:
+        tuple: (span, token) to pass to end_span(), or (None, None) outside a sampled trace
+    """
+    parent = _current_span.get()
+    if parent is None:
+        return None, None
+    trace = parent.trace
+    if len(trace.spans) >= TRACE_MAX_SPANS:
+        trace.dropped += 1
+        return None, None
+    span = Span(trace, name, parent=parent, attributes=attributes)
+    trace.spans.append(span)
+    return span, _current_span.set(span)
+
+
+def _finish_abandoned(span):
+    """
+    Finish the spans still open below span, e.g. from an OperationLogger
+    whose start() never got its success() / fail() because the command
+    raised. Without this they would stay current for the rest of the trace.
+    """
+    abandoned = []
+    current = _current_span.get()
+    while current is not None and current is not span:
+        abandoned.append(current)
+        current = current.parent
+    if current is not span:
+        # span isn't an ancestor of the current span (ended from another context)
+        return
+    for child in abandoned:
+        child.finish(error="Span was never ended")
+
+
+def end_span(span, token, error=None):
+    """Close a span from start_span() and restore its parent as current"""
+    if span is None:
+        return
+    _finish_abandoned(span)
+    span.finish(error)
+    try:
+        _current_span.reset(token)
+    except ValueError:
+        # Ended from another context (e.g. a callback); just move back to the parent
+        _current_span.set(span.parent)
+
+
+@contextmanager
+def span(name, **attributes):
+    """
+    Child span around a block. Yields the span (None when not sampled).
+
+    Example:
+        with span("rooms.serialize", rows=len(rows)):
+            ...
+    """
+    child, token = start_span(name, **attributes)
+    try:
+        yield child
+    except BaseException as e:
+        end_span(child, token, error=e)
+        raise
+    end_span(child, token)
+
+
+def traced(name=None):
+    """Decorator form of span(); the span is named after the function by default"""
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _db_span_wrapper(execute, sql, params, many, context):
+    child, token = start_span("db.query", sql=sql[:TRACE_SQL_MAX_LENGTH], many=many,
+                              db=context['connection'].alias)
+    try:
+        result = execute(sql, params, many, context)
+    except BaseException as e:
+        end_span(child, token, error=e)
+        raise
+    end_span(child, token)
+    return result
+
+
+@contextmanager
+def trace(name, sample_rate=None, **attributes):
+    """
+    Root span of a new trace, exported when the block ends.
+
+    Not sampled (or nested in a running trace): yields the current span and
+    records nothing new. Every ORM query inside a sampled trace becomes a
+    "db.query" span.
+
+    Args:
+        name (str): Root span name, e.g. "GET /admin/api/room/list/"
+        sample_rate (float): Overrides TRACE_SAMPLE_RATE
+    """
+    if _current_span.get() is not None:
+        yield _current_span.get()
+        return
+    rate = TRACE_SAMPLE_RATE if sample_rate is None else sample_rate
+    if rate <= 0 or random.random() >= rate:
+        yield None
+        return
+
+    root = Span(Trace(), name, attributes=attributes)
+    root.trace.spans.append(root)
+    token = _current_span.set(root)
+    error = None
+    try:
+        with execute_wrapper(_db_span_wrapper):
+            yield root
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        _finish_abandoned(root)
+        root.finish(error)
+        _current_span.reset(token)
+        export(root.trace)
+
+
+# ===== Celery publish spans =====
+
+# A publish that raises never sends after_task_publish. The span is therefore
+# not left current (later spans would nest under it) and is kept in one slot
+# per thread (publishing is synchronous), where the next publish replaces it.
+_publish_span = threading.local()
+
+
+@before_task_publish.connect(dispatch_uid="tracing_before_task_publish")
+def _start_publish_span(sender=None, headers=None, **kwargs):
+    entry = getattr(_publish_span, 'entry', None)
+    if entry is not None:
+        entry[1].finish(error="Task was not published")
+        _publish_span.entry = None
+
+    child, token = start_span("celery.publish", task=sender)
+    if child is None:
+        return
+    _current_span.reset(token)
+    _publish_span.entry = ((headers or {}).get('id'), child)
+
+
+@after_task_publish.connect(dispatch_uid="tracing_after_task_publish")
+def _end_publish_span(sender=None, headers=None, **kwargs):
+    entry = getattr(_publish_span, 'entry', None)
+    if entry is None or entry[0] != (headers or {}).get('id'):
+        return
+    _publish_span.entry = None
+    entry[1].finish()
+
+
+# ===== Exporters =====
+
+class _BackgroundExporter(abc.ABC):
+    """Exports finished traces on a daemon thread; drops them if the queue is full"""
+
+    def __init__(self, queue_size=1000):
+        self._queue = queue.Queue(queue_size)
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def submit(self, finished_trace):
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._queue = queue.Queue(self._queue.maxsize)
+                    self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+                    self._thread.start()
+                    self._pid = os.getpid()
+        try:
+            self._queue.put_nowait(finished_trace)
+        except queue.Full:
+            pass
+
+    def _run(self):
+        while True:
+            finished_trace = self._queue.get()
+            try:
+                self.export(finished_trace)
+            except Exception as e:
+                logger.warning(f"Trace export failed: {e}")
+
+    @abc.abstractmethod
+    def export(self, finished_trace):
+        """Send one finished trace; runs on the exporter thread"""
+
+
+class JSONLinesExporter(_BackgroundExporter):
+    """
+    One line per trace: the spans as a waterfall (offsets from the root start).
+    """
+
+    def __init__(self, path=TRACE_JSONL_PATH):
+        super().__init__()
+        self.path = path
+
+    def export(self, finished_trace):
+        root = finished_trace.spans[0]
+        entry = {
+            'trace_id': finished_trace.trace_id,
+            'name': root.name,
+            'duration_ms': round(root.duration_ms, 3),
+            'dropped_spans': finished_trace.dropped,
+            'spans': [
+                {
+                    'span_id': s.span_id,
+                    'parent_id': s.parent.span_id if s.parent else None,
+                    'name': s.name,
+                    'offset_ms': round((s.start_ns - root.start_ns) / 1e6, 3),
+                    'duration_ms': round(s.duration_ms, 3),
+                    'attributes': s.attributes,
+                    'error': s.error,
+                }
+                for s in finished_trace.spans
+            ],
+        }
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, default=str) + "\n")
+
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+class OTLPHTTPExporter(_BackgroundExporter):
+    """POSTs each trace as OTLP/HTTP JSON to TRACE_OTLP_ENDPOINT (a collector or any stand-in)"""
+
+    def __init__(self, endpoint=TRACE_OTLP_ENDPOINT, service_name=TRACE_SERVICE_NAME):
+        super().__init__()
+        self.endpoint = endpoint
+        self.service_name = service_name
+
+    def export(self, finished_trace):
+        spans = [
+            {
+                'traceId': finished_trace.trace_id,
+                'spanId': s.span_id,
+                'parentSpanId': s.parent.span_id if s.parent else '',
+                'name': s.name,
+                'kind': 2 if s.parent is None else 1,  # SERVER for the root, INTERNAL below
+                'startTimeUnixNano': str(s.start_ns),
+                'endTimeUnixNano': str(s.end_ns or s.start_ns),
+                'attributes': [{'key': k, 'value': _otlp_value(v)} for k, v in s.attributes.items()],
+                'status': {'code': 2, 'message': s.error} if s.error else {'code': 1},
+            }
+            for s in finished_trace.spans
+        ]
+        body = {
+            'resourceSpans': [{
+                'resource': {'attributes': [{'key': 'service.name', 'value': {'stringValue': self.service_name}}]},
+                'scopeSpans': [{'scope': {'name': __name__}, 'spans': spans}],
+            }]
+        }
+        request = urllib.request.Request(
+            self.endpoint, data=json.dumps(body, default=str).encode(),
+            headers={'Content-Type': 'application/json'}, method='POST'
+        )
+        with urllib.request.urlopen(request, timeout=5) as response:
+            response.read()
+
+
+_EXPORTERS = {'jsonl': JSONLinesExporter, 'otlp': OTLPHTTPExporter}
+_exporter = _EXPORTERS[TRACE_EXPORTER]() if TRACE_EXPORTER in _EXPORTERS else None
+
+
+def export(finished_trace):
+    if _exporter is not None:
+        _exporter.submit(finished_trace)